@@ -0,0 +1,78 @@
+"""
+    Description: Compares the legacy and the vectorized engine of the AnnotationMapper on synthetic annotations of growing size and
+    checks, that both engines produce exactly the same annotation. The word tokenization is the same for both engines and is
+    reported separately (cold, with --workers processes), afterwards both engines use the cached words. The legacy engine takes
+    quadratic time, therefor it is only run up to --legacy-max-sentences.
+
+    Requires the nltk "punkt" data (see AnnotationMapper).
+
+    Usage (from the repository root):
+        python benchmarks/annotation_mapper_benchmark.py --sentences 1000 5000 50000
+        python benchmarks/annotation_mapper_benchmark.py --sentences 200000 --workers 4 --legacy-max-sentences 0
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+from nltk.tokenize import word_tokenize
+from standins import generateSentenceBasedAnnotation, generateWordBasedAnnotation, labelSentenceBasedAnnotation
+
+from main.tooling.AnnotationMapper import LEGACY, VECTORIZED, AnnotationMapper
+from main.tooling.WordTokenizer import CachedWordTokenizer
+
+
+def measureEngine(engine: str, wordBasedAnnotation: Dict[str, Any], sentenceBasedAnnotation: Dict[str, Any],
+                  cachedWordTokenizer: CachedWordTokenizer) -> Dict[str, Any]:
+    startTime = time.perf_counter()
+    mappedAnnotation = AnnotationMapper(wordBasedAnnotation, sentenceBasedAnnotation, engine=engine,
+                                        cachedWordTokenizer=cachedWordTokenizer).mapRelevantSentences2WordBasedAnnotation()
+    seconds = time.perf_counter() - startTime
+
+    mappedAnnotation.pop("uploaded_at")  # type: ignore[misc]
+    return {"seconds": seconds, "annotation": json.dumps(mappedAnnotation)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sentences", type=int, nargs="+", default=[1000, 5000, 50000])
+    parser.add_argument("--legacy-max-sentences", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=1, help="Processes for the word tokenization")
+    parser.add_argument("--json", type=Path, help="Writes the results as JSON into this file")
+    args = parser.parse_args()
+
+    results = []
+    for numberOfSentences in args.sentences:
+        sentenceBasedAnnotation = labelSentenceBasedAnnotation(generateSentenceBasedAnnotation(numberOfSentences, repeatedShare=0.0))
+        wordBasedAnnotation = generateWordBasedAnnotation(sentenceBasedAnnotation, word_tokenize)
+
+        cachedWordTokenizer = CachedWordTokenizer(workers=args.workers, maxEntries=numberOfSentences, parallelMinSentences=0)
+        mapper = AnnotationMapper(wordBasedAnnotation, sentenceBasedAnnotation, cachedWordTokenizer=cachedWordTokenizer)
+        startTime = time.perf_counter()
+        mapper.wordTokenizeSentencesAndLabelWords(mapper.extractSentencesAndLabels())
+        tokenizationSeconds = time.perf_counter() - startTime
+
+        result: Dict[str, Any] = {"sentences": numberOfSentences, "tokens": len(wordBasedAnnotation["tokens"]), "word_tokenization_seconds": tokenizationSeconds}
+        vectorized = measureEngine(VECTORIZED, wordBasedAnnotation, sentenceBasedAnnotation, cachedWordTokenizer)
+        result["vectorized_seconds"] = vectorized["seconds"]
+
+        if numberOfSentences <= args.legacy_max_sentences:
+            legacy = measureEngine(LEGACY, wordBasedAnnotation, sentenceBasedAnnotation, cachedWordTokenizer)
+            result["legacy_seconds"] = legacy["seconds"]
+            result["speedup"] = legacy["seconds"] / vectorized["seconds"]
+            result["equal_annotations"] = legacy["annotation"] == vectorized["annotation"]
+
+        results.append(result)
+        legacyResult = (f", legacy {result['legacy_seconds']:.2f}s ({result['speedup']:.1f}x), equal: {result['equal_annotations']}"
+                        if "legacy_seconds" in result else ", legacy skipped")
+        print(f"{numberOfSentences:>8} sentences ({result['tokens']} tokens): word tokenization {tokenizationSeconds:.2f}s, "
+              f"vectorized {result['vectorized_seconds']:.2f}s{legacyResult}")
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
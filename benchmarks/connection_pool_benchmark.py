@@ -0,0 +1,77 @@
+"""
+    Description: Measures the latency per call of the requests to the foreign services with a new connection per call (like the
+    former module-level requests.get) and with the pooled keep-alive session of the requester (see createSession), and the
+    number of connections, that are opened for the calls. The calls get a small annotation from the local stand-in service, so the
+    saved TCP handshakes are not hidden by the transfer of the annotation.
+
+    Usage (from the repository root, two shells):
+        python benchmarks/local_standin_service.py --port 9684 --latency-ms 0
+        RC_SERVICE_BASE_URL=http://localhost:9684 python benchmarks/connection_pool_benchmark.py --calls 200
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Tuple
+
+import requests
+from urllib3.connectionpool import HTTPConnectionPool
+
+from main.connector.ForeignComponentRelevanceClassifierRestConnectorRequester import ANNOTATION_GET_ENDPOINT, ForeignComponentRelevanceClassifierRestConnectorRequester, createSession
+
+ANNOTATION_NAME = "connection_pool_benchmark"
+
+
+def measure(call: Callable[[], Any], calls: int) -> Tuple[float, int]:
+    # every new connection of urllib3 is counted, also the ones of the sessions, that requests.get creates per call
+    connections = 0
+    newConnection = HTTPConnectionPool._new_conn
+
+    def countingNewConnection(self: HTTPConnectionPool) -> Any:
+        nonlocal connections
+        connections += 1
+        return newConnection(self)
+
+    HTTPConnectionPool._new_conn = countingNewConnection  # type: ignore[method-assign]
+    try:
+        startTime = time.perf_counter()
+        for _ in range(calls):
+            call()
+        secondsPerCall = (time.perf_counter() - startTime) / calls
+    finally:
+        HTTPConnectionPool._new_conn = newConnection  # type: ignore[method-assign]
+
+    return secondsPerCall, connections
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--json", type=Path, help="Writes the results as JSON into this file")
+    args = parser.parse_args()
+
+    annotation = {"name": ANNOTATION_NAME, "tokens": [], "codes": [], "docs": []}
+    ForeignComponentRelevanceClassifierRestConnectorRequester(createSession()).storeAnnotationRequest(annotation)  # type: ignore[arg-type]
+
+    # the session of the measured requester is new, so its one connection is counted
+    requester = ForeignComponentRelevanceClassifierRestConnectorRequester(createSession())
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for mode, call in [("without pool", lambda: requests.get(f"{ANNOTATION_GET_ENDPOINT}{ANNOTATION_NAME}", timeout=5).json()),
+                       ("with pool", lambda: requester.getAnnotationRequest(ANNOTATION_NAME))]:
+        secondsPerCall, connections = measure(call, args.calls)
+        results[mode] = {"seconds_per_call": secondsPerCall, "connections": connections}
+
+    print(f"{'mode':>12} {'latency':>10} {'connections':>12}")
+    for mode, result in results.items():
+        print(f"{mode:>12} {result['seconds_per_call'] * 1000:8.2f}ms {result['connections']:12d}")
+    savedSeconds = results["without pool"]["seconds_per_call"] - results["with pool"]["seconds_per_call"]
+    print(f"Saved per call: {savedSeconds * 1000:.2f}ms")
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
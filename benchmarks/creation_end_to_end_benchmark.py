@@ -0,0 +1,111 @@
+"""
+    Description: Measures the end-to-end latency of creation jobs: submits jobs to POST /hitec/classify/relevance/run of a running
+    relevance classifier, polls the job status until the jobs are finished and reports the latency per job (from the submission
+    to the last status change), the duration of the creation pipeline and the remaining time (requests to the foreign services and
+    queueing). Without the remote services, the relevance classifier is started against the local stand-in service:
+
+    Usage (from the repository root, three shells):
+        python benchmarks/local_standin_service.py --port 9684 --documents 2000 --latency-ms 50
+        RC_SERVICE_BASE_URL=http://localhost:9684 ./start.sh
+        python benchmarks/creation_end_to_end_benchmark.py --configuration AnnotationAndDataset --jobs 5 --concurrency 1
+"""
+
+import argparse
+import json
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List
+
+import requests
+from local_standin_service import generateDataset
+
+RUN_PATH = "/hitec/classify/relevance/run"
+FINAL_STATUSES = ["finished", "failed"]
+
+
+def createContent(configuration: str, datasetName: str, numberOfDocuments: int) -> Dict[str, Any]:
+    runId = uuid.uuid4().hex[:8]
+    # for the annotation creation, the stand-in service generates the documents of the dataset, for the dataset creation (without
+    # annotation), they are sent with the request
+    documents = generateDataset(datasetName, numberOfDocuments)["documents"] if configuration == "OnlyDataset" else []
+    return {
+        "method": "relevance-classifier",
+        "dataset": {"uploaded_at": "2024-01-01T00:00:00Z", "name": datasetName, "size": len(documents), "documents": documents, "ground_truth": []},
+        "params": {
+            "method": "relevance-classifier",
+            "new_annotation_name": f"benchmark_annotation_{runId}",
+            "new_dataset_name": f"benchmark_dataset_{runId}",
+            "relevance_classification_conf": configuration,
+        },
+    }
+
+
+def runJob(url: str, content: Dict[str, Any], pollSeconds: float) -> Dict[str, Any]:
+    session = requests.Session()
+    startTime = time.perf_counter()
+    response = session.post(url + RUN_PATH, json=content, timeout=60)
+    response.raise_for_status()
+    statusUrl = url + response.json()["status_url"]
+
+    while True:
+        jobStatus = session.get(statusUrl, timeout=60).json()
+        if jobStatus["status"] in FINAL_STATUSES:
+            break
+        time.sleep(pollSeconds)
+    seconds = time.perf_counter() - startTime
+
+    pipelineSeconds = (jobStatus.get("pipeline_report") or {}).get("wall_seconds")
+    return {
+        "job_id": jobStatus["job_id"],
+        "status": jobStatus["status"],
+        "error": jobStatus.get("error"),
+        "seconds": seconds,
+        "pipeline_seconds": pipelineSeconds,
+        "outside_pipeline_seconds": seconds - pipelineSeconds if pipelineSeconds is not None else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:9698")
+    parser.add_argument("--configuration", default="AnnotationAndDataset", choices=["OnlyAnnotation", "OnlyDataset", "AnnotationAndDataset"])
+    parser.add_argument("--dataset", default="benchmark_dataset", help="Dataset name, that the stand-in service generates")
+    parser.add_argument("--documents", type=int, default=2000, help="Documents of the dataset for OnlyDataset")
+    parser.add_argument("--jobs", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--poll-seconds", type=float, default=0.05)
+    parser.add_argument("--json", type=Path, help="Writes the results as JSON into this file")
+    args = parser.parse_args()
+
+    results: List[Dict[str, Any]] = []
+    lock = threading.Lock()
+    jobIndices = iter(range(args.jobs))
+
+    def client() -> None:
+        for _ in jobIndices:
+            result = runJob(args.url, createContent(args.configuration, args.dataset, args.documents), args.poll_seconds)
+            with lock:
+                results.append(result)
+            pipelineResult = (f" (pipeline {result['pipeline_seconds']:.2f}s, outside of the pipeline {result['outside_pipeline_seconds']:.2f}s)"
+                              if result["pipeline_seconds"] is not None else "")
+            print(f"Job {result['job_id']}: {result['status']} in {result['seconds']:.2f}s{pipelineResult}")
+
+    threads = [threading.Thread(target=client) for _ in range(args.concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    latencies = sorted(result["seconds"] for result in results if result["status"] == "finished")
+    if latencies:
+        print(f"{len(latencies)}/{len(results)} jobs finished, p50 {latencies[len(latencies) // 2]:.2f}s, "
+              f"p95 {latencies[int(len(latencies) * 0.95)]:.2f}s")
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
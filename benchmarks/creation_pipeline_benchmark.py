@@ -0,0 +1,166 @@
+"""
+    Description: Runs the stages of the creation pipeline (PrepareDatasetForPredictionFilter, DeduplicateSentencesFilter,
+    PredictionFilter, ExpandDeduplicatedLabelsFilter, ExtendAnnotationFilter, CreateDatasetFilter) and the AnnotationMapper on
+    synthetic annotations of growing size and reports the time and memory of every stage as JSON. The PredictionFilter uses the
+    offline stand-in model (see standins.py), so the benchmark measures the code around the model and runs without network access.
+
+    Every stage is measured with the PipelineInstrumentation (wall time, CPU time, change of the RSS, new peak RSS). With
+    --trace-memory, the peak of the Python allocations of every stage is measured with tracemalloc as well (slower, but independent
+    of the stages before). A result can be compared with a baseline file (the JSON of an earlier run): a stage is reported as regression, if it is
+    slower than the baseline by more than the tolerance, and the benchmark then exits with status 1.
+
+    Usage (from the repository root):
+        python benchmarks/creation_pipeline_benchmark.py --sizes 1000 10000 --json baseline.json
+        python benchmarks/creation_pipeline_benchmark.py --sizes 1000 10000 --baseline baseline.json --tolerance 0.2
+    Sizes up to 1M tokens are supported (--sizes 1000 10000 100000 1000000), but the quadratic stages take very long for them.
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from omegaconf import OmegaConf
+from standins import createStandInModel, generateSentenceBasedAnnotation, generateWordBasedAnnotation
+
+from main.structure.Filters.CreateDatasetFilter import CreateDatasetFilter
+from main.structure.Filters.DeduplicateSentencesFilter import DeduplicateSentencesFilter
+from main.structure.Filters.ExpandDeduplicatedLabelsFilter import ExpandDeduplicatedLabelsFilter
+from main.structure.Filters.ExtendAnnotationFilter import ExtendAnnotationFilter
+from main.structure.Filters.PredictionFilter import PredictionFilter
+from main.structure.Filters.PrepareDatasetForPredictionFilter import PrepareDatasetForPredictionFilter
+from main.tooling.Instrumentation import PipelineInstrumentation
+from main.tooling.ModelRegistry import modelRegistry
+
+CONFIG_PATH = "src/main/configs/creation_annotation_and_dataset_config.yaml"
+STAND_IN_MODEL_NAME = "benchmark_stand_in_model"
+# differences below this duration are measurement noise and never count as regression
+NOISE_FLOOR_SECONDS = 0.05
+
+
+def measureStage(instrumentation: PipelineInstrumentation, traceMemory: bool, stageName: str, stageInput: Any,
+                 runStage: Callable[[], Any]) -> Any:
+    if not traceMemory:
+        return instrumentation.measureFilter(stageName, stageInput, runStage)
+
+    tracemalloc.start()
+    try:
+        stageResult = instrumentation.measureFilter(stageName, stageInput, runStage)
+        instrumentation.filterReports[-1]["traced_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 1)
+    finally:
+        tracemalloc.stop()
+    return stageResult
+
+
+def runCreationPipeline(size: int, conf: Any, traceMemory: bool, skipMapper: bool) -> Dict[str, Any]:
+    annotation = generateSentenceBasedAnnotation(size)
+    instrumentation = PipelineInstrumentation(OmegaConf.merge(conf, {"name": f"creation_pipeline_{size}"}))
+    measure = lambda stageName, stageInput, runStage: measureStage(instrumentation, traceMemory, stageName, stageInput, runStage)  # noqa: E731
+
+    sentences = measure("PrepareDatasetForPredictionFilter", annotation, PrepareDatasetForPredictionFilter(annotation).__filter__)
+    uniqueSentences = measure("DeduplicateSentencesFilter", sentences, lambda: DeduplicateSentencesFilter().__filter__(sentences))
+    predictions = measure("PredictionFilter", uniqueSentences, lambda: PredictionFilter(conf).__filter__(uniqueSentences))
+    sentencesAndLabels = measure("ExpandDeduplicatedLabelsFilter", predictions, lambda: ExpandDeduplicatedLabelsFilter().__filter__(predictions))
+    extendedAnnotation = measure("ExtendAnnotationFilter", sentencesAndLabels, lambda: ExtendAnnotationFilter(annotation).__filter__(sentencesAndLabels))
+    measure("CreateDatasetFilter", extendedAnnotation,
+            lambda: CreateDatasetFilter({"params": {"new_dataset_name": "benchmark"}}).__filter__(extendedAnnotation))  # type: ignore[dict-item]
+
+    if skipMapper:
+        instrumentation.filterReports.append({"filter": "AnnotationMapper", "skipped": "--skip-mapper"})
+    else:
+        try:
+            # AnnotationMapper word-tokenizes the sentences with nltk, which needs the "punkt" data
+            from nltk.tokenize import word_tokenize
+
+            from main.tooling.AnnotationMapper import AnnotationMapper
+            wordBasedAnnotation = generateWordBasedAnnotation(annotation, word_tokenize)
+        except LookupError as e:
+            instrumentation.filterReports.append({"filter": "AnnotationMapper", "skipped": f"nltk data is missing: {str(e).strip().splitlines()[0]}"})
+        else:
+            measure("AnnotationMapper", wordBasedAnnotation,
+                    lambda: AnnotationMapper(wordBasedAnnotation, extendedAnnotation).mapRelevantSentences2WordBasedAnnotation())
+
+    report = instrumentation.getReport()
+    report["size"] = size
+    return report
+
+
+def compareWithBaseline(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], tolerance: float) -> List[Dict[str, Any]]:
+    baselineStages: Dict[Tuple[int, str], Dict[str, Any]] = {
+        (report["size"], filterReport["filter"]): filterReport for report in baseline for filterReport in report["filters"]
+    }
+
+    regressions = []
+    for report in results:
+        for filterReport in report["filters"]:
+            baselineReport = baselineStages.get((report["size"], filterReport["filter"]))
+            if baselineReport is None or "wall_seconds" not in baselineReport or "wall_seconds" not in filterReport:
+                continue
+
+            filterReport["baseline_wall_seconds"] = baselineReport["wall_seconds"]
+            filterReport["speedup"] = round(baselineReport["wall_seconds"] / max(filterReport["wall_seconds"], 1e-9), 2)
+            allowedSeconds = max(baselineReport["wall_seconds"] * (1 + tolerance), baselineReport["wall_seconds"] + NOISE_FLOOR_SECONDS)
+            if filterReport["wall_seconds"] > allowedSeconds:
+                regressions.append({"size": report["size"], "filter": filterReport["filter"], "wall_seconds": filterReport["wall_seconds"],
+                                    "baseline_wall_seconds": baselineReport["wall_seconds"]})
+
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000], help="Number of tokens (sentences) of the annotations")
+    parser.add_argument("--trace-memory", action="store_true", help="Measures the peak of the Python allocations of every stage")
+    parser.add_argument("--skip-mapper", action="store_true", help="Does not run the AnnotationMapper")
+    parser.add_argument("--baseline", type=Path, help="Compares the results with the JSON of an earlier run")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown against the baseline (0.2 = 20%%)")
+    parser.add_argument("--json", type=Path, help="Writes the results as JSON into this file")
+    args = parser.parse_args()
+
+    # the prediction cache would hide the inference in repeated runs, micro-batching only helps concurrent requests
+    conf = OmegaConf.merge(OmegaConf.load(CONFIG_PATH), {
+        "model_name": STAND_IN_MODEL_NAME,
+        "prediction_cache": {"enabled": False},
+        "micro_batching": {"enabled": False},
+        "instrumentation": {"profile_filter": None},
+    })
+
+    with tempfile.TemporaryDirectory() as modelDirectory:
+        tokenizer, model = createStandInModel(Path(modelDirectory))
+    modelRegistry.registerModel(STAND_IN_MODEL_NAME, tokenizer, model)
+
+    results = []
+    for size in args.sizes:
+        report = runCreationPipeline(size, conf, args.trace_memory, args.skip_mapper)
+        results.append(report)
+
+        print(f"{size} tokens: {report['wall_seconds']:.3f}s, peak RSS {report['peak_rss_mb']:.0f}MB")
+        for filterReport in report["filters"]:
+            if "skipped" in filterReport:
+                print(f"    {filterReport['filter']:>34}: skipped ({filterReport['skipped']})")
+            else:
+                tracedPeak = f", traced peak {filterReport['traced_peak_mb']:.1f}MB" if "traced_peak_mb" in filterReport else ""
+                print(f"    {filterReport['filter']:>34}: {filterReport['wall_seconds']:8.3f}s, RSS {filterReport['rss_delta_mb'] or 0:+.1f}MB, "
+                      f"new peak RSS +{filterReport['new_peak_rss_mb']:.1f}MB{tracedPeak}")
+
+    regressions: List[Dict[str, Any]] = []
+    if args.baseline:
+        regressions = compareWithBaseline(results, json.loads(args.baseline.read_text()), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression['size']} tokens, {regression['filter']}: {regression['wall_seconds']:.3f}s "
+                  f"(baseline {regression['baseline_wall_seconds']:.3f}s)")
+        if not regressions:
+            print(f"No regression against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+    Description: Measures the serialization of large annotations, like they are sent with storeAnnotationRequest and received with
+    getAnnotationRequest and tokenizeAnnotationRequest: the encoding and decoding time of the JSON codecs (the json module of the
+    standard library and orjson, if it is installed), the compression and decompression time of gzip and the bytes on the wire. The
+    annotation is a synthetic word-based annotation with about --tokens tokens. The transfer time is estimated for --bandwidth-mbit.
+
+    Usage (from the repository root):
+        python benchmarks/json_payload_benchmark.py --tokens 1000000 --bandwidth-mbit 100
+"""
+
+import argparse
+import gzip
+import json
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from standins import generateSentenceBasedAnnotation, generateWordBasedAnnotation
+
+from main.tooling.JsonCodec import GZIP_LEVEL
+
+# a word-based annotation has about 11 words per sentence of the stand-in sentences
+WORDS_PER_SENTENCE = 11
+
+
+def measure(function: Callable[[], Any], repeats: int) -> Tuple[float, Any]:
+    seconds = []
+    for _ in range(repeats):
+        startTime = time.perf_counter()
+        result = function()
+        seconds.append(time.perf_counter() - startTime)
+    return min(seconds), result
+
+
+def getCodecs() -> Dict[str, Tuple[Callable[[Any], bytes], Callable[[bytes], Any]]]:
+    codecs: Dict[str, Tuple[Callable[[Any], bytes], Callable[[bytes], Any]]] = {
+        # like requests' json= and json.loads(request.data.decode(...)) before
+        "stdlib": (lambda obj: json.dumps(obj).encode("utf-8"), lambda data: json.loads(data.decode("utf-8"))),
+    }
+    try:
+        import orjson
+    except ImportError:
+        print("orjson is not installed, only the json module of the standard library is measured")
+    else:
+        codecs["orjson"] = (lambda obj: orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS), orjson.loads)
+    return codecs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=1000000, help="Approximate number of tokens of the word-based annotation")
+    parser.add_argument("--gzip-levels", type=int, nargs="+", default=sorted({1, GZIP_LEVEL, 6}))
+    parser.add_argument("--bandwidth-mbit", type=float, default=100, help="Bandwidth for the estimated transfer time")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--json", type=Path, help="Writes the results as JSON into this file")
+    args = parser.parse_args()
+
+    sentenceBasedAnnotation = generateSentenceBasedAnnotation(max(args.tokens // WORDS_PER_SENTENCE, 1))
+    annotation = generateWordBasedAnnotation(sentenceBasedAnnotation, str.split)
+    print(f"Word-based annotation with {len(annotation['tokens'])} tokens and {len(annotation['codes'])} codes")
+
+    results: List[Dict[str, Any]] = []
+    for codecName, (encode, decode) in getCodecs().items():
+        encodeSeconds, data = measure(lambda: encode(annotation), args.repeats)
+        decodeSeconds, _ = measure(lambda: decode(data), args.repeats)
+        results.append({"codec": codecName, "compression": None, "encode_seconds": encodeSeconds, "decode_seconds": decodeSeconds,
+                        "compress_seconds": 0.0, "decompress_seconds": 0.0, "bytes": len(data)})
+
+        for level in args.gzip_levels:
+            compressSeconds, compressedData = measure(lambda: gzip.compress(data, compresslevel=level, mtime=0), args.repeats)
+            decompressSeconds, _ = measure(lambda: gzip.decompress(compressedData), args.repeats)
+            results.append({"codec": codecName, "compression": f"gzip-{level}", "encode_seconds": encodeSeconds, "decode_seconds": decodeSeconds,
+                            "compress_seconds": compressSeconds, "decompress_seconds": decompressSeconds, "bytes": len(compressedData)})
+
+    bytesPerSecond = args.bandwidth_mbit * 1000 * 1000 / 8
+    print(f"{'codec':>8} {'compression':>12} {'encode':>8} {'decode':>8} {'compress':>9} {'decompress':>11} {'MB':>8} "
+          f"{'transfer':>9} {'total':>8}")
+    for result in results:
+        result["transfer_seconds"] = result["bytes"] / bytesPerSecond
+        result["total_seconds"] = sum(result[key] for key in ["encode_seconds", "decode_seconds", "compress_seconds", "decompress_seconds",
+                                                              "transfer_seconds"])
+        print(f"{result['codec']:>8} {result['compression'] or 'none':>12} {result['encode_seconds']:7.3f}s {result['decode_seconds']:7.3f}s "
+              f"{result['compress_seconds']:8.3f}s {result['decompress_seconds']:10.3f}s {result['bytes'] / (1024 * 1024):8.1f} "
+              f"{result['transfer_seconds']:8.3f}s {result['total_seconds']:7.3f}s")
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+    Description: Local stand-in for the uvl-storage-concepts, uvl-orchestration-concepts and uvl-annotation services, so that the
+    creation flow can be load-tested and benchmarked without the remote services. All endpoints, that the requester of the
+    relevance classifier calls, are served on one port:
+
+        GET  /hitec/repository/concepts/annotation/name/<name>   returns the stored (or initialized) annotation
+        POST /hitec/repository/concepts/store/annotation/        stores an annotation
+        POST /hitec/orchestration/concepts/annotationinit/       initializes a sentence-based annotation of a dataset
+        POST /hitec/annotation/tokenize/                         tokenizes the documents of a dataset into sentences
+        POST /hitec/repository/concepts/store/dataset/           stores a dataset
+
+    Datasets, that are not stored, are generated with --documents synthetic app reviews, so the annotations have realistic sizes.
+    Every request waits --latency-ms plus --latency-ms-per-mb for the size of the request and the response on the wire, like a remote
+    service. gzip-compressed requests are accepted (with --no-gzip, they are rejected with 415 like by a service without request
+    decompression) and responses are compressed for clients, that accept gzip. Everything is kept in memory.
+
+    Usage (from the repository root):
+        python benchmarks/local_standin_service.py --port 9684 --documents 2000 --latency-ms 50 --latency-ms-per-mb 20
+        RC_SERVICE_BASE_URL=http://localhost:9684 ./start.sh
+"""
+
+import argparse
+import gzip
+import json
+import random
+import re
+import threading
+import time
+from typing import Any, Dict, List
+
+from flask import Flask, Response, abort, request
+from standins import generateSentences
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+
+app = Flask(__name__)
+
+settings: Dict[str, Any] = {"documents": 2000, "latency_ms": 50.0, "latency_ms_per_mb": 20.0, "gzip": True}
+annotations: Dict[str, Dict[str, Any]] = {}
+datasets: Dict[str, Dict[str, Any]] = {}
+storeLock = threading.Lock()
+
+
+def generateDataset(name: str, numberOfDocuments: int) -> Dict[str, Any]:
+    randomGenerator = random.Random(name)
+    sentences = generateSentences(numberOfDocuments * 5, seed=randomGenerator.randint(0, 1_000_000), repeatedShare=0.1)
+    documents = []
+    start = 0
+    for documentIndex in range(numberOfDocuments):
+        numberOfSentences = randomGenerator.randint(1, 9)
+        text = " ".join(sentences[(start + offset) % len(sentences)] for offset in range(numberOfSentences))
+        documents.append({"number": documentIndex, "id": f"Review_{documentIndex}", "text": text})
+        start += numberOfSentences
+    return {"uploaded_at": "2024-01-01T00:00:00Z", "name": name, "size": len(documents), "documents": documents}
+
+
+def tokenizeDocuments(documents: List[Dict[str, Any]], name: str, datasetName: str) -> Dict[str, Any]:
+    tokens: List[Dict[str, Any]] = []
+    docs = []
+    for document in documents:
+        beginIndex = len(tokens)
+        for sentence in SENTENCE_BOUNDARY.split(document["text"].strip()):
+            if sentence:
+                tokens.append({"index": len(tokens), "name": sentence, "lemma": "", "pos": "", "num_name_codes": 0, "num_tore_codes": 0})
+        docs.append({"name": document["id"], "begin_index": beginIndex, "end_index": len(tokens)})
+
+    now = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    return {"uploaded_at": now, "last_updated": now, "name": name, "dataset": datasetName, "tores": [], "show_recommendationtore": False,
+            "sentence_tokenization_enabled_for_annotation": True, "docs": docs, "tokens": tokens, "codes": [], "tore_relationships": []}
+
+
+def readBody() -> Any:
+    if request.headers.get("Content-Encoding") == "gzip":
+        if not settings["gzip"]:
+            abort(respond({"message": "Content-Encoding gzip is not supported"}, 415))
+        return json.loads(gzip.decompress(request.get_data()))
+    return json.loads(request.get_data())
+
+
+def respond(body: Any, status: int = 200) -> Response:
+    payload = json.dumps(body).encode("utf-8")
+    compressed = settings["gzip"] and len(payload) >= 65536 and "gzip" in request.headers.get("Accept-Encoding", "")
+    if compressed:
+        payload = gzip.compress(payload, compresslevel=1)
+
+    megabytes = (len(payload) + (request.content_length or 0)) / (1024 * 1024)
+    time.sleep((settings["latency_ms"] + settings["latency_ms_per_mb"] * megabytes) / 1000)
+
+    response = Response(payload, status=status, mimetype="application/json")
+    if compressed:
+        response.headers["Content-Encoding"] = "gzip"
+    return response
+
+
+@app.route("/hitec/repository/concepts/annotation/name/<name>", methods=["GET"])
+def get_annotation(name: str) -> Response:
+    with storeLock:
+        annotation = annotations.get(name)
+    if annotation is None:
+        return respond({"message": f"Annotation {name} not found"}, 404)
+    return respond(annotation)
+
+
+@app.route("/hitec/repository/concepts/store/annotation/", methods=["POST"])
+def store_annotation() -> Response:
+    annotation = readBody()
+    with storeLock:
+        annotations[annotation["name"]] = annotation
+    return respond({"message": f"Annotation {annotation['name']} stored"})
+
+
+@app.route("/hitec/orchestration/concepts/annotationinit/", methods=["POST"])
+def initialize_annotation() -> Response:
+    content = readBody()
+    with storeLock:
+        dataset = datasets.get(content["dataset"])
+    if dataset is None:
+        dataset = generateDataset(content["dataset"], settings["documents"])
+
+    annotation = tokenizeDocuments(dataset["documents"], content["name"], content["dataset"])
+    with storeLock:
+        annotations[content["name"]] = annotation
+    return respond({"message": f"Annotation {content['name']} initialized"})
+
+
+@app.route("/hitec/annotation/tokenize/", methods=["POST"])
+def tokenize_dataset() -> Response:
+    content = readBody()
+    return respond(tokenizeDocuments(content["dataset"], "", ""))
+
+
+@app.route("/hitec/repository/concepts/store/dataset/", methods=["POST"])
+def store_dataset() -> Response:
+    dataset = readBody()
+    with storeLock:
+        datasets[dataset["name"]] = dataset
+    return respond({"message": f"Dataset {dataset['name']} stored"})
+
+
+@app.route("/standin/statistics", methods=["GET"])
+def get_statistics() -> Response:
+    with storeLock:
+        return Response(json.dumps({"annotations": sorted(annotations), "datasets": sorted(datasets)}), mimetype="application/json")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=9684)
+    parser.add_argument("--documents", type=int, default=2000, help="Documents of generated datasets")
+    parser.add_argument("--latency-ms", type=float, default=50, help="Latency of every request")
+    parser.add_argument("--latency-ms-per-mb", type=float, default=20, help="Additional latency per MB of request and response")
+    parser.add_argument("--no-gzip", action="store_true", help="Rejects compressed requests and does not compress responses")
+    args = parser.parse_args()
+
+    settings.update(documents=args.documents, latency_ms=args.latency_ms, latency_ms_per_mb=args.latency_ms_per_mb, gzip=not args.no_gzip)
+    app.run(host="0.0.0.0", port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+    Description: Compares the "fixed" batching (slices of 100 sentences in arrival order) with the length-bucketed "token_budget"
+    batching of the PredictionFilter. Reports the padding waste (share of padded token positions) and the sentences per second.
+
+    Usage (from the repository root):
+        python benchmarks/prediction_batching_benchmark.py --sentences 5000 --max-batch-tokens 8192
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from omegaconf import OmegaConf
+from standins import createStandInModel, generateSentences
+
+from main.structure.Filters.PredictionFilter import PredictionFilter
+from main.tooling.ModelRegistry import modelRegistry
+
+MODEL_NAME = "benchmark_stand_in_model"
+
+
+def computePaddingWaste(predictionFilter: PredictionFilter, tokenizer: Any, sentences: List[str], windowSize: int) -> Dict[str, float]:
+    realTokens = 0
+    paddedTokens = 0
+    for windowStart in range(0, len(sentences), windowSize):
+        inputIds = tokenizer(sentences[windowStart:windowStart + windowSize], truncation=True)["input_ids"]
+        for batchIndices in predictionFilter.__planBatches__(inputIds):
+            lengths = [len(inputIds[index]) for index in batchIndices]
+            realTokens += sum(lengths)
+            paddedTokens += max(lengths) * len(lengths)
+
+    return {"real_tokens": realTokens, "padded_tokens": paddedTokens, "padding_waste": 1 - realTokens / paddedTokens}
+
+
+def runBenchmark(sentences: List[str], mode: str, maxBatchTokens: int, windowSize: int, tokenizer: Any) -> Dict[str, Any]:
+    conf = OmegaConf.create({
+        "model_name": MODEL_NAME,
+        "batching": {"mode": mode, "max_batch_tokens": maxBatchTokens, "window_size": windowSize},
+    })
+    predictionFilter = PredictionFilter(conf)
+
+    startTime = time.perf_counter()
+    _, labels = predictionFilter.__filter__(sentences)
+    seconds = time.perf_counter() - startTime
+
+    result: Dict[str, Any] = {"mode": mode, "seconds": seconds, "sentences_per_second": len(sentences) / seconds}
+    result.update(computePaddingWaste(predictionFilter, tokenizer, sentences, windowSize if mode == "token_budget" else 100))
+    result["labels"] = labels
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sentences", type=int, default=5000)
+    parser.add_argument("--max-batch-tokens", type=int, default=8192)
+    parser.add_argument("--window-size", type=int, default=4096)
+    parser.add_argument("--json", type=Path, help="Writes the results as JSON into this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as modelDirectory:
+        tokenizer, model = createStandInModel(Path(modelDirectory))
+        modelRegistry.registerModel(MODEL_NAME, tokenizer, model)
+
+        sentences = generateSentences(args.sentences)
+
+        results = [runBenchmark(sentences, mode, args.max_batch_tokens, args.window_size, tokenizer) for mode in ["fixed", "token_budget"]]
+
+    # both modes must predict the same labels in the same order (up to numerical noise of the padding)
+    fixedLabels, tokenBudgetLabels = results[0].pop("labels"), results[1].pop("labels")
+    agreement = sum(1 for fixedLabel, tokenBudgetLabel in zip(fixedLabels, tokenBudgetLabels) if fixedLabel == tokenBudgetLabel) / len(fixedLabels)
+
+    for result in results:
+        print(f"{result['mode']:>12}: {result['sentences_per_second']:8.1f} sentences/s, padding waste {result['padding_waste']:.1%} "
+              f"({result['padded_tokens']} padded positions for {result['real_tokens']} tokens)")
+
+    print(f"Speed-up: {results[1]['sentences_per_second'] / results[0]['sentences_per_second']:.2f}x, label agreement: {agreement:.2%}")
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+    Description: Measures the requests per second of the production server (gunicorn, see gunicorn.conf.py) against the number of
+    worker processes. For every worker count, the server is started, loaded with concurrent POST /hitec/classify/relevance/predict
+    requests for a fixed duration and stopped again. Reports requests/s, sentences/s, the latency percentiles and the memory of all
+    server processes (RSS counts shared pages in every process, PSS splits them between the processes, so PSS shows the sharing of
+    the preloaded model weights).
+
+    Requires the model of src/main/configs/prediction_config.yaml in src/main/models (see "ComponentRelevanceClassifierServiceSetup").
+    Every request contains new sentences, so the prediction cache does not hide the inference.
+
+    Usage (from the repository root, Linux):
+        python benchmarks/server_throughput_benchmark.py --workers 1 2 4 --clients 16 --duration 30
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import requests
+from standins import generateSentences
+
+STATUS_PATH = "/hitec/classify/relevance/status"
+PREDICT_PATH = "/hitec/classify/relevance/predict"
+
+
+def getProcessTree(pid: int) -> List[int]:
+    childPids: List[int] = []
+    for childrenFile in Path(f"/proc/{pid}/task").glob("*/children"):
+        childPids.extend(int(childPid) for childPid in childrenFile.read_text().split())
+    return [pid] + [processPid for childPid in childPids for processPid in getProcessTree(childPid)]
+
+
+def measureMemory(pid: int) -> Dict[str, float]:
+    memory = {"rss_mb": 0.0, "pss_mb": 0.0}
+    for processPid in getProcessTree(pid):
+        for line in Path(f"/proc/{processPid}/smaps_rollup").read_text().splitlines():
+            if line.startswith("Rss:"):
+                memory["rss_mb"] += int(line.split()[1]) / 1024
+            elif line.startswith("Pss:"):
+                memory["pss_mb"] += int(line.split()[1]) / 1024
+    return memory
+
+
+def waitUntilReady(url: str, timeoutSeconds: float) -> None:
+    deadline = time.monotonic() + timeoutSeconds
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(url + STATUS_PATH, timeout=1).ok:
+                return
+        except requests.ConnectionError:
+            pass
+        time.sleep(0.5)
+    raise TimeoutError(f"Server at {url} did not start within {timeoutSeconds}s")
+
+
+def runLoad(url: str, clients: int, durationSeconds: float, sentencesPerRequest: int, seed: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors = 0
+    lock = threading.Lock()
+    deadline = time.monotonic() + durationSeconds
+
+    def client(clientIndex: int) -> None:
+        nonlocal errors
+        session = requests.Session()
+        requestIndex = 0
+        while time.monotonic() < deadline:
+            sentences = generateSentences(sentencesPerRequest, seed=seed + clientIndex * 1_000_000 + requestIndex)
+            requestIndex += 1
+
+            startTime = time.perf_counter()
+            response = session.post(url + PREDICT_PATH, json={"sentences": sentences}, timeout=300)
+            latency = time.perf_counter() - startTime
+
+            with lock:
+                if response.ok:
+                    latencies.append(latency)
+                else:
+                    errors += 1
+
+    threads = [threading.Thread(target=client, args=(clientIndex,)) for clientIndex in range(clients)]
+    startTime = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - startTime
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "requests_per_second": len(latencies) / seconds,
+        "sentences_per_second": len(latencies) * sentencesPerRequest / seconds,
+        "p50_latency_ms": latencies[len(latencies) // 2] * 1000 if latencies else None,
+        "p95_latency_ms": latencies[int(len(latencies) * 0.95)] * 1000 if latencies else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--torch-threads-per-worker", type=int, help="Default: number of CPU cores / number of workers")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--sentences-per-request", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--port", type=int, default=9699)
+    parser.add_argument("--json", type=Path, help="Writes the results as JSON into this file")
+    args = parser.parse_args()
+
+    url = f"http://127.0.0.1:{args.port}"
+    results = []
+
+    for workers in args.workers:
+        environment = dict(os.environ, RC_SERVER_WORKERS=str(workers))
+        if args.torch_threads_per_worker:
+            environment["RC_TORCH_THREADS_PER_WORKER"] = str(args.torch_threads_per_worker)
+
+        server = subprocess.Popen(
+            ["gunicorn", "--config", "gunicorn.conf.py", "--bind", f"127.0.0.1:{args.port}", "main.connector.ComponentRelevanceClassifierRestConnectorProvider:app"],
+            env=environment,
+        )
+        try:
+            waitUntilReady(url, timeoutSeconds=300)
+
+            # warm-up, so that every worker has started its inference threads
+            runLoad(url, args.clients, 5, args.sentences_per_request, seed=time.time_ns() % 1_000_000_000)
+
+            result: Dict[str, Any] = {"workers": workers}
+            result.update(runLoad(url, args.clients, args.duration, args.sentences_per_request, seed=time.time_ns() % 1_000_000_000))
+            result.update(measureMemory(server.pid))
+            results.append(result)
+        finally:
+            server.terminate()
+            server.wait()
+
+        print(f"{workers:>2} workers: {result['requests_per_second']:7.1f} requests/s, {result['sentences_per_second']:8.1f} sentences/s, "
+              f"p50 {result['p50_latency_ms']:.0f}ms, p95 {result['p95_latency_ms']:.0f}ms, RSS {result['rss_mb']:.0f}MB, PSS {result['pss_mb']:.0f}MB")
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
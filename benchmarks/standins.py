@@ -0,0 +1,184 @@
+"""
+    Description: Offline stand-ins for the benchmarks: a small randomly initialized BERT classifier with a generated vocabulary,
+    synthetic app review sentences and synthetic annotations shaped like DataModels.Annotation. The stand-in model has the
+    architecture of the fine-tuned model, but is much smaller, so the benchmarks run without network access and without a
+    downloaded model.
+"""
+
+import random
+import string
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Set, Tuple
+
+SPECIAL_TOKENS = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"]
+PUNCTUATION = [".", ",", "!", "?"]
+
+
+def createVocabulary(size: int = 2000, seed: int = 0) -> List[str]:
+    randomGenerator = random.Random(seed)
+    words: Set[str] = set()
+    while len(words) < size:
+        words.add("".join(randomGenerator.choices(string.ascii_lowercase, k=randomGenerator.randint(2, 9))))
+    return sorted(words)
+
+
+def createStandInModel(directory: Path, vocabularySize: int = 2000, hiddenSize: int = 64, numberOfLayers: int = 2) -> Tuple[object, object]:
+    """
+        Description:
+            Creates a small BertForSequenceClassification with two labels and a BertTokenizer with a generated vocabulary and saves
+            both into the directory.
+        Args:
+            Path: The model directory
+            int: The number of words in the vocabulary
+            int: The hidden size of the model
+            int: The number of transformer layers
+        Returns:
+            Tuple[object, object]: The tokenizer and the model
+    """
+
+    from transformers import BertConfig, BertForSequenceClassification, BertTokenizer
+
+    directory.mkdir(parents=True, exist_ok=True)
+    vocabularyPath = directory / "vocab.txt"
+    vocabularyPath.write_text("\n".join(SPECIAL_TOKENS + PUNCTUATION + createVocabulary(vocabularySize)) + "\n")
+
+    tokenizer = BertTokenizer(str(vocabularyPath))
+    config = BertConfig(
+        vocab_size=len(tokenizer.vocab),
+        hidden_size=hiddenSize,
+        num_hidden_layers=numberOfLayers,
+        num_attention_heads=2,
+        intermediate_size=hiddenSize * 2,
+        max_position_embeddings=512,
+        num_labels=2,
+        id2label={0: "Non-Informative", 1: "Informative"},
+        label2id={"Non-Informative": 0, "Informative": 1},
+    )
+    model = BertForSequenceClassification(config)
+    model.eval()
+
+    tokenizer.save_pretrained(str(directory))
+    model.save_pretrained(str(directory))
+
+    return tokenizer, model
+
+
+def generateSentences(numberOfSentences: int, seed: int = 0, repeatedShare: float = 0.0) -> List[str]:
+    """
+        Description:
+            Generates app review like sentences. Most sentences are short, a few are long (log-normal length distribution), like in
+            the real app review datasets. A share of the sentences can be repetitions of a few common short sentences.
+        Args:
+            int: The number of sentences
+            int: The random seed
+            float: The share of repeated sentences
+        Returns:
+            List[str]: The sentences
+    """
+
+    randomGenerator = random.Random(seed)
+    vocabulary = createVocabulary()
+    commonSentences = ["Great app.", "Love it!", "Very good.", "Works fine.", "Thanks."]
+
+    sentences = []
+    for _ in range(numberOfSentences):
+        if randomGenerator.random() < repeatedShare:
+            sentences.append(randomGenerator.choice(commonSentences))
+            continue
+        numberOfWords = max(1, min(300, int(randomGenerator.lognormvariate(2.4, 0.7))))
+        words = randomGenerator.choices(vocabulary, k=numberOfWords)
+        sentences.append(" ".join(words).capitalize() + randomGenerator.choice(PUNCTUATION))
+
+    return sentences
+
+
+def generateSentenceBasedAnnotation(numberOfTokens: int, seed: int = 0, repeatedShare: float = 0.2, sentencesPerDocument: int = 5) -> Dict[str, Any]:
+    """
+        Description:
+            Generates a sentence-based annotation without codes, like the annotation, that is handed into the creation pipeline.
+            Every token is a sentence, the documents contain on average "sentencesPerDocument" sentences.
+        Args:
+            int: The number of tokens (sentences)
+            int: The random seed
+            float: The share of repeated sentences
+            int: The average number of sentences per document
+        Returns:
+            Dict[str, Any]: The annotation
+    """
+
+    randomGenerator = random.Random(seed)
+    sentences = generateSentences(numberOfTokens, seed=seed, repeatedShare=repeatedShare)
+
+    docs: List[Dict[str, Any]] = []
+    beginIndex = 0
+    while beginIndex < numberOfTokens:
+        endIndex = min(numberOfTokens, beginIndex + randomGenerator.randint(1, 2 * sentencesPerDocument - 1))
+        docs.append({"name": f"Review_{len(docs)}", "begin_index": beginIndex, "end_index": endIndex})
+        beginIndex = endIndex
+
+    return {
+        "uploaded_at": "2024-01-01T00:00:00Z",
+        "last_updated": "2024-01-01T00:00:00Z",
+        "name": f"benchmark_annotation_{numberOfTokens}",
+        "dataset": f"benchmark_dataset_{numberOfTokens}",
+        "tores": [],
+        "show_recommendationtore": False,
+        "docs": docs,
+        "tokens": [{"index": index, "name": sentence, "lemma": "", "pos": "", "num_name_codes": 0, "num_tore_codes": 0} for index, sentence in enumerate(sentences)],
+        "codes": [],
+        "tore_relationships": [],
+    }
+
+
+def generateWordBasedAnnotation(sentenceBasedAnnotation: Dict[str, Any], wordTokenize: Callable[[str], List[str]], codeShare: float = 0.1, seed: int = 0) -> Dict[str, Any]:
+    """
+        Description:
+            Generates the word-based annotation of the same dataset, like it is handed into the AnnotationMapper: the sentences are
+            word-tokenized (with the tokenizer of the AnnotationMapper) and a share of the words has a code.
+        Args:
+            Dict[str, Any]: The sentence-based annotation
+            Callable[[str], List[str]]: The word tokenizer
+            float: The share of words with a code
+            int: The random seed
+        Returns:
+            Dict[str, Any]: The annotation
+    """
+
+    randomGenerator = random.Random(seed)
+    tokens: List[Dict[str, Any]] = []
+    docs = []
+    for doc in sentenceBasedAnnotation["docs"]:
+        beginIndex = len(tokens)
+        for sentenceToken in sentenceBasedAnnotation["tokens"][doc["begin_index"]:doc["end_index"]]:
+            for word in wordTokenize(sentenceToken["name"]):
+                tokens.append({"index": len(tokens), "name": word, "lemma": word.lower(), "pos": "n", "num_name_codes": 0, "num_tore_codes": 0})
+        docs.append({"name": doc["name"], "begin_index": beginIndex, "end_index": len(tokens)})
+
+    codes: List[Dict[str, Any]] = []
+    for token in tokens:
+        if randomGenerator.random() < codeShare:
+            codes.append({"tokens": [token["index"]], "name": token["name"], "tore": "Task", "index": len(codes), "relationship_memberships": []})
+            token["num_name_codes"] = 1
+            token["num_tore_codes"] = 1
+
+    return dict(sentenceBasedAnnotation, name=sentenceBasedAnnotation["name"] + "_words", docs=docs, tokens=tokens, codes=codes, tores=["Task"])
+
+
+def labelSentenceBasedAnnotation(sentenceBasedAnnotation: Dict[str, Any], informativeShare: float = 0.5, seed: int = 0) -> Dict[str, Any]:
+    """
+        Description:
+            Adds a relevance code to every sentence, like the ExtendAnnotationFilter does with the predictions.
+        Args:
+            Dict[str, Any]: The sentence-based annotation
+            float: The share of informative sentences
+            int: The random seed
+        Returns:
+            Dict[str, Any]: The labeled annotation
+    """
+
+    randomGenerator = random.Random(seed)
+    codes = [{"tokens": [token["index"]], "name": token["name"], "tore": "Informative" if randomGenerator.random() < informativeShare else "Non-Informative",
+              "index": token["index"], "relationship_memberships": []} for token in sentenceBasedAnnotation["tokens"]]
+    tokens = [dict(token, num_name_codes=1, num_tore_codes=1) for token in sentenceBasedAnnotation["tokens"]]
+
+    return dict(sentenceBasedAnnotation, tokens=tokens, codes=codes, tores=["Non-Informative", "Informative"])
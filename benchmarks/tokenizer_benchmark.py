@@ -0,0 +1,70 @@
+"""
+    Description: Compares the pure-Python BertTokenizer, the Rust-backed BertTokenizerFast and the fast tokenizer behind the
+    TokenizationCache (cold and warm). Reports the tokenization time per 10k sentences and checks, that all variants produce the
+    same token IDs.
+
+    Usage (from the repository root):
+        python benchmarks/tokenizer_benchmark.py --sentences 20000 --repeated-share 0.3
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from standins import createStandInModel, generateSentences
+from transformers import BertTokenizer, BertTokenizerFast
+
+from main.tooling.TokenizationCache import TokenizationCache
+
+
+def measure(name: str, encode: Callable[[List[str]], Dict[str, Any]], sentences: List[str]) -> Dict[str, Any]:
+    startTime = time.perf_counter()
+    inputIds = encode(sentences)["input_ids"]
+    seconds = time.perf_counter() - startTime
+
+    return {"variant": name, "seconds": seconds, "seconds_per_10k_sentences": seconds / len(sentences) * 10000, "input_ids": inputIds}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sentences", type=int, default=20000)
+    parser.add_argument("--repeated-share", type=float, default=0.3)
+    parser.add_argument("--json", type=Path, help="Writes the results as JSON into this file")
+    args = parser.parse_args()
+
+    sentences = generateSentences(args.sentences, repeatedShare=args.repeated_share)
+
+    with tempfile.TemporaryDirectory() as modelDirectory:
+        createStandInModel(Path(modelDirectory))
+        slowTokenizer = BertTokenizer.from_pretrained(modelDirectory)
+        fastTokenizer = BertTokenizerFast.from_pretrained(modelDirectory)
+
+    tokenizationCache = TokenizationCache(fastTokenizer)
+
+    results = [
+        measure("slow", lambda batch: slowTokenizer(batch, truncation=True), sentences),
+        measure("fast", lambda batch: fastTokenizer(batch, truncation=True), sentences),
+        measure("fast+cache (cold)", tokenizationCache.encode, sentences),
+        measure("fast+cache (warm)", tokenizationCache.encode, sentences),
+    ]
+
+    # every variant must produce exactly the token IDs of the slow tokenizer
+    referenceInputIds = results[0]["input_ids"]
+    for result in results:
+        result["equal_input_ids"] = result.pop("input_ids") == referenceInputIds
+
+    for result in results:
+        print(f"{result['variant']:>18}: {result['seconds_per_10k_sentences']:7.3f}s per 10k sentences, "
+              f"{results[0]['seconds'] / result['seconds']:6.1f}x, equal token IDs: {result['equal_input_ids']}")
+
+    print(f"Cache statistics: {tokenizationCache.getStatistics()}")
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+# Production server configuration, used by start.sh:
+#   gunicorn --config gunicorn.conf.py main.connector.ComponentRelevanceClassifierRestConnectorProvider:app
+# The application and the models are loaded once in the server process and shared with the forked workers (see ServerSetup).
+
+import os
+import shutil
+from typing import Any
+
+# the metrics of all workers are aggregated via this directory (see Metrics), it has to be set before prometheus_client is imported
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "src/data/metrics/")
+shutil.rmtree(os.environ["PROMETHEUS_MULTIPROC_DIR"], ignore_errors=True)
+os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"])
+
+from main.tooling.Metrics import markProcessDead  # noqa: E402
+from main.tooling.ServerSetup import SERVER_THREADS, SERVER_WORKERS, configureWorker, preloadModels  # noqa: E402
+
+bind = "0.0.0.0:9698"
+workers = SERVER_WORKERS
+worker_class = "gthread"
+threads = SERVER_THREADS
+preload_app = True
+timeout = 300
+graceful_timeout = 60
+
+
+def when_ready(server: Any) -> None:
+    # is called in the server process after the application was loaded and before the workers are forked
+    preloadModels()
+
+
+def post_fork(server: Any, worker: Any) -> None:
+    configureWorker()
+
+
+def child_exit(server: Any, worker: Any) -> None:
+    markProcessDead(worker.pid)
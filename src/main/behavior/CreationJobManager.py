@@ -0,0 +1,219 @@
+import json
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, cast
+
+from main.behavior.RelevanceClassifier import RelevanceClassifier
+from main.tooling.Logger import logging_setup
+
+logger = logging_setup(__name__)
+
+JOB_WORKERS = int(os.getenv("RC_JOB_WORKERS", "2"))
+JOB_QUEUE_DEPTH = int(os.getenv("RC_JOB_QUEUE_DEPTH", "16"))
+FINISHED_JOBS_TO_KEEP = int(os.getenv("RC_FINISHED_JOBS_TO_KEEP", "200"))
+JOB_STORE_PATH = os.getenv("RC_JOB_STORE_PATH", "src/data/jobs/")
+
+QUEUED = "queued"
+RUNNING = "running"
+FINISHED = "finished"
+FAILED = "failed"
+
+
+def getTimestamp() -> str:
+    return datetime.now().astimezone().isoformat()
+
+
+class JobQueueFullError(Exception):
+    """
+        Description: Is raised, if a new job is submitted, while all workers are busy and the job queue is full.
+    """
+
+
+class CreationJob():
+    """
+        Description: The state of one creation job, that is processed by the CreationJobManager.
+    """
+
+    def __init__(self, content: Dict[str, str]) -> None:
+        self.jobId = str(uuid.uuid4())
+        self.content = content
+        self.status = QUEUED
+        self.filters: List[Dict[str, str]] = []
+        self.message: Optional[str] = None
+        self.error: Optional[str] = None
+        self.pipelineReport: Optional[Dict[str, Any]] = None
+        self.createdAt = getTimestamp()
+        self.startedAt: Optional[str] = None
+        self.finishedAt: Optional[str] = None
+
+    def toDict(self) -> Dict[str, Any]:
+        """
+            Description:
+                This method converts the job into a dict, that is returned by the job status endpoint.
+            Args:
+                None: Uses the class variables
+            Returns:
+                Dict[str, Any]: The job status
+        """
+
+        return {
+            "job_id": self.jobId,
+            "status": self.status,
+            "filters": [dict(filterProgress) for filterProgress in self.filters],
+            "completed_filters": sum(1 for filterProgress in self.filters if filterProgress["status"] == FINISHED),
+            "total_filters": len(self.filters),
+            "message": self.message,
+            "error": self.error,
+            "pipeline_report": self.pipelineReport,
+            "created_at": self.createdAt,
+            "started_at": self.startedAt,
+            "finished_at": self.finishedAt,
+        }
+
+
+class CreationJobManager():
+    """
+        Description: Runs creation pipelines asynchronously on a bounded local worker pool. Every job gets a job ID, with which the
+        status, the progress per filter and the final result message can be requested. The job status is additionally written into
+        the job store directory, so that every worker process of the server can answer a status request for the job.
+    """
+
+    def __init__(self, workers: int = JOB_WORKERS, queueDepth: int = JOB_QUEUE_DEPTH, finishedJobsToKeep: int = FINISHED_JOBS_TO_KEEP,
+                 jobStorePath: Optional[str] = JOB_STORE_PATH) -> None:
+        self.workers = workers
+        self.queueDepth = queueDepth
+        self.finishedJobsToKeep = finishedJobsToKeep
+        self.jobStorePath = jobStorePath
+        self.jobs: OrderedDict[str, CreationJob] = OrderedDict()
+        self.activeJobs = 0
+        self.lock = threading.Lock()
+        # the executor is created with the first job, so no worker threads are started before a fork of the server process
+        self.executor: Optional[ThreadPoolExecutor] = None
+
+    def submitJob(self, content: Dict[str, str]) -> CreationJob:
+        """
+            Description:
+                This method enqueues a new creation job and returns immediately.
+            Args:
+                Dict[str, str]: The selected configuration from the user (comes from the ri-visualization service)
+            Returns:
+                CreationJob: The queued job
+            Raises:
+                JobQueueFullError: If all workers are busy and the job queue is full
+        """
+
+        job = CreationJob(content)
+
+        with self.lock:
+            if self.activeJobs >= self.workers + self.queueDepth:
+                raise JobQueueFullError(f"Job queue is full ({self.queueDepth} queued jobs, {self.workers} workers)")
+
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="creation-job")
+
+            self.activeJobs += 1
+            self.jobs[job.jobId] = job
+            self.__storeJob__(job)
+            self.__removeOldJobs__()
+
+        self.executor.submit(self.__runJob__, job)
+        logger.info(f"-------Creation job {job.jobId} queued-------")
+
+        return job
+
+    def getJobStatus(self, jobId: str) -> Optional[Dict[str, Any]]:
+        """
+            Description:
+                This method returns the status of a job.
+            Args:
+                str: The job ID
+            Returns:
+                Optional[Dict[str, Any]]: The job status or None, if the job is unknown
+        """
+
+        with self.lock:
+            job = self.jobs.get(jobId)
+            if job is not None:
+                return job.toDict()
+
+        # the job can be processed by another worker process of the server
+        return self.__loadStoredJob__(jobId)
+
+    def __runJob__(self, job: CreationJob) -> None:
+
+        def updateProgress(filterName: str, filterIndex: int, filterCount: int, state: str) -> None:
+            with self.lock:
+                while len(job.filters) < filterCount:
+                    job.filters.append({"name": "", "status": "pending"})
+                job.filters[filterIndex] = {"name": filterName, "status": RUNNING if state == "started" else FINISHED}
+                self.__storeJob__(job)
+
+        with self.lock:
+            job.status = RUNNING
+            job.startedAt = getTimestamp()
+            self.__storeJob__(job)
+
+        logger.info(f"-------Creation job {job.jobId} started-------")
+
+        try:
+            relevanceClassifier = RelevanceClassifier()
+            resultMessage = relevanceClassifier.startCreationPipeline(job.content, updateProgress)
+
+            with self.lock:
+                job.status = FINISHED
+                job.message = resultMessage
+                job.pipelineReport = relevanceClassifier.pipelineReport
+
+            logger.info(f"-------Creation job {job.jobId} finished: {resultMessage}-------")
+
+        except Exception as e:
+            logger.exception(f"Creation job {job.jobId} failed")
+
+            with self.lock:
+                job.status = FAILED
+                job.error = f"{type(e).__name__}: {e}"
+
+        finally:
+            with self.lock:
+                job.finishedAt = getTimestamp()
+                job.content = {}  # the job content can be large and is not needed anymore
+                self.activeJobs -= 1
+                self.__storeJob__(job)
+
+    def __removeOldJobs__(self) -> None:
+        finishedJobIds = [jobId for jobId, job in self.jobs.items() if job.status in (FINISHED, FAILED)]
+        for jobId in finishedJobIds[:max(0, len(finishedJobIds) - self.finishedJobsToKeep)]:
+            del self.jobs[jobId]
+            if self.jobStorePath:
+                Path(self.jobStorePath, f"{jobId}.json").unlink(missing_ok=True)
+
+    def __storeJob__(self, job: CreationJob) -> None:
+        if not self.jobStorePath:
+            return
+
+        try:
+            Path(self.jobStorePath).mkdir(parents=True, exist_ok=True)
+            temporaryPath = Path(self.jobStorePath, f"{job.jobId}.json.{os.getpid()}.tmp")
+            temporaryPath.write_text(json.dumps(job.toDict()))
+            os.replace(temporaryPath, Path(self.jobStorePath, f"{job.jobId}.json"))
+        except OSError:
+            logger.exception(f"Status of creation job {job.jobId} could not be stored")
+
+    def __loadStoredJob__(self, jobId: str) -> Optional[Dict[str, Any]]:
+        if not self.jobStorePath:
+            return None
+
+        try:
+            # only job IDs, that were created by the CreationJobManager, are looked up in the job store
+            jobStoreFile = Path(self.jobStorePath, f"{uuid.UUID(jobId)}.json")
+            return cast(Dict[str, Any], json.loads(jobStoreFile.read_text()))
+        except (ValueError, OSError):
+            return None
+
+
+creationJobManager = CreationJobManager()
@@ -1,13 +1,19 @@
-from typing import Dict, cast
+from concurrent.futures import Future, wait
+from typing import Any, Callable, Dict, List, Optional, cast
 
 from omegaconf import DictConfig
 
 from main.connector.ForeignComponentRelevanceClassifierRestConnectorRequester import ForeignComponentRelevanceClassifierRestConnectorRequester
+from main.connector.OutboundExecutor import outboundExecutor
 from main.structure.DataModels import Annotation
 from main.structure.Factories.ConfigurationFactory import ConfigurationFactory
+from main.structure.Factories.FilterFactory import FilterFactory
 from main.structure.Factories.PipelineFactory import PipelineFactory
+from main.structure.Filters.PredictionFilter import LABELS, PredictionFilter
 from main.tooling.AnnotationMapper import AnnotationMapper
 from main.tooling.Logger import logging_setup
+from main.tooling.ModelRegistry import modelRegistry
+from main.tooling.PredictionCache import predictionCaches
 
 logger = logging_setup(__name__)
 
@@ -21,6 +27,7 @@ class RelevanceClassifier():
         self.foreignComponentRequester = ForeignComponentRelevanceClassifierRestConnectorRequester()
         self.pipelineFactory = PipelineFactory()
         self.configurationFactory = ConfigurationFactory()
+        self.pipelineReport: Optional[Dict[str, Any]] = None
 
     def startTrainingPipeline(self, conf: DictConfig) -> None:
         """
@@ -36,14 +43,15 @@ class RelevanceClassifier():
         trainingPipeline = self.pipelineFactory.__create__("TrainingPipeline", conf=conf)
         trainingPipeline.__process__()
 
-    def startCreationPipeline(self, content: Dict[str, str]) -> str:
+    def startCreationPipeline(self, content: Dict[str, str], progressCallback: Optional[Callable[[str, int, int, str], None]] = None) -> str:
         """
             Description:
                 This method delegates the creation.
             Args:
                 Dict[str, str]: The selected configuration from the user (comes from the ri-visualization service)
+                Optional[Callable[[str, int, int, str], None]]: Is handed into the creation pipeline to report the progress per filter
             Returns:
-                str: A message, that outlines what was created
+                str: A message, that outlines what was created (the report of the creation pipeline is kept as "pipelineReport")
         """
 
         try:
@@ -56,7 +64,8 @@ class RelevanceClassifier():
 
             annotation = self.initializeAndGetAnnotation(content)
             creationPipeline = self.pipelineFactory.__create__("CreationPipeline", conf=conf, content=content, annotation=annotation)
-            finishedAnnotation = creationPipeline.__process__()
+            finishedAnnotation = creationPipeline.__process__(progressCallback)
+            self.pipelineReport = creationPipeline.report
 
             self.foreignComponentRequester.storeAnnotationRequest(finishedAnnotation)
             return "New annotation successfully created!"
@@ -67,7 +76,8 @@ class RelevanceClassifier():
             sentenceTokenizationEnabledForAnnotation = True
             annotation = self.foreignComponentRequester.tokenizeAnnotationRequest(content["dataset"], sentenceTokenizationEnabledForAnnotation)
             creationPipeline = self.pipelineFactory.__create__("CreationPipeline", conf=conf, content=content, annotation=annotation)
-            finishedAnnotation, newGeneratedDataset = creationPipeline.__process__()
+            finishedAnnotation, newGeneratedDataset = creationPipeline.__process__(progressCallback)
+            self.pipelineReport = creationPipeline.report
 
             if newGeneratedDataset:
                 self.foreignComponentRequester.storeDatasetRequest(newGeneratedDataset)
@@ -80,12 +90,22 @@ class RelevanceClassifier():
 
             annotation = self.initializeAndGetAnnotation(content)
             creationPipeline = self.pipelineFactory.__create__("CreationPipeline", conf=conf, content=content, annotation=annotation)
-            finishedAnnotation, newGeneratedDataset = creationPipeline.__process__()
 
-            self.foreignComponentRequester.storeAnnotationRequest(finishedAnnotation)
+            finishedAnnotation, newGeneratedDataset = creationPipeline.__process__(progressCallback)
+            self.pipelineReport = creationPipeline.report
+
+            # the annotation is only stored, after the whole pipeline succeeded, so a failed dataset creation stores no annotation;
+            # the annotation and the dataset are uploaded concurrently
+            storeRequests: List[Future] = [outboundExecutor.submit(self.foreignComponentRequester.storeAnnotationRequest, finishedAnnotation)]
+            if newGeneratedDataset:
+                storeRequests.append(outboundExecutor.submit(self.foreignComponentRequester.storeDatasetRequest, newGeneratedDataset))
+
+            # the job is only finished, when all uploads are finished
+            wait(storeRequests)
+            for storeRequest in storeRequests:
+                storeRequest.result()
 
             if newGeneratedDataset:
-                self.foreignComponentRequester.storeDatasetRequest(newGeneratedDataset)
                 return "New dataset and annotation successfully created!"
 
             return "New dataset contains no informative sentences and is therefor not created! New annotation successfully created!"
@@ -93,6 +113,32 @@ class RelevanceClassifier():
         else:
             raise ValueError(f"Invalid Conf Name: {conf.name}")
 
+    def predictSentences(self, sentences: List[str]) -> List[Dict[str, Any]]:
+        """
+            Description:
+                This method delegates the relevance prediction for a list of sentences. In contrast to the creation, no annotation
+                is initialized or stored, the sentences are handed directly into the PredictionFilter.
+            Args:
+                List[str]: The sentences
+            Returns:
+                List[Dict[str, Any]]: For every sentence, the sentence, the predicted label and the class probabilities
+        """
+
+        conf = self.configurationFactory.__create__("OnlyPrediction")
+        predictionFilter = cast(PredictionFilter, FilterFactory().__create__("PredictionFilter", conf=conf))
+
+        probabilities = predictionFilter.predictProbabilities(sentences)
+
+        predictions = []
+        for sentence, sentenceProbabilities in zip(sentences, probabilities, strict=True):
+            predictions.append({
+                "sentence": sentence,
+                "label": LABELS[sentenceProbabilities.index(max(sentenceProbabilities))],
+                "probabilities": dict(zip(LABELS, sentenceProbabilities)),
+            })
+
+        return predictions
+
     def initializeAndGetAnnotation(self, content: Dict[str, str]) -> Annotation:
         """
             Description:
@@ -132,3 +178,49 @@ class RelevanceClassifier():
         wordBasedAnnotation = annotationMapper.mapRelevantSentences2WordBasedAnnotation()
 
         self.foreignComponentRequester.storeAnnotationRequest(wordBasedAnnotation)
+
+    def reloadModel(self, modelName: Optional[str] = None) -> str:
+        """
+            Description:
+                This method replaces the resident model in the model registry with the model, that is currently stored in the model
+                directory (e.g. after a new model was downloaded from MLflow), without restarting the service.
+            Args:
+                Optional[str]: The model name. If no model name is given, the "model_name" of the creation configuration is used
+            Returns:
+                str: A message, that outlines which model was reloaded
+        """
+
+        if modelName is None:
+            modelName = self.configurationFactory.__create__("OnlyAnnotation").model_name
+
+        modelRegistry.reloadModel(modelName)
+
+        return f"Model {modelName} successfully reloaded!"
+
+    def unloadModel(self, modelName: Optional[str] = None) -> str:
+        """
+            Description:
+                This method removes the resident model from the model registry. The model is loaded again with the next prediction.
+            Args:
+                Optional[str]: The model name. If no model name is given, the "model_name" of the creation configuration is used
+            Returns:
+                str: A message, that outlines which model was unloaded
+        """
+
+        if modelName is None:
+            modelName = self.configurationFactory.__create__("OnlyAnnotation").model_name
+
+        if modelRegistry.unloadModel(modelName):
+            return f"Model {modelName} successfully unloaded!"
+
+        return f"Model {modelName} was not loaded!"
+
+    def getPredictionCacheStatistics(self) -> Dict[str, Dict[str, int]]:
+        """
+            Description:
+                This method returns the number of entries and the hit and miss counts of the prediction caches of this process.
+            Returns:
+                Dict[str, Dict[str, int]]: The statistics for every prediction cache ("memory" or the path of the SQLite database)
+        """
+
+        return {cacheName or "memory": predictionCache.getStatistics() for cacheName, predictionCache in list(predictionCaches.items())}
@@ -1,18 +1,112 @@
-from flask import Flask, Response, json, jsonify, request
+import os
+import time
+from typing import Any
 
+from flask import Flask, Response, abort, g, jsonify, make_response, request
+from flask.json.provider import DefaultJSONProvider
+
+from main.behavior.CreationJobManager import JobQueueFullError, creationJobManager
 from main.behavior.RelevanceClassifier import RelevanceClassifier
+from main.tooling.JsonCodec import GZIP, GZIP_MIN_BYTES, acceptsGzip, compressPayload, decompressPayload, dumpsJson, loadsJson
 from main.tooling.Logger import logging_setup
+from main.tooling.Metrics import HTTP_REQUEST_LATENCY, HTTP_REQUESTS, generateMetrics, updateProcessMemory
 
 # from flask_cors import CORS
 
 
 logger = logging_setup(__name__)
 
+MAX_SENTENCES_PER_PREDICTION_REQUEST = int(os.getenv("RC_MAX_SENTENCES_PER_PREDICTION_REQUEST", "10000"))
+
+
+class JsonCodecProvider(DefaultJSONProvider):
+    """
+        Description: Encodes and decodes the JSON of flask (e.g. jsonify) with the JsonCodec.
+    """
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return dumpsJson(obj).decode("utf-8")
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        return loadsJson(s)
+
+
 app = Flask(__name__)
+app.json = JsonCodecProvider(app)
 # cors only for local testing
 # cors = CORS(app)
 
 
+@app.before_request
+def start_request_timer() -> None:
+    g.requestStartTime = time.perf_counter()
+
+
+@app.after_request
+def record_request_metrics(response: Response) -> Response:
+    # the endpoint is the route pattern (e.g. /hitec/classify/relevance/jobs/<jobId>), so the number of label values is bounded
+    endpoint = request.url_rule.rule if request.url_rule is not None else "unmatched"
+    if endpoint != "/metrics":
+        HTTP_REQUESTS.labels(endpoint, request.method, str(response.status_code)).inc()
+        HTTP_REQUEST_LATENCY.labels(endpoint, request.method).observe(time.perf_counter() - g.get("requestStartTime", time.perf_counter()))
+        updateProcessMemory()
+    return response
+
+
+@app.after_request
+def compress_response(response: Response) -> Response:
+    # large responses are compressed, if the client accepts gzip
+    uncompressible = response.direct_passthrough or response.status_code < 200 or response.status_code in (204, 304)
+    if uncompressible or "Content-Encoding" in response.headers or not acceptsGzip(request.headers.get("Accept-Encoding")):
+        return response
+
+    data = response.get_data()
+    if len(data) >= GZIP_MIN_BYTES:
+        response.set_data(compressPayload(data))
+        response.headers["Content-Encoding"] = GZIP
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+def readJsonBody() -> Any:
+    """
+        Description:
+            Decodes the JSON body of the request, which is gzip-compressed, if the "Content-Encoding" header is "gzip". Other encodings
+            are answered with 415, so the client can send the body uncompressed, invalid bodies with 400.
+        Returns:
+            Any: The decoded body
+    """
+
+    try:
+        data = decompressPayload(request.get_data(), request.headers.get("Content-Encoding"))
+    except ValueError as e:
+        abort(make_response(jsonify({"message": str(e)}), 415))
+    except (OSError, EOFError) as e:
+        abort(make_response(jsonify({"message": f"Invalid gzip-compressed body: {e}"}), 400))
+
+    try:
+        return loadsJson(data)
+    except ValueError as e:
+        abort(make_response(jsonify({"message": f"Invalid JSON body: {e}"}), 400))
+
+
+def readModelName() -> str:
+    """
+        Description:
+            Reads the "model_name" of the JSON body of a model request. A missing or invalid model name is answered with 400.
+        Returns:
+            str: The model name
+    """
+
+    content = readJsonBody()
+    modelName = content.get("model_name") if isinstance(content, dict) else None
+
+    if not isinstance(modelName, str) or not modelName:
+        abort(make_response(jsonify({"message": "Expected a JSON object with the key 'model_name'"}), 400))
+
+    return modelName
+
+
 class ComponentRelevanceClassifierRestConnectorProvider():
     """
         Description: Entrypoint for calling the RelevanceClassificationService.
@@ -22,11 +116,59 @@ class ComponentRelevanceClassifierRestConnectorProvider():
     def classify_relevance() -> Response:  # type: ignore
         app.logger.debug("/hitec/classify/relevance/run called")
 
-        content = json.loads(request.data.decode("utf-8"))
+        content = readJsonBody()
+
+        try:
+            job = creationJobManager.submitJob(content)
+        except JobQueueFullError as e:
+            app.logger.warning(str(e))
+            return make_response(jsonify({"message": str(e)}), 503)
+
+        result = dict()
+        result.update({"message": "Relevance classification job queued!", "job_id": job.jobId, "status_url": f"/hitec/classify/relevance/jobs/{job.jobId}"})
+        app.logger.info(result)
+
+        return make_response(jsonify(result), 202)
+
+    @app.route("/hitec/classify/relevance/jobs/<jobId>", methods=["GET"])
+    def get_job_status(jobId: str) -> Response:  # type: ignore
+        app.logger.debug(f"/hitec/classify/relevance/jobs/{jobId} called")
+
+        jobStatus = creationJobManager.getJobStatus(jobId)
+
+        if jobStatus is None:
+            return make_response(jsonify({"message": f"Job {jobId} not found"}), 404)
+
+        return jsonify(jobStatus)
+
+    @app.route("/hitec/classify/relevance/predict", methods=["POST"])
+    def predict_relevance() -> Response:  # type: ignore
+        app.logger.debug("/hitec/classify/relevance/predict called")
+
+        content = readJsonBody()
+        sentences = content.get("sentences") if isinstance(content, dict) else content
+
+        if not isinstance(sentences, list) or not all(isinstance(sentence, str) for sentence in sentences):
+            return make_response(jsonify({"message": "Expected a JSON array of sentences or an object with the key 'sentences'"}), 400)
+
+        if len(sentences) > MAX_SENTENCES_PER_PREDICTION_REQUEST:
+            return make_response(jsonify({"message": f"Too many sentences, at most {MAX_SENTENCES_PER_PREDICTION_REQUEST} sentences per request are allowed"}), 413)
+
+        relevanceClassifier = RelevanceClassifier()
+
+        predictions = relevanceClassifier.predictSentences(sentences)
+
+        return jsonify(predictions)
+
+    @app.route("/hitec/classify/relevance/model/reload", methods=["POST"])
+    def reload_model() -> Response:  # type: ignore
+        app.logger.debug("/hitec/classify/relevance/model/reload called")
+
+        modelName = readModelName()
 
         relevanceClassifier = RelevanceClassifier()
 
-        resultMessage = relevanceClassifier.startCreationPipeline(content)
+        resultMessage = relevanceClassifier.reloadModel(modelName)
 
         result = dict()
         result.update({"message": resultMessage})
@@ -34,6 +176,36 @@ class ComponentRelevanceClassifierRestConnectorProvider():
 
         return jsonify(result)
 
+    @app.route("/hitec/classify/relevance/model/unload", methods=["POST"])
+    def unload_model() -> Response:  # type: ignore
+        app.logger.debug("/hitec/classify/relevance/model/unload called")
+
+        modelName = readModelName()
+
+        relevanceClassifier = RelevanceClassifier()
+
+        resultMessage = relevanceClassifier.unloadModel(modelName)
+
+        result = dict()
+        result.update({"message": resultMessage})
+        app.logger.info(result)
+
+        return jsonify(result)
+
+    @app.route("/hitec/classify/relevance/prediction-cache", methods=["GET"])
+    def get_prediction_cache_statistics() -> Response:  # type: ignore
+        app.logger.debug("/hitec/classify/relevance/prediction-cache called")
+
+        relevanceClassifier = RelevanceClassifier()
+
+        return jsonify(relevanceClassifier.getPredictionCacheStatistics())
+
+    @app.route("/metrics", methods=["GET"])
+    def get_metrics() -> Response:  # type: ignore
+        metrics, contentType = generateMetrics()
+
+        return Response(metrics, content_type=contentType)
+
     @app.route("/hitec/classify/relevance/status", methods=["GET"])
     def get_status() -> Response:  # type: ignore
         try:
@@ -1,37 +1,180 @@
-from typing import Dict, List, cast
+import os
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple, Union, cast
 
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import ConnectionError
+from urllib3.util.retry import Retry
 
 from main.structure.DataModels import Annotation, Dataset
+from main.tooling.JsonCodec import GZIP, GZIP_MIN_BYTES, compressChunks, compressPayload, countStreamedItems, dumpsJson, iterJsonChunks, loadsJson
 from main.tooling.Logger import logging_setup
+from main.tooling.Metrics import measureOutboundCall
 
 logger = logging_setup(__name__)
 
 
-BASE_URL = "https://feed-uvl.ifi.uni-heidelberg.de"
+# the services are configured with environment variables, e.g. RC_SERVICE_BASE_URL=http://localhost:9684 for the local stand-in
+# service (see benchmarks/local_standin_service.py) or the URLs of the single services for a local deployment:
+# RC_STORAGE_SERVICE_URL=http://localhost:9684, RC_ORCHESTRATION_SERVICE_URL=http://localhost:9709,
+# RC_ANNOTATION_SERVICE_URL=http://localhost:9665
+BASE_URL = os.getenv("RC_SERVICE_BASE_URL", "https://feed-uvl.ifi.uni-heidelberg.de").rstrip("/")
+STORAGE_SERVICE_URL = os.getenv("RC_STORAGE_SERVICE_URL", BASE_URL).rstrip("/")
+ORCHESTRATION_SERVICE_URL = os.getenv("RC_ORCHESTRATION_SERVICE_URL", BASE_URL).rstrip("/")
+ANNOTATION_SERVICE_URL = os.getenv("RC_ANNOTATION_SERVICE_URL", BASE_URL).rstrip("/")
+
+ANNOTATION_GET_ENDPOINT = f"{STORAGE_SERVICE_URL}/hitec/repository/concepts/annotation/name/"
+ANNOTATION_POST_ENDPOINT = f"{STORAGE_SERVICE_URL}/hitec/repository/concepts/store/annotation/"
+ANNOTATION_INITIALIZE_ENDPOINT = f'{ORCHESTRATION_SERVICE_URL}/hitec/orchestration/concepts/annotationinit/'
+ANNOTATION_TOKENIZE_ENDPOINT = f"{ANNOTATION_SERVICE_URL}/hitec/annotation/tokenize/"
+DATASET_POST_ENDPOINT = f"{STORAGE_SERVICE_URL}/hitec/repository/concepts/store/dataset/"
+
+HTTP_POOL_SIZE = int(os.getenv("RC_HTTP_POOL_SIZE", "10"))
+HTTP_CONNECT_TIMEOUT_SECONDS = float(os.getenv("RC_HTTP_CONNECT_TIMEOUT_SECONDS", "5"))
+HTTP_READ_TIMEOUT_SECONDS = float(os.getenv("RC_HTTP_READ_TIMEOUT_SECONDS", "300"))
+HTTP_RETRIES = int(os.getenv("RC_HTTP_RETRIES", "3"))
+HTTP_BACKOFF_FACTOR = float(os.getenv("RC_HTTP_BACKOFF_FACTOR", "0.5"))
+RETRY_STATUS_CODES = (429, 502, 503, 504)
+# "auto" sends large payloads gzip-compressed and falls back to uncompressed payloads for endpoints, which reject them, "true" always
+# compresses large payloads, "false" never. Compression is opt-in, because a peer, which ignores the "Content-Encoding" header, fails
+# to parse the compressed payload with another status than 415 (e.g. 400 or 500), which can not be told apart from other failures
+HTTP_REQUEST_COMPRESSION = os.getenv("RC_HTTP_REQUEST_COMPRESSION", "false").lower()
+# only "415 Unsupported Media Type" rejects the encoding, a "400 Bad Request" is returned to the caller like for uncompressed payloads
+COMPRESSION_REJECTED_STATUS_CODES = (415,)
+# with "true", payloads with at least this number of tokens, codes and docs (or documents) are encoded incrementally while they are
+# sent with chunked transfer encoding, smaller payloads are encoded at once and sent with a Content-Length. Streaming is opt-in, because
+# a peer, which mishandles chunked bodies, does not necessarily answer with 411 or 501
+HTTP_STREAMING_UPLOAD = os.getenv("RC_HTTP_STREAMING_UPLOAD", "false").lower() == "true"
+STREAMING_UPLOAD_MIN_ITEMS = int(os.getenv("RC_STREAMING_UPLOAD_MIN_ITEMS", "100000"))
+STREAMING_REJECTED_STATUS_CODES = (411, 501)
+
+
+def createSession(poolSize: int = HTTP_POOL_SIZE, retries: int = HTTP_RETRIES, backoffFactor: float = HTTP_BACKOFF_FACTOR) -> requests.Session:
+    """
+        Description:
+            Creates a session with a pool of keep-alive connections per host, so that the connections (TCP and TLS handshake) are
+            reused across requests. Connection errors are retried for all requests, because the request was not sent. Read errors
+            and the status codes 429, 502, 503 and 504 are only retried for idempotent requests: GET and the tokenization of a
+            dataset. The retries wait backoffFactor * 2^(retry - 1) seconds.
+        Args:
+            int: The maximum number of connections per host
+            int: The maximum number of retries
+            float: The backoff factor
+        Returns:
+            requests.Session: The session
+    """
+
+    def createRetry(allowedMethods: List[str]) -> Retry:
+        # after the last retry, the last response is returned and handled like before
+        return Retry(total=retries, backoff_factor=backoffFactor, status_forcelist=RETRY_STATUS_CODES, allowed_methods=allowedMethods,
+                     raise_on_status=False)
+
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_connections=poolSize, pool_maxsize=poolSize, max_retries=createRetry(["GET"])))
+    session.mount("https://", HTTPAdapter(pool_connections=poolSize, pool_maxsize=poolSize, max_retries=createRetry(["GET"])))
+    # the longest matching prefix is used, so the tokenization (POST without side effects) is retried as well
+    session.mount(ANNOTATION_TOKENIZE_ENDPOINT, HTTPAdapter(pool_connections=poolSize, pool_maxsize=poolSize,
+                                                            max_retries=createRetry(["GET", "POST"])))
+    return session
+
+
+sessionLock = threading.Lock()
+sharedSession: Optional[requests.Session] = None
+sharedSessionPid: Optional[int] = None
+
+
+def getSharedSession() -> requests.Session:
+    """
+        Description:
+            Returns the session, that is shared by all requesters of the process. The session is created lazily in every process, so
+            that forked worker processes do not share the connections of the server process.
+        Returns:
+            requests.Session: The session
+    """
+
+    global sharedSession, sharedSessionPid
+
+    with sessionLock:
+        if sharedSession is None or sharedSessionPid != os.getpid():
+            sharedSession = createSession()
+            sharedSessionPid = os.getpid()
+        return sharedSession
+
+
+def getTimeout() -> Tuple[float, float]:
+    return (HTTP_CONNECT_TIMEOUT_SECONDS, HTTP_READ_TIMEOUT_SECONDS)
+
+
+# the endpoints, which rejected a compressed or streamed payload, are remembered for the lifetime of the process
+uncompressedEndpoints: Set[str] = set()
+unstreamedEndpoints: Set[str] = set()
+
+
+def postJson(session: requests.Session, endpoint: str, payload: Any) -> requests.Response:
+    """
+        Description:
+            Sends the payload as JSON (see JsonCodec). If enabled (see HTTP_STREAMING_UPLOAD), large payloads (see
+            STREAMING_UPLOAD_MIN_ITEMS) are encoded incrementally while they are sent (chunked transfer encoding), so the whole JSON
+            is never in memory. If enabled (see HTTP_REQUEST_COMPRESSION), payloads with at least GZIP_MIN_BYTES and all streamed
+            payloads are sent gzip-compressed. If the endpoint rejects the compressed payload (415)
+            or the streamed payload (411 or 501), the payload is sent again uncompressed or at once, and the endpoint only
+            gets such payloads afterwards. The responses are decompressed by requests, which sends "Accept-Encoding: gzip".
+        Args:
+            requests.Session: The session
+            str: The endpoint
+            Any: The payload
+        Returns:
+            requests.Response: The response
+    """
+
+    headers = {"Content-Type": "application/json"}
+
+    if HTTP_STREAMING_UPLOAD and endpoint not in unstreamedEndpoints and countStreamedItems(payload) >= STREAMING_UPLOAD_MIN_ITEMS:
+        def createBody(compressed: bool) -> Union[bytes, Iterator[bytes]]:
+            return compressChunks(iterJsonChunks(payload)) if compressed else iterJsonChunks(payload)
+
+        response = postBody(session, endpoint, createBody, True, headers)
+        if response.status_code not in STREAMING_REJECTED_STATUS_CODES:
+            return response
+
+        logger.info(f"-------{endpoint} rejected the streamed payload ({response.status_code}), send payloads at once-------")
+        unstreamedEndpoints.add(endpoint)
+
+    data = dumpsJson(payload)
+
+    def createData(compressed: bool) -> Union[bytes, Iterator[bytes]]:
+        return compressPayload(data) if compressed else data
+
+    return postBody(session, endpoint, createData, len(data) >= GZIP_MIN_BYTES, headers)
+
+
+def postBody(session: requests.Session, endpoint: str, createBody: Callable[[bool], Union[bytes, Iterator[bytes]]], compressible: bool,
+             headers: Dict[str, str]) -> requests.Response:
+    # the body is created for every attempt, because a streamed body can only be sent once
+    if HTTP_REQUEST_COMPRESSION != "false" and compressible and endpoint not in uncompressedEndpoints:
+        response = session.post(endpoint, data=createBody(True), headers=dict(headers, **{"Content-Encoding": GZIP}), timeout=getTimeout())
+        if HTTP_REQUEST_COMPRESSION == "true" or response.status_code not in COMPRESSION_REJECTED_STATUS_CODES:
+            return response
+
+        logger.info(f"-------{endpoint} rejected the compressed payload ({response.status_code}), send uncompressed payloads-------")
+        uncompressedEndpoints.add(endpoint)
 
-ANNOTATION_GET_ENDPOINT = f"{BASE_URL}/hitec/repository/concepts/annotation/name/"
-ANNOTATION_POST_ENDPOINT = f"{BASE_URL}/hitec/repository/concepts/store/annotation/"
-ANNOTATION_INITIALIZE_ENDPOINT = f'{BASE_URL}/hitec/orchestration/concepts/annotationinit/'
-ANNOTATION_TOKENIZE_ENDPOINT = f"{BASE_URL}/hitec/annotation/tokenize/"
-DATASET_POST_ENDPOINT = f"{BASE_URL}/hitec/repository/concepts/store/dataset/"
+    return session.post(endpoint, data=createBody(False), headers=headers, timeout=getTimeout())
 
 
-# ANNOTATION_GET_ENDPOINT = "http://localhost:9684/hitec/repository/concepts/annotation/name/"
-# ANNOTATION_POST_ENDPOINT = "http://localhost:9684/hitec/repository/concepts/store/annotation/"
-# ANNOTATION_INITIALIZE_ENDPOINT = 'http://localhost:9709/hitec/orchestration/concepts/annotationinit/'
-# ANNOTATION_TOKENIZE_ENDPOINT = "http://localhost:9665/hitec/annotation/tokenize/"
-# DATASET_POST_ENDPOINT = "http://localhost:9684/hitec/repository/concepts/store/dataset/"
+def getJson(response: requests.Response) -> Any:
+    return loadsJson(response.content)
 
 
 class ForeignComponentRelevanceClassifierRestConnectorRequester():
     """
-        Description: REST calls to foreign services.
+        Description: REST calls to foreign services. All requests use a pooled keep-alive session with timeouts and retries (see
+        createSession), large payloads are compressed and streamed (see postJson).
     """
 
-    def __init__(self) -> None:
-        pass
+    def __init__(self, session: Optional[requests.Session] = None) -> None:
+        self.session = session if session is not None else getSharedSession()
 
     def getAnnotationRequest(self, annotationName: str) -> Annotation:
         """
@@ -46,11 +189,13 @@ class ForeignComponentRelevanceClassifierRestConnectorRequester():
         logger.info(f"-------Get created Annotation with Name {annotationName}-------")
 
         try:
-            response = requests.get(f"{ANNOTATION_GET_ENDPOINT}{annotationName}")
+            with measureOutboundCall("get_annotation") as outboundCall:
+                response = self.session.get(f"{ANNOTATION_GET_ENDPOINT}{annotationName}", timeout=getTimeout())
+                outboundCall.statusCode = response.status_code
         except ConnectionError as e:
             print(f"ConnectionError: Failed to connect to the uvl-storage-concepts service: {e}")
 
-        return cast(Annotation, response.json())
+        return cast(Annotation, getJson(response))
 
     def storeAnnotationRequest(self, annotation: Annotation) -> int:
         """
@@ -65,7 +210,9 @@ class ForeignComponentRelevanceClassifierRestConnectorRequester():
         logger.info(f"-------Store extended Annotation: {annotation['name']}-------")
 
         try:
-            response = requests.post(ANNOTATION_POST_ENDPOINT, json=annotation)
+            with measureOutboundCall("store_annotation") as outboundCall:
+                response = postJson(self.session, ANNOTATION_POST_ENDPOINT, annotation)
+                outboundCall.statusCode = response.status_code
         except ConnectionError as e:
             print(f"ConnectionError: Failed to connect to the uvl-storage-concepts service: {e}")
 
@@ -88,10 +235,9 @@ class ForeignComponentRelevanceClassifierRestConnectorRequester():
         annotation = {"name": annotationName, "dataset": datasetName, "sentenceTokenizationEnabledForAnnotation": sentenceTokenizationEnabledForAnnotation}
 
         try:
-            response = requests.post(
-                ANNOTATION_INITIALIZE_ENDPOINT,
-                json=annotation,
-            )
+            with measureOutboundCall("initialize_annotation") as outboundCall:
+                response = postJson(self.session, ANNOTATION_INITIALIZE_ENDPOINT, annotation)
+                outboundCall.statusCode = response.status_code
         except ConnectionError as e:
             raise ConnectionError(f"ConnectionError: Failed to connect to the uvl-orchestration-concepts service: {e}")
 
@@ -113,14 +259,13 @@ class ForeignComponentRelevanceClassifierRestConnectorRequester():
         datasetForTokenization = {"dataset": dataset, "sentenceTokenizationEnabledForAnnotation": sentenceTokenizationEnabledForAnnotation}
 
         try:
-            response = requests.post(
-                ANNOTATION_TOKENIZE_ENDPOINT,
-                json=datasetForTokenization,
-            )
+            with measureOutboundCall("tokenize_dataset") as outboundCall:
+                response = postJson(self.session, ANNOTATION_TOKENIZE_ENDPOINT, datasetForTokenization)
+                outboundCall.statusCode = response.status_code
         except ConnectionError as e:
             print(f"ConnectionError: Failed to connect to the uvl-annotation service: {e}")
 
-        return cast(Annotation, response.json())
+        return cast(Annotation, getJson(response))
 
     def storeDatasetRequest(self, dataset: Dataset) -> int:
         """
@@ -135,7 +280,9 @@ class ForeignComponentRelevanceClassifierRestConnectorRequester():
         logger.info(f"-------Store new generated Dataset with the Name: {dataset['name']}-------")
 
         try:
-            response = requests.post(DATASET_POST_ENDPOINT, json=dataset)
+            with measureOutboundCall("store_dataset") as outboundCall:
+                response = postJson(self.session, DATASET_POST_ENDPOINT, dataset)
+                outboundCall.statusCode = response.status_code
         except ConnectionError as e:
             print(f"ConnectionError: Failed to connect to the uvl-storage-concepts service: {e}")
 
@@ -0,0 +1,60 @@
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from main.tooling.Logger import logging_setup
+
+logger = logging_setup(__name__)
+
+OUTBOUND_WORKERS = int(os.getenv("RC_OUTBOUND_WORKERS", "4"))
+# with "false", the calls run one after the other in the calling thread, like before
+CONCURRENT_OUTBOUND_CALLS = os.getenv("RC_CONCURRENT_OUTBOUND_CALLS", "true").lower() == "true"
+
+
+class OutboundExecutor():
+    """
+        Description: Runs independent calls to foreign services on a thread pool, so that they overlap with each other and with the
+        local compute of a job. The requests wait for the network without the GIL, so threads are sufficient. The thread pool is
+        created lazily in every process, so no thread is started before a fork of the server process.
+    """
+
+    def __init__(self, workers: int = OUTBOUND_WORKERS, concurrent: bool = CONCURRENT_OUTBOUND_CALLS) -> None:
+        self.workers = workers
+        self.concurrent = concurrent
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.executorPid: Optional[int] = None
+        self.lock = threading.Lock()
+
+    def submit(self, call: Callable[..., Any], *args: Any) -> Future:
+        """
+            Description:
+                This method starts the call on the thread pool and returns immediately. Without concurrency, the call runs in the
+                calling thread and the returned future is already done.
+            Args:
+                Callable[..., Any]: The call, e.g. a method of the ForeignComponentRelevanceClassifierRestConnectorRequester
+                Any: The arguments of the call
+            Returns:
+                Future: Receives the result or the exception of the call
+        """
+
+        if not self.concurrent or self.workers <= 0:
+            future: Future = Future()
+            try:
+                future.set_result(call(*args))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+        return self.__getExecutor__().submit(call, *args)
+
+    def __getExecutor__(self) -> ThreadPoolExecutor:
+        with self.lock:
+            if self.executor is None or self.executorPid != os.getpid():
+                logger.info(f"-------Start {self.workers} threads for outbound calls-------")
+                self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="outbound")
+                self.executorPid = os.getpid()
+            return self.executor
+
+
+outboundExecutor = OutboundExecutor()
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Any, Dict, List, Literal, TypedDict
+from typing import Any, Dict, List, Literal, NamedTuple, TypedDict
 
 Documents = List[Dict[Literal["text"], str]]
 
@@ -47,3 +47,14 @@ class Dataset (TypedDict):
     size: int
     documents: List[Documents]
     ground_truth: List[TruthElement]
+
+
+class DeduplicatedSentences(NamedTuple):
+    """
+        Description: The distinct sentences of an annotation, as they are handed to the PredictionFilter, together with the original
+        sentences and the index of the distinct sentence for every original sentence, so the labels can be expanded again.
+    """
+
+    uniqueSentences: List[str]
+    originalSentences: List[str]
+    uniqueIndices: List[int]
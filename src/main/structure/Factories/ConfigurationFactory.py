@@ -39,5 +39,7 @@ class ConfigurationFactory(FactoryInterface):
                 return OmegaConf.load(getConfigPath("creation_dataset_config.yaml"))
             case "AnnotationAndDataset":
                 return OmegaConf.load(getConfigPath("creation_annotation_and_dataset_config.yaml"))
+            case "OnlyPrediction":
+                return OmegaConf.load(getConfigPath("prediction_config.yaml"))
             case _:
                 raise ValueError(f"Filter '{configName}' not supported")
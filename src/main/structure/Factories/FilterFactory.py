@@ -1,21 +1,13 @@
 from typing import Any
 
 from main.structure.Factories.FactoryInterface import FactoryInterface
-from main.structure.Filters.CreateDatasetFilter import CreateDatasetFilter
-from main.structure.Filters.Excel2JSONFilter import Excel2JSONFilter
-from main.structure.Filters.ExtendAnnotationFilter import ExtendAnnotationFilter
 from main.structure.Filters.FilterInterface import FilterInterface
-from main.structure.Filters.MergeNewGeneratedJSONFilesFilter import MergeNewGeneratedJSONFilesFilter
-from main.structure.Filters.MergeOriginalJSONFilesFilter import MergeOriginalJSONFilesFilter
-from main.structure.Filters.PredictionFilter import PredictionFilter
-from main.structure.Filters.PrepareDatasetForPredictionFilter import PrepareDatasetForPredictionFilter
-from main.structure.Filters.PrepareDatasetForTrainingFilter import PrepareDatasetForTrainingFilter
-from main.structure.Filters.TrainAndEvaluateModelsFilter import TrainAndEvaluateModelsFilter
 
 
 class FilterFactory(FactoryInterface):
     """
-        Description: Factoryclass for dynamically creating filters.
+        Description: Factoryclass for dynamically creating filters. The filters are imported, when they are created, so that
+        torch, transformers, datasets and mlflow are only loaded, if a filter, that needs them, is used.
     """
 
     def __init__(self) -> None:
@@ -34,22 +26,40 @@ class FilterFactory(FactoryInterface):
 
         match filterName:
             case "Excel2JSONFilter":
+                from main.structure.Filters.Excel2JSONFilter import Excel2JSONFilter
                 return Excel2JSONFilter(kwargs["conf"])
             case "MergeOriginalJSONFilesFilter":
+                from main.structure.Filters.MergeOriginalJSONFilesFilter import MergeOriginalJSONFilesFilter
                 return MergeOriginalJSONFilesFilter(kwargs["conf"])
             case "MergeNewGeneratedJSONFilesFilter":
+                from main.structure.Filters.MergeNewGeneratedJSONFilesFilter import MergeNewGeneratedJSONFilesFilter
                 return MergeNewGeneratedJSONFilesFilter(kwargs["conf"])
             case "PrepareDatasetForTrainingFilter":
+                from main.structure.Filters.PrepareDatasetForTrainingFilter import PrepareDatasetForTrainingFilter
                 return PrepareDatasetForTrainingFilter(kwargs["conf"])
             case "TrainAndEvaluateModelsFilter":
+                from main.structure.Filters.TrainAndEvaluateModelsFilter import TrainAndEvaluateModelsFilter
                 return TrainAndEvaluateModelsFilter(kwargs["conf"])
+            case "ExportModelsToONNXFilter":
+                from main.structure.Filters.ExportModelsToONNXFilter import ExportModelsToONNXFilter
+                return ExportModelsToONNXFilter(kwargs["conf"])
             case "PrepareDatasetForPredictionFilter":
+                from main.structure.Filters.PrepareDatasetForPredictionFilter import PrepareDatasetForPredictionFilter
                 return PrepareDatasetForPredictionFilter(kwargs["annotation"])
+            case "DeduplicateSentencesFilter":
+                from main.structure.Filters.DeduplicateSentencesFilter import DeduplicateSentencesFilter
+                return DeduplicateSentencesFilter()
             case "PredictionFilter":
+                from main.structure.Filters.PredictionFilter import PredictionFilter
                 return PredictionFilter(kwargs["conf"])
+            case "ExpandDeduplicatedLabelsFilter":
+                from main.structure.Filters.ExpandDeduplicatedLabelsFilter import ExpandDeduplicatedLabelsFilter
+                return ExpandDeduplicatedLabelsFilter()
             case "ExtendAnnotationFilter":
+                from main.structure.Filters.ExtendAnnotationFilter import ExtendAnnotationFilter
                 return ExtendAnnotationFilter(kwargs["annotation"])
             case "CreateDatasetFilter":
+                from main.structure.Filters.CreateDatasetFilter import CreateDatasetFilter
                 return CreateDatasetFilter(kwargs["content"])
             case _:
                 raise ValueError(f"Filter '{filterName}' not supported")
@@ -34,17 +34,17 @@ class CreateDatasetFilter(FilterInterface):
 
         relevantDocs = []
 
+        # the lookups are built once, so the dataset is created in linear time
+        codesByToken = self.__indexCodesByToken__(annotation)
+        tokenNames = self.__indexTokenNames__(annotation)
+
         for doc in annotation['docs']:
             informativeSentencesInDoc = []
             relevantDoc = {}
             for index in range(doc['begin_index'], doc['end_index']):
-                codeForToken = self.__getCodeForToken__(index, annotation)
-                codeRelevance = codeForToken['tore']
-                if codeRelevance == INFORMATIVE:
-                    sentence = self.__getTokenName__(index, annotation)
-                    informativeSentencesInDoc.append(sentence)
-                else:
-                    pass
+                codeForToken = codesByToken.get(index)
+                if codeForToken is not None and codeForToken['tore'] == INFORMATIVE:
+                    informativeSentencesInDoc.append(tokenNames[index])
 
             if len(informativeSentencesInDoc) > 0:
                 relevantDoc["id"] = doc['name']
@@ -73,38 +73,36 @@ class CreateDatasetFilter(FilterInterface):
 
             return annotation, {}
 
-    def __getCodeForToken__(self, index: int, annotation: Annotation) -> Code:
+    def __indexCodesByToken__(self, annotation: Annotation) -> Dict[int, Code]:
         """
             Description:
-                This method gets the tokens' code.
+                This method maps every token index to the code, that starts at this token, in one pass over the codes. If several
+                codes start at the same token, the first one is used.
             Args:
                 Annotation: The finished annotation
-                int: The token index
             Returns:
-                Code: The tokens' code
+                Dict[int, Code]: The code for every token index
         """
 
+        codesByToken: Dict[int, Code] = {}
         for code in annotation['codes']:
-            if code['tokens'][0] == index:
-                codeForTokenIndex = code
-                break
+            if code['tokens']:
+                codesByToken.setdefault(code['tokens'][0], code)
 
-        return codeForTokenIndex
+        return codesByToken
 
-    def __getTokenName__(self, index: int, annotation: Annotation) -> str:
+    def __indexTokenNames__(self, annotation: Annotation) -> Dict[int, str]:
         """
             Description:
-                This method gets the tokens' name.
+                This method maps every token index to the tokens' name in one pass over the tokens.
             Args:
                 Annotation: The finished annotation
-                int: The token index
             Returns:
-                str: The tokens' name
+                Dict[int, str]: The tokens' name for every token index
         """
 
+        tokenNames: Dict[int, str] = {}
         for token in annotation['tokens']:
-            if token['index'] == index:
-                tokenName = token['name']
-                break
+            tokenNames.setdefault(token['index'], token['name'])
 
-        return tokenName
+        return tokenNames
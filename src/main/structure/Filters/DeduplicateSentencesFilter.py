@@ -0,0 +1,65 @@
+import unicodedata
+from typing import Dict, List
+
+from main.structure.DataModels import DeduplicatedSentences
+from main.structure.Filters.FilterInterface import FilterInterface
+from main.tooling.Logger import logging_setup
+
+logger = logging_setup(__name__)
+
+
+def normalizeSentence(sentence: str) -> str:
+    """
+        Description:
+            Normalizes a sentence for the deduplication. Only differences, that the uncased BERT tokenizer does not see anyway
+            (unicode composition, case and whitespace), are removed, so all sentences with the same normalized form get the same
+            prediction.
+        Args:
+            str: The sentence
+        Returns:
+            str: The normalized sentence
+    """
+
+    return " ".join(unicodedata.normalize("NFC", sentence).lower().split())
+
+
+class DeduplicateSentencesFilter(FilterInterface):
+    """
+        Description: This filter collapses identical sentences, so that every distinct sentence is predicted only once.
+        Used in the creation pipeline between the PrepareDatasetForPredictionFilter and the PredictionFilter.
+    """
+
+    def __init__(self) -> None:
+        pass
+
+    def __filter__(self, sentences: List[str]) -> DeduplicatedSentences:
+        """
+            Description:
+                This method normalizes the sentences and keeps the first occurrence of every normalized sentence.
+            Args:
+                List[str]: A list, that contains the sentences
+            Returns:
+                DeduplicatedSentences: The distinct sentences (in the order of their first occurrence) with the original sentences
+                and the index of the distinct sentence for every original sentence
+        """
+
+        logger.info("-------Start Filter 'DeduplicateSentencesFilter'-------")
+
+        uniqueSentences: List[str] = []
+        uniqueIndexByNormalizedSentence: Dict[str, int] = {}
+        uniqueIndices: List[int] = []
+
+        for sentence in sentences:
+            normalizedSentence = normalizeSentence(sentence)
+            uniqueIndex = uniqueIndexByNormalizedSentence.get(normalizedSentence)
+            if uniqueIndex is None:
+                uniqueIndex = len(uniqueSentences)
+                uniqueIndexByNormalizedSentence[normalizedSentence] = uniqueIndex
+                uniqueSentences.append(sentence)
+            uniqueIndices.append(uniqueIndex)
+
+        if sentences:
+            logger.info(f"-------{len(uniqueSentences)} distinct of {len(sentences)} sentences "
+                        f"({1 - len(uniqueSentences) / len(sentences):.1%} fewer predictions)-------")
+
+        return DeduplicatedSentences(uniqueSentences, list(sentences), uniqueIndices)
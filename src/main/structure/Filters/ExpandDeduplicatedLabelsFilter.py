@@ -0,0 +1,45 @@
+from typing import List, Tuple
+
+from main.structure.DataModels import DeduplicatedSentences
+from main.structure.Filters.FilterInterface import FilterInterface
+from main.tooling.Logger import logging_setup
+
+logger = logging_setup(__name__)
+
+
+class ExpandDeduplicatedLabelsFilter(FilterInterface):
+    """
+        Description: This filter expands the predictions for the distinct sentences back to all original sentences.
+        Used in the creation pipeline between the PredictionFilter and the ExtendAnnotationFilter.
+    """
+
+    def __init__(self) -> None:
+        pass
+
+    def __filter__(self, sentencesAndLabels: Tuple[DeduplicatedSentences, List[str]]) -> Tuple[List[str], List[str]]:
+        """
+            Description:
+                This method assigns the label of the distinct sentence to every original sentence, so the sentences and labels are
+                in the original token order again.
+            Args:
+                Tuple[DeduplicatedSentences, List[str]]: A tuple, that contains the deduplicated sentences and the relevance predictions
+                of the distinct sentences
+            Returns:
+                Tuple[List[str], List[str]]: A tuple, that contains a list with the original sentences and a list with the relevance
+                predictions
+            Raises:
+                ValueError: If the sentences were not deduplicated by the DeduplicateSentencesFilter
+        """
+
+        logger.info("-------Start Filter 'ExpandDeduplicatedLabelsFilter'-------")
+
+        deduplicatedSentences, labels = sentencesAndLabels
+
+        if not isinstance(deduplicatedSentences, DeduplicatedSentences):
+            raise ValueError("ExpandDeduplicatedLabelsFilter expects the DeduplicatedSentences of the DeduplicateSentencesFilter, "
+                             "the DeduplicateSentencesFilter has to be in the filterList before the PredictionFilter")
+
+        if len(labels) != len(deduplicatedSentences.uniqueSentences):
+            raise ValueError(f"Expected {len(deduplicatedSentences.uniqueSentences)} labels for the distinct sentences, got {len(labels)}")
+
+        return deduplicatedSentences.originalSentences, [labels[uniqueIndex] for uniqueIndex in deduplicatedSentences.uniqueIndices]
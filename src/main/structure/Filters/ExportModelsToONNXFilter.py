@@ -0,0 +1,46 @@
+from omegaconf import DictConfig
+
+from main.structure.Filters.FilterInterface import FilterInterface
+from main.tooling.Logger import logging_setup
+from main.tooling.MLflowHandler import log_mlflow_artifacts
+from main.tooling.OnnxExporter import exportModelToONNX
+
+logger = logging_setup(__name__)
+
+
+class ExportModelsToONNXFilter(FilterInterface):
+    """
+        Description: This filter converts the fine-tuned models of all folds to ONNX, so that they can be served with ONNX Runtime.
+        Used in the training pipeline after the TrainAndEvaluateModelsFilter.
+    """
+
+    def __init__(self, conf: DictConfig):
+        self.conf = conf
+
+    def __filter__(self) -> None:
+        """
+            Description:
+                This method exports the model of every fold and uploads the ONNX model into the model directory in MLflow.
+            Args:
+                None: Uses the configuration class variable
+            Returns:
+                None: The ONNX models are saved next to the models and uploaded to MLflow. Without onnx and onnxruntime, the export
+                is skipped
+        """
+
+        logger.info("-------Start Filter 'ExportModelsToONNXFilter'-------")
+
+        # onnx and onnxruntime are optional dependencies of the training, the trained models are still usable with PyTorch
+        try:
+            import onnx  # noqa: F401
+            import onnxruntime  # noqa: F401
+        except ImportError as e:
+            logger.warning(f"-------{e.name or 'onnx'} is not installed, the models are not exported to ONNX-------")
+            return
+
+        for foldNumber in range(1, self.conf.fold_number + 1):
+            modelName = f"Iteration_{str(foldNumber)}_{self.conf.project.model_name}"
+
+            onnxModelPath = exportModelToONNX(modelName)
+
+            log_mlflow_artifacts(onnxModelPath, artifactPath=modelName)
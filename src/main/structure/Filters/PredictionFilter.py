@@ -1,16 +1,24 @@
-from typing import List, Tuple
+import time
+from typing import List, Tuple, Union, cast
 
-import torch
 from omegaconf import DictConfig
-from transformers import BertForSequenceClassification, BertTokenizer
 
+from main.structure.DataModels import DeduplicatedSentences
 from main.structure.Filters.FilterInterface import FilterInterface
-from main.tooling.FileManager import getModelPath
+from main.tooling.FileManager import getPredictionCachePath
+from main.tooling.InferenceBackends import TORCH
+from main.tooling.InferenceScheduler import getInferenceScheduler
 from main.tooling.Logger import logging_setup
+from main.tooling.Metrics import INFERENCE_BATCH_LATENCY, INFERENCE_BATCH_SIZE, PREDICTED_SENTENCES
+from main.tooling.ModelRegistry import getModelKey, modelRegistry
+from main.tooling.PredictionCache import getPredictionCache
 
 logger = logging_setup(__name__)
 
 BATCH_SIZE = 100
+LABELS = ["Non-Informative", "Informative"]
+TOKEN_BUDGET = "token_budget"
+
 
 class PredictionFilter(FilterInterface):
     """
@@ -21,38 +29,163 @@ class PredictionFilter(FilterInterface):
     def __init__(self, conf: DictConfig):
         self.conf = conf
 
-    def __filter__(self, sentences: List[str]) -> Tuple[List[str], List[str]]:
+    def __filter__(self, sentences: Union[List[str], DeduplicatedSentences]) -> Tuple[Union[List[str], DeduplicatedSentences], List[str]]:
         """
             Description:
                 This method tokenizes the sentences and gives them as input to the fine-tuned model, which outputs the predictions
-                regarding the relevance of each sentence.
+                regarding the relevance of each sentence. The model is taken from the process-wide ModelRegistry, so it is only
+                loaded once. Deduplicated sentences (see DeduplicateSentencesFilter) are returned together with the predictions of
+                the distinct sentences, so the ExpandDeduplicatedLabelsFilter can expand them to the original sentences.
             Args:
-                List[str]: A list, that contains the sentences
+                Union[List[str], DeduplicatedSentences]: A list, that contains the sentences, or the deduplicated sentences
             Returns:
-                Tuple[List[str], List[str]]: A tuple, that contains a list with the original sentences and a list with the relevance
-                predictions
+                Tuple[Union[List[str], DeduplicatedSentences], List[str]]: A tuple, that contains the sentences (as they were given)
+                and a list with the relevance predictions
         """
 
         logger.info("-------Start Filter 'PredictionFilter'-------")
 
-        tokenizer = BertTokenizer.from_pretrained('bert-base-uncased')
-        finetunedModel = BertForSequenceClassification.from_pretrained(getModelPath(self.conf.model_name))
+        predictedSentences = sentences.uniqueSentences if isinstance(sentences, DeduplicatedSentences) else sentences
+        probabilities = self.predictProbabilities(predictedSentences)
 
-        predictions = []
-        for i in range(0, len(sentences), BATCH_SIZE):
-            batchSentences = sentences[i:i + BATCH_SIZE]
-            batchModelInputs = tokenizer(batchSentences, return_tensors="pt", padding=True, truncation=True)
+        predictedLabels = []
 
-            with torch.no_grad():
-                batchPredictions = torch.argmax(finetunedModel(**batchModelInputs).logits, dim=1)
-            
-            predictions.extend(batchPredictions.detach())
-            del batchModelInputs, batchPredictions
+        for sentenceProbabilities in probabilities:
+            predictedLabels.append(LABELS[sentenceProbabilities.index(max(sentenceProbabilities))])
 
+        return sentences, predictedLabels
 
-        predictedLabels = []
+    def predictProbabilities(self, sentences: List[str]) -> List[List[float]]:
+        """
+            Description:
+                This method returns the class probabilities of the sentences. If the prediction cache is enabled in the configuration,
+                only the sentences, that are not cached for the current model weights, are given to the fine-tuned model (once per
+                distinct sentence) and their probabilities are cached afterwards.
+            Args:
+                List[str]: A list, that contains the sentences
+            Returns:
+                List[List[float]]: The class probabilities for every sentence in the order of LABELS
+        """
 
-        for prediction in predictions:
-            predictedLabels.append(["Non-Informative", "Informative"][prediction.item()])
+        predictionCacheConf = self.conf.get("prediction_cache")
+        if predictionCacheConf is None or not predictionCacheConf.enabled:
+            return self.__predictUncached__(sentences)
 
-        return sentences, predictedLabels
+        modelKey = getModelKey(self.conf.model_name, self.conf.get("inference_backend", TORCH), self.conf.get("quantization"))
+        weightsDigest = modelRegistry.getModel(self.conf.model_name, self.conf.get("inference_backend", TORCH), self.conf.get("quantization")).weightsDigest
+        predictionCache = getPredictionCache(predictionCacheConf.max_entries, getPredictionCachePath() if predictionCacheConf.persistent else None)
+
+        cachedProbabilities = predictionCache.get(modelKey, weightsDigest, sentences)
+        missingSentences = list(dict.fromkeys(sentence for sentence, sentenceProbabilities in zip(sentences, cachedProbabilities) if sentenceProbabilities is None))
+
+        numberOfCachedSentences = sum(1 for sentenceProbabilities in cachedProbabilities if sentenceProbabilities is not None)
+        logger.info(f"-------Prediction cache: {numberOfCachedSentences} of {len(sentences)} sentences cached, {len(missingSentences)} sentences to predict-------")
+
+        if not missingSentences:
+            return cast(List[List[float]], cachedProbabilities)
+
+        missingProbabilities = self.__predictUncached__(missingSentences)
+        predictionCache.put(modelKey, weightsDigest, missingSentences, missingProbabilities)
+
+        predictedProbabilities = dict(zip(missingSentences, missingProbabilities))
+
+        return [sentenceProbabilities if sentenceProbabilities is not None else predictedProbabilities[sentence]
+                for sentence, sentenceProbabilities in zip(sentences, cachedProbabilities)]
+
+    def __predictUncached__(self, sentences: List[str]) -> List[List[float]]:
+        """
+            Description:
+                This method computes the class probabilities of the sentences batch-wise with the fine-tuned model. If micro-batching
+                is enabled in the configuration, the sentences are handed to the InferenceScheduler of the model and the batching
+                settings, which merges them with the sentences of concurrent requests into shared batches.
+            Args:
+                List[str]: A list, that contains the sentences
+            Returns:
+                List[List[float]]: The class probabilities for every sentence in the order of LABELS
+        """
+
+        microBatchingConf = self.conf.get("micro_batching")
+        if microBatchingConf is not None and microBatchingConf.enabled:
+            # the batching configuration changes the batches of __predictSentences__, so it is part of the scheduler key
+            batchingConf = self.conf.get("batching")
+            batchingSettings = tuple(sorted(batchingConf.items())) if batchingConf is not None else ()
+            inferenceScheduler = getInferenceScheduler(getModelKey(self.conf.model_name, self.conf.get("inference_backend", TORCH), self.conf.get("quantization")), self.__predictSentences__, microBatchingConf.max_batch_size, microBatchingConf.max_wait_ms, batchingSettings)
+            return inferenceScheduler.submit(sentences)
+
+        return self.__predictSentences__(sentences)
+
+    def __predictSentences__(self, sentences: List[str]) -> List[List[float]]:
+        """
+            Description:
+                This method tokenizes the sentences window-wise with the tokenization cache of the model, splits every window into
+                batches (see "__planBatches__") and gives the batches as input to the inference backend (PyTorch or ONNX Runtime)
+                of the fine-tuned model. The probabilities are returned in the original order of the sentences.
+            Args:
+                List[str]: The sentences
+            Returns:
+                List[List[float]]: The class probabilities for every sentence
+        """
+
+        loadedModel = modelRegistry.getModel(self.conf.model_name, self.conf.get("inference_backend", TORCH), self.conf.get("quantization"))
+
+        batchingConf = self.conf.get("batching")
+        windowSize = batchingConf.window_size if batchingConf is not None and batchingConf.mode == TOKEN_BUDGET else BATCH_SIZE
+
+        probabilities: List[List[float]] = []
+        for windowStart in range(0, len(sentences), windowSize):
+            windowEncodings = loadedModel.tokenizationCache.encode(sentences[windowStart:windowStart + windowSize])
+            windowProbabilities: List[List[float]] = [[] for _ in range(len(windowEncodings["input_ids"]))]
+
+            for batchIndices in self.__planBatches__(windowEncodings["input_ids"]):
+                batchModelInputs = loadedModel.tokenizer.pad(
+                    [{key: windowEncodings[key][index] for key in windowEncodings.keys()} for index in batchIndices],
+                    return_tensors="np"
+                )
+
+                batchStartTime = time.perf_counter()
+                batchProbabilities = loadedModel.backend.__predict__(dict(batchModelInputs))
+                INFERENCE_BATCH_LATENCY.observe(time.perf_counter() - batchStartTime)
+                INFERENCE_BATCH_SIZE.observe(len(batchIndices))
+                PREDICTED_SENTENCES.inc(len(batchIndices))
+
+                for index, sentenceProbabilities in zip(batchIndices, batchProbabilities):
+                    windowProbabilities[index] = sentenceProbabilities
+
+                del batchModelInputs, batchProbabilities
+
+            probabilities.extend(windowProbabilities)
+
+        return probabilities
+
+    def __planBatches__(self, inputIds: List[List[int]]) -> List[List[int]]:
+        """
+            Description:
+                This method splits the tokenized sentences of one window into batches. In the "fixed" batching mode, the window is one
+                batch. In the "token_budget" batching mode, the sentences are sorted by their token length and a batch is filled, as long
+                as its padded size (number of sentences * longest sentence) stays within "max_batch_tokens", so short sentences are not
+                padded to the length of a long one.
+            Args:
+                List[List[int]]: The token IDs of every sentence in the window
+            Returns:
+                List[List[int]]: The sentence indices (within the window) of every batch
+        """
+
+        batchingConf = self.conf.get("batching")
+        if batchingConf is None or batchingConf.mode != TOKEN_BUDGET:
+            return [list(range(len(inputIds)))] if inputIds else []
+
+        sortedIndices = sorted(range(len(inputIds)), key=lambda index: len(inputIds[index]))
+
+        batches: List[List[int]] = []
+        batchIndices: List[int] = []
+        for index in sortedIndices:
+            # the sentences are sorted, therefor the current sentence is the longest one of the batch
+            if batchIndices and len(inputIds[index]) * (len(batchIndices) + 1) > batchingConf.max_batch_tokens:
+                batches.append(batchIndices)
+                batchIndices = []
+            batchIndices.append(index)
+
+        if batchIndices:
+            batches.append(batchIndices)
+
+        return batches
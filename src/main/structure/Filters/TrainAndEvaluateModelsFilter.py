@@ -1,3 +1,4 @@
+from pathlib import Path
 from typing import Any, Dict, List, Tuple, Union
 
 import pandas as pd
@@ -5,13 +6,15 @@ from datasets import Dataset, DatasetDict
 from omegaconf import DictConfig
 from sklearn.metrics import accuracy_score, confusion_matrix, f1_score, precision_score, recall_score
 from sklearn.model_selection import GroupKFold
-from transformers import BertForSequenceClassification, BertTokenizer, DataCollatorWithPadding, Trainer, TrainingArguments
+from transformers import BertForSequenceClassification, DataCollatorWithPadding, Trainer, TrainingArguments
 from transformers.trainer_utils import EvalPrediction
 
 from main.structure.Filters.FilterInterface import FilterInterface
 from main.tooling.FileManager import getModelPath, getPathForNewGeneratedFiles
 from main.tooling.Logger import logging_setup
 from main.tooling.MLflowHandler import computeExperimentMetricsForMLFlowUpload, createConfusionMatrixPngForMLFlowUpload, createTrainTestFileForMLFlowUpload, log_mlflow_artifacts
+from main.tooling.Quantization import TEST_DATASET_FILE_NAME
+from main.tooling.TokenizationCache import TokenizationCache, loadTokenizer
 
 logger = logging_setup(__name__)
 
@@ -62,36 +65,34 @@ class TrainAndEvaluateModelsFilter(FilterInterface):
 
         metricsList = []
 
+        # the tokenizer is loaded once for all folds, and the dataframes are tokenized once, every fold selects its rows by index
+        tokenizer = loadTokenizer(self.conf.tokenizer.name, self.conf.tokenizer.get("use_fast", True))
+        tokenizationCache = TokenizationCache(tokenizer)
+
+        tokenizedTrainDataset = self.__tokenizeDataFrame__(initialTrainDF, tokenizationCache)
+        if self.conf.datasources.different_train_test_files:
+            tokenizedTestDataset = self.__tokenizeDataFrame__(initialTestDF, tokenizationCache)
+        else:
+            tokenizedTestDataset = tokenizedTrainDataset
+
         # Splitting the data
         for foldNumber, (train_idx, test_idx) in enumerate(gkfTrainTestDataset.split(initialTrainDF, initialTrainDF['labels'], initialTrainDF['group']), start=1):
             logger.info(f"-------Starting Iteration: {foldNumber}-------")
 
-            trainDF = initialTrainDF.iloc[train_idx]
-
             if not self.conf.datasources.different_train_test_files:
-                testDF = initialTrainDF.iloc[test_idx]
+                testIDX = test_idx
+                testDF = initialTrainDF.iloc[testIDX]
 
             else:
                 testIDX = testIdxList[foldNumber - 1]
                 testDF = initialTestDF.iloc[testIDX]
 
-            trainDataset = Dataset.from_pandas(trainDF)
-            testDataset = Dataset.from_pandas(testDF)
+            # the rows of the datasets have the positions of the dataframes, so the folds are the same as with iloc
+            datasetTrainTest = DatasetDict({'train': tokenizedTrainDataset.select(train_idx), 'test': tokenizedTestDataset.select(testIDX)})
 
-            datasetTrainTest = DatasetDict({'train': trainDataset, 'test': testDataset})
-            datasetTrainTest['train'] = datasetTrainTest['train'].remove_columns([col for col in datasetTrainTest['train'].column_names if col not in ['text', 'labels']])
-            datasetTrainTest['test'] = datasetTrainTest['test'].remove_columns([col for col in datasetTrainTest['test'].column_names if col not in ['text', 'labels']])
+            createTrainTestFileForMLFlowUpload(foldNumber, datasetTrainTest.select_columns(['text', 'labels']))
 
-            createTrainTestFileForMLFlowUpload(foldNumber, datasetTrainTest)
-
-            tokenizer = BertTokenizer.from_pretrained(self.conf.tokenizer.name)
-
-            def preprocess_function(data: Dict[str, List[Any]]) -> Dict[str, List[Any]]:
-                return tokenizer(data["text"], truncation=True, padding=True)
-
-            tokenized_dataset = datasetTrainTest.map(preprocess_function, batched=True)
-
-            tokenized_dataset = tokenized_dataset.remove_columns(["text", "token_type_ids"])
+            tokenized_dataset = datasetTrainTest.remove_columns(["text"])
 
             data_collator = DataCollatorWithPadding(tokenizer=tokenizer)
 
@@ -165,6 +166,9 @@ class TrainAndEvaluateModelsFilter(FilterInterface):
                 output_dir=getModelPath(name=modelName)
             )
 
+            # the test split is stored with the model, so that the predictions of a quantized model can be validated against it
+            testDF[['text', 'labels']].to_csv(Path(getModelPath(name=modelName)) / TEST_DATASET_FILE_NAME, index=False)
+
             log_mlflow_artifacts(getModelPath(name=modelName))
 
             # ##################################
@@ -185,3 +189,26 @@ class TrainAndEvaluateModelsFilter(FilterInterface):
             logger.info(f"-------Finished Iteration: {foldNumber}-------")
 
         computeExperimentMetricsForMLFlowUpload(metricsList)
+
+    def __tokenizeDataFrame__(self, df: pd.DataFrame, tokenizationCache: TokenizationCache) -> Dataset:
+        """
+            Description:
+                This method converts the sentences and labels of the dataframe into one Arrow-backed dataset and tokenizes them once
+                for all folds. The folds select their rows with "Dataset.select", which only stores the indices and does not copy
+                the data. The sentences are not padded here, the DataCollatorWithPadding pads every batch.
+            Args:
+                pd.DataFrame: The dataframe with the columns "text" and "labels"
+                TokenizationCache: The tokenization cache
+            Returns:
+                Dataset: The dataset with the columns "text", "labels", "input_ids" and "attention_mask" in the order of the dataframe
+        """
+
+        logger.info(f"-------Tokenize {len(df)} sentences for all folds-------")
+
+        dataset = Dataset.from_pandas(df[['text', 'labels']], preserve_index=False)
+
+        def preprocess_function(data: Dict[str, List[Any]]) -> Dict[str, List[Any]]:
+            encodings = tokenizationCache.encode(data["text"])
+            return {"input_ids": encodings["input_ids"], "attention_mask": encodings["attention_mask"]}
+
+        return dataset.map(preprocess_function, batched=True)
@@ -1,4 +1,4 @@
-from typing import Dict, List
+from typing import Any, Dict, List, Optional
 
 from omegaconf import DictConfig
 
@@ -19,6 +19,7 @@ class CreationPipeline(Pipeline):
     def __init__(self, conf: DictConfig, content: Dict[str, str], annotation: Annotation):
         self.conf = conf
         self.pipelineFilters: List[FilterInterface] = []
+        self.report: Optional[Dict[str, Any]] = None
         self.__compose__(conf, content, annotation)
 
     def __compose__(self, conf: DictConfig, content: Dict[str, str], annotation: Annotation) -> None:
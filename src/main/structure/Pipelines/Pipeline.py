@@ -1,12 +1,15 @@
 from __future__ import annotations
 
+import json
 from abc import ABC, abstractmethod
-from typing import Any, List
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, List, Optional
 
 from omegaconf import DictConfig
 
 from main.structure.Filters.FilterInterface import FilterInterface
-from main.tooling.FileManager import cleanup
+from main.tooling.FileManager import cleanup, createRunId, runScope
+from main.tooling.Instrumentation import PipelineInstrumentation
 from main.tooling.Logger import logging_setup
 
 logger = logging_setup(__name__)
@@ -22,36 +25,63 @@ class Pipeline(ABC):
     def __init__(self, conf: DictConfig) -> None:
         self.conf = conf
         self.pipelineFilters: List[FilterInterface] = []
+        self.report: Optional[Dict[str, Any]] = None
 
     @abstractmethod
     def __compose__(self) -> None:
         raise NotImplementedError("Subclasses must implement this method!")
 
-    def __process__(self) -> Any:
+    def __process__(self, progressCallback: Optional[Callable[[str, int, int, str], None]] = None) -> Any:
         """
             Description:
                 This method processes the pipeline filters. This is done via a loop, that hands in the return object of the previous filter
-                to the next filter. At the end, the new generated files are deleted.
+                to the next filter. Every filter is measured (see PipelineInstrumentation), the report is logged, kept as "report" and
+                uploaded to MLflow for training runs. Training runs use their own working directory (see FileManager.runScope), which
+                is deleted at the end, also if a filter fails.
             Args:
-                None: The class variables are used
+                Optional[Callable[[str, int, int, str], None]]: Is called with the filter name, the filter index, the number of filters
+                and the state ("started" or "finished") before and after every filter, e.g. to report the progress of a job
             Returns:
                 Any: Depends on the pipeline, what is returned
 
         """
 
-        logger.info("-------Pipeline started-------")
+        # training runs work in their own working directory, so several runs and the serving path can share a host
+        runContext = runScope(self.conf.get("run_id") or createRunId(self.conf.project.run_name)) if self.conf.training else nullcontext()
 
-        filterResult = None
-        for filter in self.pipelineFilters:
-            if filterResult is not None:
-                # Call the function with the return values as arguments
-                filterResult = filter.__filter__(filterResult)
-            else:
-                # Call the function without any arguments
-                filterResult = filter.__filter__()
+        with runContext:
+            try:
+                logger.info("-------Pipeline started-------")
 
-        if (self.conf.training):
-            cleanup()
+                instrumentation = PipelineInstrumentation(self.conf)
+
+                filterResult = None
+                for filterIndex, filter in enumerate(self.pipelineFilters):
+                    if progressCallback is not None:
+                        progressCallback(type(filter).__name__, filterIndex, len(self.pipelineFilters), "started")
+
+                    if filterResult is not None:
+                        # Call the function with the return values as arguments
+                        filterInput = filterResult
+                        filterResult = instrumentation.measureFilter(type(filter).__name__, filterInput, lambda: filter.__filter__(filterInput))
+                    else:
+                        # Call the function without any arguments
+                        filterResult = instrumentation.measureFilter(type(filter).__name__, None, lambda: filter.__filter__())
+
+                    if progressCallback is not None:
+                        progressCallback(type(filter).__name__, filterIndex, len(self.pipelineFilters), "finished")
+
+                self.report = instrumentation.getReport()
+                logger.info(f"-------Pipeline report: {json.dumps(self.report)}-------")
+
+                if (self.conf.training):
+                    # mlflow is only imported for training runs
+                    from main.tooling.MLflowHandler import logPipelineReportToMLflow
+                    logPipelineReportToMLflow(self.report)
+            finally:
+                if (self.conf.training):
+                    # the working directory of the run is deleted, even if a filter failed
+                    cleanup()
 
         logger.info("-------Pipeline finished-------")
 
@@ -1,4 +1,4 @@
-from typing import List
+from typing import Any, Dict, List, Optional
 
 from omegaconf import DictConfig
 
@@ -18,6 +18,7 @@ class TrainingPipeline(Pipeline):
     def __init__(self, conf: DictConfig):
         self.conf = conf
         self.pipelineFilters: List[FilterInterface] = []
+        self.report: Optional[Dict[str, Any]] = None
         self.__compose__(conf)
 
     def __compose__(self, conf: DictConfig) -> None:
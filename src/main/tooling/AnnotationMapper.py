@@ -1,18 +1,21 @@
+import os
 from copy import deepcopy
-from typing import List, Tuple
 from datetime import datetime
+from itertools import chain, compress, islice
+from typing import Any, Dict, List, Optional, Tuple, cast
 
-import nltk
-from nltk.tokenize import word_tokenize
+import numpy as np
 
 from main.structure.DataModels import Annotation
+from main.tooling.WordTokenizer import CachedWordTokenizer, wordTokenizer
 
 INFORMATIVE = "Informative"
 NON_INFORMATIVE = "Non-Informative"
 NO_CODE = "0"
 
-# Download the NLTK tokenizer data
-nltk.download('punkt')
+LEGACY = "legacy"
+VECTORIZED = "vectorized"
+ANNOTATION_MAPPER_ENGINE = os.getenv("RC_ANNOTATION_MAPPER_ENGINE", VECTORIZED)
 
 
 class AnnotationMapper():
@@ -22,8 +25,12 @@ class AnnotationMapper():
         or irrelevant.
     """
 
-    def __init__(self, wordBasedAnnotation: Annotation, sentenceBasedAnnotation: Annotation) -> None:
-        self.wordBasedAnnotation = deepcopy(wordBasedAnnotation)  # avoid changing original wordBasedAnnotation
+    def __init__(self, wordBasedAnnotation: Annotation, sentenceBasedAnnotation: Annotation, engine: str = ANNOTATION_MAPPER_ENGINE,
+                 cachedWordTokenizer: CachedWordTokenizer = wordTokenizer) -> None:
+        self.engine = engine
+        self.cachedWordTokenizer = cachedWordTokenizer
+        # avoid changing original wordBasedAnnotation, the vectorized engine creates a new annotation and needs no copy
+        self.wordBasedAnnotation = wordBasedAnnotation if engine == VECTORIZED else deepcopy(wordBasedAnnotation)
         self.sentenceBasedAnnotation = sentenceBasedAnnotation
 
     def mapRelevantSentences2WordBasedAnnotation(self) -> Annotation:
@@ -40,6 +47,37 @@ class AnnotationMapper():
 
         wordsAndLabels = self.wordTokenizeSentencesAndLabelWords(sentencesAndLabels)
 
+        mappedAnnotation = self.__mapVectorized__(wordsAndLabels) if self.engine == VECTORIZED else None
+
+        if mappedAnnotation is None:
+            mappedAnnotation = self.__mapLegacy__(wordsAndLabels)
+
+        mappedAnnotation["name"] = mappedAnnotation["name"] + "_Relevance_Mapping"
+        
+        now = datetime.now()
+        
+        formattedNow = now.strftime("%Y-%m-%dT%H:%M:%SZ")
+        
+        mappedAnnotation["uploaded_at"] = formattedNow  # type: ignore[typeddict-item]
+
+        self.wordBasedAnnotation = mappedAnnotation
+
+        return mappedAnnotation
+
+    def __mapLegacy__(self, wordsAndLabels: List[Tuple]) -> Annotation:
+        """
+            Description:
+                Maps the labels onto the tokens step by step on a copy of the wordBasedAnnotation. The steps scan the token list
+                per doc and per code, so they take quadratic time for large annotations.
+            Args:
+                List[Tuple]: wordsAndLabels (the output from wordTokenizeSentencesAndLabelWords())
+            Returns:
+                Annotation: The mapped wordBasedAnnotation
+        """
+
+        if self.engine == VECTORIZED:
+            self.wordBasedAnnotation = deepcopy(self.wordBasedAnnotation)
+
         self.extendTokensParameters(wordsAndLabels)
 
         tokensToRemoveIndices = self.extractTokensToRemove()
@@ -55,16 +93,88 @@ class AnnotationMapper():
 
         self.refreshTokenIndices()
 
-        self.wordBasedAnnotation["name"] = self.wordBasedAnnotation["name"] + "_Relevance_Mapping"
-        
-        now = datetime.now()
-        
-        formattedNow = now.strftime("%Y-%m-%dT%H:%M:%SZ")
-        
-        self.wordBasedAnnotation["uploaded_at"] = formattedNow
-
         return self.wordBasedAnnotation
 
+    def __mapVectorized__(self, wordsAndLabels: List[Tuple]) -> Optional[Annotation]:
+        """
+            Description:
+                Maps the labels onto the tokens in linear time and produces exactly the annotation of the legacy steps: a keep mask
+                for the tokens, prefix sums of the removed tokens for the new token indices and the shifts of the doc boundaries and
+                one pass over all code token references. The original wordBasedAnnotation is not changed, only the kept tokens,
+                docs and codes are copied.
+
+                The legacy steps assume, that the token indices are the positions in the token list and that every token gets a
+                label. Other annotations are left to the legacy steps, so that their output stays the same.
+            Args:
+                List[Tuple]: wordsAndLabels (the output from wordTokenizeSentencesAndLabelWords())
+            Returns:
+                Optional[Annotation]: The mapped wordBasedAnnotation or None, if the annotation has to be mapped by the legacy steps
+        """
+
+        annotation = self.wordBasedAnnotation
+        tokens = annotation["tokens"]
+        numberOfTokens = len(tokens)
+
+        if len(wordsAndLabels) < numberOfTokens or any(token["index"] != position for position, token in enumerate(tokens)):
+            return None
+
+        removedTokens = np.fromiter((label == NON_INFORMATIVE or label == NO_CODE for _, label in islice(wordsAndLabels, numberOfTokens)),
+                                    dtype=bool, count=numberOfTokens)
+        keptTokens = ~removedTokens
+
+        # removedBefore[k] is the number of removed tokens before position k, the last entry of the padded arrays stands for
+        # token indices outside of the annotation
+        removedBefore = np.concatenate(([0], np.cumsum(removedTokens)))
+        removedTokensPadded = np.append(removedTokens, False)
+        newTokenIndicesPadded = np.append(np.cumsum(keptTokens) - 1, -1)
+
+        # docs: the boundaries are interpreted like the slice tokens[begin_index:end_index] in adjustDocs, every doc is shifted by the
+        # removed tokens of all docs before it and its end additionally by its own removed tokens
+        docs = annotation["docs"]
+        beginIndices = np.fromiter((doc["begin_index"] for doc in docs), dtype=np.int64, count=len(docs))
+        endIndices = np.fromiter((doc["end_index"] for doc in docs), dtype=np.int64, count=len(docs))
+        sliceStarts = np.clip(np.where(beginIndices < 0, beginIndices + numberOfTokens, beginIndices), 0, numberOfTokens)
+        sliceStops = np.clip(np.where(endIndices < 0, endIndices + numberOfTokens, endIndices), 0, numberOfTokens)
+        removedInDocs = np.where(sliceStops > sliceStarts, removedBefore[sliceStops] - removedBefore[sliceStarts], 0)
+        removedUpToDocs = np.cumsum(removedInDocs)
+        newBeginIndices = (beginIndices - (removedUpToDocs - removedInDocs)).tolist()
+        newEndIndices = (endIndices - removedUpToDocs).tolist()
+
+        mappedDocs = [dict(doc, begin_index=newBeginIndex, end_index=newEndIndex)
+                      for doc, newBeginIndex, newEndIndex in zip(docs, newBeginIndices, newEndIndices) if newBeginIndex != newEndIndex]
+
+        # codes: like adjustCodes, a code is kept, if one of its token references is not removed (references outside of the
+        # annotation count as not removed), and like refreshTokenIndices, the references are then mapped to the new token indices
+        # and references outside of the annotation are dropped
+        codes = annotation["codes"]
+        tokensPerCode = np.fromiter((len(code["tokens"]) for code in codes), dtype=np.int64, count=len(codes))
+        codeTokens = np.fromiter(chain.from_iterable(code["tokens"] for code in codes), dtype=np.int64, count=int(tokensPerCode.sum()))
+        codeIds = np.repeat(np.arange(len(codes)), tokensPerCode)
+
+        insideAnnotation = (codeTokens >= 0) & (codeTokens < numberOfTokens)
+        paddedCodeTokens = np.where(insideAnnotation, codeTokens, numberOfTokens)
+        removedReferences = removedTokensPadded[paddedCodeTokens]
+        keptCodes = np.bincount(codeIds[~removedReferences], minlength=len(codes)) > 0
+
+        remainingReferences = insideAnnotation & ~removedReferences
+        newCodeTokens = newTokenIndicesPadded[paddedCodeTokens[remainingReferences]].tolist()
+        codeOffsets = np.concatenate(([0], np.cumsum(np.bincount(codeIds[remainingReferences], minlength=len(codes))))).tolist()
+
+        mappedCodes: List[Dict[str, Any]] = []
+        for codeId in np.flatnonzero(keptCodes).tolist():
+            mappedCode = {key: (newCodeTokens[codeOffsets[codeId]:codeOffsets[codeId + 1]] if key == "tokens" else deepcopy(value))
+                          for key, value in codes[codeId].items()}
+            mappedCode["index"] = len(mappedCodes)
+            mappedCodes.append(mappedCode)
+
+        mappedTokens = [dict(token, index=newTokenIndex) for newTokenIndex, token in enumerate(compress(tokens, keptTokens.tolist()))]
+
+        mappedParts: Dict[str, Any] = {"tokens": mappedTokens, "docs": mappedDocs, "codes": mappedCodes}
+        mappedAnnotation = {key: mappedParts[key] if key in mappedParts else deepcopy(value) for key, value in annotation.items()}
+        mappedAnnotation["size"] = len(mappedDocs)
+
+        return cast(Annotation, mappedAnnotation)
+
     def extractSentencesAndLabels(self) -> List[Tuple]:
         """
             Description:
@@ -85,7 +195,8 @@ class AnnotationMapper():
             Description:
                 Word-tokenize each sentence from the sentencesAndLabels tuple list, assign the same label to a
                 word as the sentence in which it is contained and put this into a data structure
-                sentence.
+                sentence. Repeated sentences are tokenized only once and large inputs can be tokenized on several processes
+                (see CachedWordTokenizer), the order of the words stays the same.
             Args:
                 List[Tuple]: sentencesAndLabels (the output from extractSentencesAndLabels())
             Returns:
@@ -93,9 +204,10 @@ class AnnotationMapper():
                 "[(Word1FromSentence1>, <RelevanceFromSentence1>), (<Word2FromSentence1>, <RelevanceFromSentence1>), ..., (<Word1FromSentence2>, <RelevanceFromSentence2>), (<Word2FromSentence2>, <RelevanceFromSentence2>), ...]"
         """
 
+        wordsOfSentences = self.cachedWordTokenizer.tokenize([sentence for sentence, _ in sentencesAndLabels])
+
         wordsAndLabels = []
-        for sentence, label in sentencesAndLabels:
-            words = word_tokenize(sentence)
+        for (_, label), words in zip(sentencesAndLabels, wordsOfSentences):
             wordsAndLabels.extend([(word, label) for word in words])
         return wordsAndLabels
 
@@ -1,6 +1,11 @@
 import os
 import shutil
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
 from pathlib import Path
+from typing import Iterator, Optional
 
 from main.tooling.Logger import logging_setup
 
@@ -10,6 +15,50 @@ ORIGINAL_FILES_PATH = "src/data/"
 TEMP_FILES_PATH = "src/data/temp/"
 MODEL_PATH = "src/main/models/"
 CONFIG_FILES_PATH = "src/main/configs/"
+PREDICTION_CACHE_PATH = "src/data/cache/prediction_cache.sqlite"
+# every run (e.g. a training pipeline) gets its own working directory "<RUNS_PATH><run id>/" with a "temp/" and a "models/" directory,
+# so runs can share a host with each other and with the serving path
+RUNS_PATH = os.getenv("RC_RUNS_PATH", "src/data/runs/")
+# reloads and unloads of a model are announced to the other server processes (e.g. gunicorn workers) with a version file per model
+MODEL_VERSIONS_PATH = os.getenv("RC_MODEL_VERSIONS_PATH", "src/data/model_versions/")
+
+# the working directory of the run of the current thread (or task), None outside of a run
+currentRunPath: ContextVar[Optional[str]] = ContextVar("currentRunPath", default=None)
+
+
+def createRunId(runName: str) -> str:
+    return f"{runName}_{time.strftime('%Y%m%d-%H%M%S')}_{uuid.uuid4().hex[:8]}"
+
+
+@contextmanager
+def runScope(runId: str) -> Iterator[Path]:
+    """
+        Description:
+            Within this context, the new generated files and the models are stored in the working directory of the run, instead
+            of the shared temp and model directories, and "cleanup" only deletes this working directory.
+        Args:
+            str: The run id (see createRunId), which has to be unique for the runs on the host
+        Returns:
+            Iterator[Path]: The working directory of the run
+    """
+
+    runPath = Path(RUNS_PATH, runId)
+    token = currentRunPath.set(f"{runPath}/")
+    logger.info(f"-------Run {runId} uses the working directory {runPath}-------")
+    try:
+        yield runPath
+    finally:
+        currentRunPath.reset(token)
+
+
+def getTempFilesPath() -> str:
+    runPath = currentRunPath.get()
+    return runPath + "temp/" if runPath is not None else TEMP_FILES_PATH
+
+
+def getModelDirectoryPath() -> str:
+    runPath = currentRunPath.get()
+    return runPath + "models/" if runPath is not None else MODEL_PATH
 
 
 def getPathForOriginalDatasets(name: str) -> Path:
@@ -17,11 +66,10 @@ def getPathForOriginalDatasets(name: str) -> Path:
 
 
 def getPathForNewGeneratedFiles(name: str) -> Path:
+    tempFilesPath = getTempFilesPath()
+    Path(tempFilesPath).mkdir(parents=True, exist_ok=True)
 
-    if not Path(TEMP_FILES_PATH).exists():
-        Path(TEMP_FILES_PATH).mkdir()
-
-    return Path(TEMP_FILES_PATH + name)
+    return Path(tempFilesPath + name)
 
 
 def getConfigPath(name: str) -> str:
@@ -29,21 +77,33 @@ def getConfigPath(name: str) -> str:
 
 
 def getModelPath(name: str) -> Path:
-    if not Path(MODEL_PATH).exists():
-        Path(MODEL_PATH).mkdir()
+    modelDirectoryPath = getModelDirectoryPath()
+    Path(modelDirectoryPath).mkdir(parents=True, exist_ok=True)
+
+    return modelDirectoryPath + name  # type: ignore
+
 
-    return MODEL_PATH + name  # type: ignore
+def getModelVersionsPath() -> str:
+    return MODEL_VERSIONS_PATH
+
+
+def getPredictionCachePath() -> str:
+    return PREDICTION_CACHE_PATH
 
 
 def cleanup() -> None:
+    runPath = currentRunPath.get()
+    if runPath is not None:
+        if os.path.isdir(runPath):
+            logger.info(f"-------Cleanup new generated Files and models of the run ({runPath})-------")
+            shutil.rmtree(runPath)
+        else:
+            logger.info(f"-------No new generated Files and models of the run to clean ({runPath})-------")
+        return
+
+    # outside of a run, the model directory is kept, because it contains the models of the serving path
     if os.path.isdir(TEMP_FILES_PATH):
         logger.info("-------Cleanup new generated Files (temp directory)-------")
         shutil.rmtree(TEMP_FILES_PATH)
     else:
         logger.info("-------No new generated Files to clean (temp directory)-------")
-
-    if os.path.isdir(MODEL_PATH):
-        logger.info("-------Cleanup models (model directory)-------")
-        shutil.rmtree(MODEL_PATH)
-    else:
-        logger.info("-------No new trained model to clean (model directory)-------")
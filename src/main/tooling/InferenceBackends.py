@@ -0,0 +1,67 @@
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+from main.tooling.Logger import logging_setup
+
+logger = logging_setup(__name__)
+
+TORCH = "torch"
+ONNX = "onnx"
+ONNX_MODEL_FILE_NAME = "model.onnx"
+
+
+def softmax(logits: np.ndarray) -> np.ndarray:
+    exponentials = np.exp(logits - logits.max(axis=1, keepdims=True))
+    return exponentials / exponentials.sum(axis=1, keepdims=True)
+
+
+class InferenceBackend(ABC):
+    """
+        Description: Interface for inference backends. Defines, that every backend has to implement the "__predict__" method, which
+        computes the class probabilities of one padded batch. The class order is the label order of the fine-tuned model
+        (["Non-Informative", "Informative"]) for every backend.
+    """
+
+    @abstractmethod
+    def __predict__(self, batchModelInputs: Dict[str, np.ndarray]) -> List[List[float]]:
+        pass
+
+
+class TorchInferenceBackend(InferenceBackend):
+    """
+        Description: Inference with the fine-tuned BertForSequenceClassification in PyTorch.
+    """
+
+    def __init__(self, model: Any) -> None:
+        self.model = model
+
+    def __predict__(self, batchModelInputs: Dict[str, np.ndarray]) -> List[List[float]]:
+        import torch
+
+        with torch.no_grad():
+            logits = self.model(**{key: torch.from_numpy(value) for key, value in batchModelInputs.items()}).logits
+
+        return torch.softmax(logits, dim=1).tolist()
+
+
+class OnnxInferenceBackend(InferenceBackend):
+    """
+        Description: Inference with ONNX Runtime on the model, that was exported by the OnnxExporter. Does not import torch.
+    """
+
+    def __init__(self, modelDirectory: str) -> None:
+        import onnxruntime
+
+        sessionOptions = onnxruntime.SessionOptions()
+        sessionOptions.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+        self.session = onnxruntime.InferenceSession(str(Path(modelDirectory) / ONNX_MODEL_FILE_NAME), sessionOptions, providers=["CPUExecutionProvider"])
+        self.inputNames = [modelInput.name for modelInput in self.session.get_inputs()]
+
+    def __predict__(self, batchModelInputs: Dict[str, np.ndarray]) -> List[List[float]]:
+        logits = self.session.run(["logits"], {name: batchModelInputs[name].astype(np.int64) for name in self.inputNames})[0]
+
+        return softmax(logits).tolist()
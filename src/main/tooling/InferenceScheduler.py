@@ -0,0 +1,161 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from main.tooling.Logger import logging_setup
+
+logger = logging_setup(__name__)
+
+PredictBatchFunction = Callable[[List[str]], List[List[float]]]
+
+
+class PendingRequest():
+    """
+        Description: The sentences of one caller, that wait in the InferenceScheduler, and the future, which receives their results.
+    """
+
+    def __init__(self, sentences: List[str]) -> None:
+        self.sentences = sentences
+        self.results: List[Optional[List[float]]] = [None] * len(sentences)
+        self.nextIndex = 0
+        self.remaining = len(sentences)
+        self.enqueuedAt = time.monotonic()
+        self.future: Future = Future()
+
+
+class InferenceScheduler():
+    """
+        Description: Merges the sentences of concurrent requests into shared batches (dynamic micro-batching). A batch is processed,
+        as soon as it contains maxBatchSize sentences or the oldest waiting sentence has waited maxWaitMs milliseconds. The results
+        of a batch are routed back to the callers in the order of their sentences.
+    """
+
+    def __init__(self, predictBatch: PredictBatchFunction, maxBatchSize: int, maxWaitMs: float) -> None:
+        self.predictBatch = predictBatch
+        self.maxBatchSize = maxBatchSize
+        self.maxWaitSeconds = maxWaitMs / 1000
+        self.pendingRequests: Deque[PendingRequest] = deque()
+        self.pendingSentences = 0
+        self.condition = threading.Condition()
+        # the worker thread is started with the first request, so no thread is started before a fork of the server process
+        self.workerThread: Optional[threading.Thread] = None
+
+    def submit(self, sentences: List[str]) -> List[List[float]]:
+        """
+            Description:
+                This method enqueues the sentences and blocks, until all of them were processed in one or more shared batches.
+            Args:
+                List[str]: The sentences of one caller
+            Returns:
+                List[List[float]]: The class probabilities for every sentence in the order of the sentences
+        """
+
+        if not sentences:
+            return []
+
+        pendingRequest = PendingRequest(sentences)
+
+        with self.condition:
+            if self.workerThread is None or not self.workerThread.is_alive():
+                self.workerThread = threading.Thread(target=self.__run__, name="inference-scheduler", daemon=True)
+                self.workerThread.start()
+
+            self.pendingRequests.append(pendingRequest)
+            self.pendingSentences += len(sentences)
+            self.condition.notify()
+
+        return pendingRequest.future.result()
+
+    def __run__(self) -> None:
+        while True:
+            batchSentences, batchParts = self.__collectBatch__()
+
+            try:
+                batchResults = self.predictBatch(batchSentences)
+            except Exception as e:
+                logger.exception("Inference of a micro-batch failed")
+                for pendingRequest, _, _ in batchParts:
+                    if not pendingRequest.future.done():
+                        pendingRequest.future.set_exception(e)
+                continue
+
+            resultIndex = 0
+            for pendingRequest, startIndex, numberOfSentences in batchParts:
+                pendingRequest.results[startIndex:startIndex + numberOfSentences] = batchResults[resultIndex:resultIndex + numberOfSentences]
+                pendingRequest.remaining -= numberOfSentences
+                resultIndex += numberOfSentences
+
+                if pendingRequest.remaining == 0 and not pendingRequest.future.done():
+                    pendingRequest.future.set_result(pendingRequest.results)
+
+    def __collectBatch__(self) -> Tuple[List[str], List[Tuple[PendingRequest, int, int]]]:
+        """
+            Description:
+                This method waits for the next batch. It is complete, if it is full or the waiting time of the oldest sentence is over.
+            Args:
+                None: Uses the pending requests
+            Returns:
+                Tuple[List[str], List[Tuple[PendingRequest, int, int]]]: The batch sentences and for every part of the batch, the
+                request, the start index in the request and the number of sentences
+        """
+
+        with self.condition:
+            while not self.pendingRequests:
+                self.condition.wait()
+
+            deadline = self.pendingRequests[0].enqueuedAt + self.maxWaitSeconds
+            while self.pendingSentences < self.maxBatchSize:
+                remainingWaitSeconds = deadline - time.monotonic()
+                if remainingWaitSeconds <= 0:
+                    break
+                self.condition.wait(remainingWaitSeconds)
+
+            batchSentences: List[str] = []
+            batchParts = []
+            while self.pendingRequests and len(batchSentences) < self.maxBatchSize:
+                pendingRequest = self.pendingRequests[0]
+                startIndex = pendingRequest.nextIndex
+                numberOfSentences = min(self.maxBatchSize - len(batchSentences), len(pendingRequest.sentences) - startIndex)
+
+                batchSentences.extend(pendingRequest.sentences[startIndex:startIndex + numberOfSentences])
+                batchParts.append((pendingRequest, startIndex, numberOfSentences))
+                pendingRequest.nextIndex += numberOfSentences
+
+                if pendingRequest.nextIndex == len(pendingRequest.sentences):
+                    self.pendingRequests.popleft()
+
+            self.pendingSentences -= len(batchSentences)
+
+        return batchSentences, batchParts
+
+
+inferenceSchedulers: Dict[Tuple[Any, ...], InferenceScheduler] = {}
+inferenceSchedulersLock = threading.Lock()
+
+
+def getInferenceScheduler(modelKey: str, predictBatch: PredictBatchFunction, maxBatchSize: int, maxWaitMs: float,
+                          batchingSettings: Tuple[Any, ...] = ()) -> InferenceScheduler:
+    """
+        Description:
+            Returns the process-wide InferenceScheduler of the model and the batching settings, so that requests for the same model
+            share their batches. Configurations with other batching settings (or another predictBatch behavior) get their own
+            scheduler, because the scheduler keeps the predictBatch function and the settings of its first caller.
+        Args:
+            str: The model key (see ModelRegistry.getModelKey)
+            PredictBatchFunction: Computes the class probabilities for one batch, used if the scheduler does not exist yet
+            int: The maximum number of sentences per batch
+            float: The maximum time in milliseconds, that a sentence waits for further sentences
+            Tuple[Any, ...]: Further settings, which change the result of predictBatch (e.g. the "batching" configuration)
+        Returns:
+            InferenceScheduler: The scheduler of the model and the batching settings
+    """
+
+    schedulerKey = (modelKey, maxBatchSize, maxWaitMs, batchingSettings)
+
+    with inferenceSchedulersLock:
+        if schedulerKey not in inferenceSchedulers:
+            logger.info(f"-------Start micro-batching for model '{modelKey}' (max batch size {maxBatchSize}, max wait {maxWaitMs}ms)-------")
+            inferenceSchedulers[schedulerKey] = InferenceScheduler(predictBatch, maxBatchSize, maxWaitMs)
+        return inferenceSchedulers[schedulerKey]
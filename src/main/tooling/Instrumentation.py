@@ -0,0 +1,163 @@
+import cProfile
+import io
+import os
+import pstats
+import resource
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from omegaconf import DictConfig
+
+from main.tooling.Logger import logging_setup
+
+logger = logging_setup(__name__)
+
+PROFILES_PATH = "src/data/profiles/"
+CPROFILE = "cProfile"
+PYINSTRUMENT = "pyinstrument"
+PROFILE_LINES_TO_LOG = 30
+
+
+def countItems(value: Any) -> Optional[int]:
+    """
+        Description:
+            Counts the items, that are handed from one filter to the next one: the rows of a dataframe, the elements of a list, the
+            tokens of an annotation and the documents of a dataset. Tuples are counted by their first element.
+        Args:
+            Any: The input or output of a filter
+        Returns:
+            Optional[int]: The number of items or None, if the value can not be counted
+    """
+
+    if value is None:
+        return 0
+    if isinstance(value, tuple):
+        return countItems(value[0]) if value else 0
+    if isinstance(value, dict):
+        if "tokens" in value:
+            return len(value["tokens"])
+        if "documents" in value:
+            return len(value["documents"])
+    # pandas is not imported for the instrumentation, if it is not imported yet, the value can not be a dataframe
+    pandas = sys.modules.get("pandas")
+    if isinstance(value, (list, dict)) or (pandas is not None and isinstance(value, pandas.DataFrame)):
+        return len(value)
+    return None
+
+
+def getPeakRSSMegabytes() -> float:
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peakRSS = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peakRSS / (1024 * 1024) if sys.platform == "darwin" else peakRSS / 1024
+
+
+def getRSSMegabytes() -> Optional[float]:
+    # /proc/self/statm contains the current resident set size in pages (Linux only)
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class PipelineInstrumentation():
+    """
+        Description: Measures every filter of a pipeline run: wall time, CPU time, change of the RSS (sampled before and after the
+        filter, Linux only), new peak RSS (how far the filter raised the peak RSS of the process) and the number of items in and out.
+        CPU time and RSS are measured for the whole process, so they include concurrent jobs and the threads of torch. Optionally, one filter (instrumentation.profile_filter in the configuration) is run under a profiler.
+    """
+
+    def __init__(self, conf: DictConfig) -> None:
+        instrumentationConf = conf.get("instrumentation")
+        self.profileFilter: Optional[str] = instrumentationConf.get("profile_filter") if instrumentationConf is not None else None
+        self.profiler: str = instrumentationConf.get("profiler", CPROFILE) if instrumentationConf is not None else CPROFILE
+        self.pipelineName: str = conf.get("name", "pipeline")
+        self.filterReports: List[Dict[str, Any]] = []
+        self.startTime = time.perf_counter()
+        self.startCPUTime = time.process_time()
+
+    def measureFilter(self, filterName: str, filterInput: Any, runFilter: Callable[[], Any]) -> Any:
+        """
+            Description:
+                This method runs one filter and records its measurements.
+            Args:
+                str: The filter name
+                Any: The input of the filter (is only counted)
+                Callable[[], Any]: Runs the filter
+            Returns:
+                Any: The result of the filter
+        """
+
+        rssBefore = getRSSMegabytes()
+        peakRSSBefore = getPeakRSSMegabytes()
+        startTime = time.perf_counter()
+        startCPUTime = time.process_time()
+
+        if filterName == self.profileFilter:
+            filterResult = self.__profile__(filterName, runFilter)
+        else:
+            filterResult = runFilter()
+
+        rssAfter = getRSSMegabytes()
+        self.filterReports.append({
+            "filter": filterName,
+            "wall_seconds": round(time.perf_counter() - startTime, 4),
+            "cpu_seconds": round(time.process_time() - startCPUTime, 4),
+            "rss_delta_mb": round(rssAfter - rssBefore, 1) if rssBefore is not None and rssAfter is not None else None,
+            # ru_maxrss only grows, so this is 0, if the filter stayed below the peak of the filters (or jobs) before
+            "new_peak_rss_mb": round(getPeakRSSMegabytes() - peakRSSBefore, 1),
+            "items_in": countItems(filterInput),
+            "items_out": countItems(filterResult),
+        })
+
+        return filterResult
+
+    def getReport(self) -> Dict[str, Any]:
+        """
+            Description:
+                This method returns the report of the pipeline run.
+            Returns:
+                Dict[str, Any]: The measurements of every filter and the totals of the pipeline run
+        """
+
+        return {
+            "pipeline": self.pipelineName,
+            "wall_seconds": round(time.perf_counter() - self.startTime, 4),
+            "cpu_seconds": round(time.process_time() - self.startCPUTime, 4),
+            "peak_rss_mb": round(getPeakRSSMegabytes(), 1),
+            "filters": [dict(filterReport) for filterReport in self.filterReports],
+        }
+
+    def __profile__(self, filterName: str, runFilter: Callable[[], Any]) -> Any:
+        Path(PROFILES_PATH).mkdir(parents=True, exist_ok=True)
+        profilePath = Path(PROFILES_PATH) / f"{filterName}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+
+        if self.profiler == PYINSTRUMENT:
+            try:
+                from pyinstrument import Profiler
+            except ImportError:
+                logger.warning("-------pyinstrument is not installed, cProfile is used instead-------")
+            else:
+                instrumentProfiler = Profiler()
+                instrumentProfiler.start()
+                try:
+                    return runFilter()
+                finally:
+                    instrumentProfiler.stop()
+                    profilePath.with_suffix(".html").write_text(instrumentProfiler.output_html())
+                    logger.info(f"-------Profile of filter '{filterName}' saved as {profilePath.with_suffix('.html')}-------")
+
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            return runFilter()
+        finally:
+            profile.disable()
+            profile.dump_stats(str(profilePath.with_suffix(".prof")))
+
+            profileSummary = io.StringIO()
+            pstats.Stats(profile, stream=profileSummary).sort_stats("cumulative").print_stats(PROFILE_LINES_TO_LOG)
+            logger.info(f"-------Profile of filter '{filterName}' saved as {profilePath.with_suffix('.prof')}-------\n{profileSummary.getvalue()}")
@@ -0,0 +1,160 @@
+import gzip
+import json
+import os
+import zlib
+from functools import cache
+from types import ModuleType
+from typing import Any, Dict, Iterable, Iterator, Optional, Union
+
+from main.tooling.Logger import logging_setup
+
+logger = logging_setup(__name__)
+
+# "auto" uses orjson, if it is installed, and the json module of the standard library otherwise
+JSON_CODEC = os.getenv("RC_JSON_CODEC", "auto").lower()
+# payloads below this size are sent uncompressed, because compressing them takes longer than sending them
+GZIP_MIN_BYTES = int(os.getenv("RC_GZIP_MIN_BYTES", "65536"))
+# level 1 compresses annotations nearly as well as the default level 9 in a fraction of the time
+GZIP_LEVEL = int(os.getenv("RC_GZIP_LEVEL", "1"))
+
+GZIP = "gzip"
+# the lists of annotations (tokens, codes, docs) and datasets (documents), that are encoded incrementally in streamed payloads
+STREAMED_KEYS = ("tokens", "codes", "docs", "documents")
+STREAM_CHUNK_ITEMS = 10000
+
+
+@cache
+def getOrjson() -> Optional[ModuleType]:
+    """
+        Description:
+            Returns the orjson module, if the fast codec is selected and installed (optional dependency).
+        Returns:
+            Optional[ModuleType]: The orjson module or None for the json module of the standard library
+    """
+
+    if JSON_CODEC == "stdlib":
+        return None
+
+    try:
+        import orjson
+    except ImportError:
+        if JSON_CODEC == "orjson":
+            raise
+        return None
+
+    logger.info("-------Use orjson for the JSON payloads-------")
+    return orjson
+
+
+def dumpsJson(obj: Any) -> bytes:
+    """
+        Description:
+            Encodes an object as UTF-8 JSON. With orjson, objects, which it does not support (e.g. integers with more than 64 bit), are
+            encoded with the json module of the standard library.
+        Args:
+            Any: The object
+        Returns:
+            bytes: The JSON
+    """
+
+    orjson = getOrjson()
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass
+
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loadsJson(data: Union[bytes, str]) -> Any:
+    """
+        Description:
+            Decodes UTF-8 JSON.
+        Args:
+            Union[bytes, str]: The JSON
+        Returns:
+            Any: The object
+    """
+
+    orjson = getOrjson()
+    if orjson is not None:
+        return orjson.loads(data)
+
+    return json.loads(data)
+
+
+def compressPayload(data: bytes) -> bytes:
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def decompressPayload(data: bytes, contentEncoding: Optional[str]) -> bytes:
+    """
+        Description:
+            Decompresses a payload according to its "Content-Encoding" header.
+        Args:
+            bytes: The payload
+            Optional[str]: The value of the "Content-Encoding" header
+        Returns:
+            bytes: The uncompressed payload
+    """
+
+    if contentEncoding is not None and contentEncoding.strip().lower() == GZIP:
+        return gzip.decompress(data)
+
+    if contentEncoding not in (None, "", "identity"):
+        raise ValueError(f"Unsupported Content-Encoding: {contentEncoding}")
+
+    return data
+
+
+def countStreamedItems(payload: Any) -> int:
+    if not isinstance(payload, dict):
+        return 0
+    return sum(len(value) for key, value in payload.items() if key in STREAMED_KEYS and isinstance(value, list))
+
+
+def iterJsonChunks(payload: Dict[str, Any], chunkItems: int = STREAM_CHUNK_ITEMS) -> Iterator[bytes]:
+    """
+        Description:
+            Encodes a payload incrementally as the same JSON like dumpsJson: the lists of the STREAMED_KEYS are encoded in chunks of
+            "chunkItems" items, so the whole JSON is never in memory.
+        Args:
+            Dict[str, Any]: The payload, e.g. an annotation or a dataset
+            int: The number of list items per chunk
+        Returns:
+            Iterator[bytes]: The parts of the JSON
+    """
+
+    yield b"{"
+    for keyIndex, (key, value) in enumerate(payload.items()):
+        yield (b"," if keyIndex > 0 else b"") + dumpsJson(key) + b":"
+
+        if key in STREAMED_KEYS and isinstance(value, list):
+            yield b"["
+            for start in range(0, len(value), chunkItems):
+                # the brackets of the encoded chunk are removed, the items are joined with the items of the chunk before
+                yield (b"," if start > 0 else b"") + dumpsJson(value[start:start + chunkItems])[1:-1]
+            yield b"]"
+        else:
+            yield dumpsJson(value)
+    yield b"}"
+
+
+def compressChunks(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    # one gzip stream (wbits 31) for all chunks
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressedChunk = compressor.compress(chunk)
+        if compressedChunk:
+            yield compressedChunk
+    yield compressor.flush()
+
+
+def acceptsGzip(acceptEncoding: Optional[str]) -> bool:
+    # e.g. "gzip, deflate" or "gzip;q=1.0, identity;q=0.5", "gzip;q=0" rejects gzip
+    for encoding in (acceptEncoding or "").split(","):
+        name, _, parameters = encoding.strip().partition(";")
+        if name.strip().lower() in (GZIP, "*"):
+            return parameters.replace(" ", "").lower() not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
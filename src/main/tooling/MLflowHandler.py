@@ -4,10 +4,8 @@ import sys
 from collections.abc import Iterator, MutableMapping
 from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, cast
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, cast
 
-import datasets.dataset_dict
-import matplotlib.pyplot as plt
 import mlflow
 import numpy as np
 import pandas as pd
@@ -16,6 +14,9 @@ from omegaconf import DictConfig, OmegaConf
 from main.tooling.FileManager import cleanup, getPathForNewGeneratedFiles
 from main.tooling.Logger import logging_setup
 
+if TYPE_CHECKING:
+    import datasets.dataset_dict
+
 logger = logging_setup(__name__)
 
 TRAIN_CSV_FILENAME_FOR_MLFLOW_UPLOAD = "train_dataset.csv"
@@ -73,7 +74,7 @@ def uploadDatasetToMLflow(df: pd.DataFrame, jsonFileName: str) -> None:
     log_mlflow_artifacts(getPathForNewGeneratedFiles(name=csvFileName))
 
 
-def createTrainTestFileForMLFlowUpload(foldNumber: int, datasetTrainTest: datasets.dataset_dict.DatasetDict) -> None:
+def createTrainTestFileForMLFlowUpload(foldNumber: int, datasetTrainTest: "datasets.dataset_dict.DatasetDict") -> None:
 
     logger.info("-------Creating Train and Test File for MLflow upload-------")
 
@@ -99,6 +100,9 @@ def createTrainTestFileForMLFlowUpload(foldNumber: int, datasetTrainTest: datase
 
 def createConfusionMatrixPngForMLFlowUpload(foldNumber: int, evaluationResults: dict, total: bool) -> None:
 
+    # matplotlib is only imported, if a confusion matrix is plotted
+    import matplotlib.pyplot as plt
+
     logger.info("-------Creating Confusion Matrix for MLflow Upload-------")
 
     if total:
@@ -137,9 +141,30 @@ def createConfusionMatrixPngForMLFlowUpload(foldNumber: int, evaluationResults:
 
 
 def log_mlflow_artifacts(
-    artifact_paths: Path
+    artifact_paths: Path,
+    artifactPath: Optional[str] = None
 ) -> None:
-    mlflow.log_artifact(artifact_paths)
+    mlflow.log_artifact(artifact_paths, artifact_path=artifactPath)
+
+
+def logPipelineReportToMLflow(report: Dict[str, Any]) -> None:
+    """
+        Description:
+            Uploads the report of a pipeline run (see PipelineInstrumentation) as "pipeline_report.json" and logs the wall time and
+            CPU time of every filter as metrics.
+        Args:
+            Dict[str, Any]: The pipeline report
+        Returns:
+            None
+    """
+
+    logger.info("-------Upload pipeline report to MLflow-------")
+
+    mlflow.log_dict(report, "pipeline_report.json")
+
+    for filterReport in report["filters"]:
+        mlflow.log_metric(f"{filterReport['filter']}_wall_seconds", filterReport["wall_seconds"])
+        mlflow.log_metric(f"{filterReport['filter']}_cpu_seconds", filterReport["cpu_seconds"])
 
 
 def computeExperimentMetricsForMLFlowUpload(metricsList: List[Dict]) -> None:
@@ -0,0 +1,103 @@
+import os
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional, Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+
+from main.tooling.Logger import logging_setup
+
+logger = logging_setup(__name__)
+
+# with several worker processes (see gunicorn.conf.py), every process writes its metrics into this directory
+MULTIPROCESS_DIRECTORY = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+
+HTTP_REQUESTS = Counter("rc_http_requests_total", "HTTP requests per endpoint", ["endpoint", "method", "status"])
+HTTP_REQUEST_LATENCY = Histogram("rc_http_request_duration_seconds", "HTTP request latency per endpoint", ["endpoint", "method"], buckets=LATENCY_BUCKETS)
+
+INFERENCE_BATCH_SIZE = Histogram("rc_inference_batch_size_sentences", "Number of sentences per inference batch", buckets=BATCH_SIZE_BUCKETS)
+INFERENCE_BATCH_LATENCY = Histogram("rc_inference_batch_duration_seconds", "Duration of one inference batch (tokenization excluded)", buckets=LATENCY_BUCKETS)
+PREDICTED_SENTENCES = Counter("rc_predicted_sentences_total", "Sentences predicted by the model, rate() gives the sentences per second")
+
+MODEL_LOAD_SECONDS = Gauge("rc_model_load_seconds", "Duration of the last load of a model", ["model", "inference_backend"], multiprocess_mode="max")
+
+PREDICTION_CACHE_LOOKUPS = Counter("rc_prediction_cache_lookups_total", "Sentences looked up in the prediction cache", ["result"])
+
+OUTBOUND_REQUESTS = Counter("rc_outbound_requests_total", "Requests to foreign services", ["operation", "status"])
+OUTBOUND_LATENCY = Histogram("rc_outbound_request_duration_seconds", "Latency of requests to foreign services", ["operation"], buckets=LATENCY_BUCKETS)
+OUTBOUND_ERRORS = Counter("rc_outbound_errors_total", "Failed requests to foreign services (connection errors and HTTP status >= 400)", ["operation", "error"])
+
+PROCESS_RSS = Gauge("rc_process_resident_memory_bytes", "Resident memory of the process", multiprocess_mode="liveall")
+
+
+class OutboundCall():
+    """
+        Description: Is handed to the caller of "measureOutboundCall", which sets the HTTP status code of the response.
+    """
+
+    def __init__(self) -> None:
+        self.statusCode: Optional[int] = None
+
+
+@contextmanager
+def measureOutboundCall(operation: str) -> Iterator[OutboundCall]:
+    """
+        Description:
+            Measures the latency of a request to a foreign service and counts it by its status. Connection errors and responses
+            with an HTTP status >= 400 are counted as errors.
+        Args:
+            str: The operation (e.g. "store_annotation")
+        Returns:
+            Iterator[OutboundCall]: The call, on which the status code of the response has to be set
+    """
+
+    outboundCall = OutboundCall()
+    startTime = time.perf_counter()
+    try:
+        yield outboundCall
+    except Exception as e:
+        OUTBOUND_REQUESTS.labels(operation, "error").inc()
+        OUTBOUND_ERRORS.labels(operation, type(e).__name__).inc()
+        raise
+    else:
+        OUTBOUND_REQUESTS.labels(operation, str(outboundCall.statusCode)).inc()
+        if outboundCall.statusCode is not None and outboundCall.statusCode >= 400:
+            OUTBOUND_ERRORS.labels(operation, f"http_{outboundCall.statusCode}").inc()
+    finally:
+        OUTBOUND_LATENCY.labels(operation).observe(time.perf_counter() - startTime)
+
+
+def updateProcessMemory() -> None:
+    # /proc/self/statm contains the resident set size in pages (Linux only)
+    try:
+        with open("/proc/self/statm") as statm:
+            PROCESS_RSS.set(int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE"))
+    except (OSError, ValueError, IndexError):
+        pass
+
+
+def generateMetrics() -> Tuple[bytes, str]:
+    """
+        Description:
+            Returns all metrics in the Prometheus text exposition format. With several worker processes, the metrics of all
+            processes are aggregated.
+        Returns:
+            Tuple[bytes, str]: The metrics and the content type
+    """
+
+    updateProcessMemory()
+
+    if MULTIPROCESS_DIRECTORY:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+def markProcessDead(pid: int) -> None:
+    if MULTIPROCESS_DIRECTORY:
+        multiprocess.mark_process_dead(pid)
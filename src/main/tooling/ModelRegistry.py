@@ -0,0 +1,305 @@
+import hashlib
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from omegaconf import DictConfig
+
+from main.tooling.FileManager import getModelPath, getModelVersionsPath
+from main.tooling.InferenceBackends import ONNX, TORCH, InferenceBackend, OnnxInferenceBackend, TorchInferenceBackend
+from main.tooling.Logger import logging_setup
+from main.tooling.Metrics import MODEL_LOAD_SECONDS
+from main.tooling.TokenizationCache import TokenizationCache, loadTokenizer
+
+logger = logging_setup(__name__)
+
+TOKENIZER_NAME = "bert-base-uncased"
+INT8 = "int8"
+WEIGHTS_FILE_SUFFIXES = [".json", ".safetensors", ".bin", ".onnx"]
+# the actions, that are announced to the other server processes in the model version files
+RELOAD = "reload"
+UNLOAD = "unload"
+
+
+def getModelKey(modelName: str, inferenceBackend: str = TORCH, quantizationConf: Optional[DictConfig] = None) -> str:
+    """
+        Description:
+            Returns the key, under which a model variant is held in the ModelRegistry. A model served with another inference backend
+            or a quantized model is a separate variant.
+        Args:
+            str: The model name
+            str: The inference backend ("torch" or "onnx")
+            Optional[DictConfig]: The "quantization" part of the creation configuration
+        Returns:
+            str: The model key
+    """
+
+    if inferenceBackend == ONNX:
+        return f"{modelName}@{ONNX}"
+    if quantizationConf is not None and quantizationConf.enabled:
+        return f"{modelName}@{INT8}"
+    return modelName
+
+
+def computeWeightsDigest(modelDirectory: str) -> str:
+    """
+        Description:
+            Computes a digest of the model configuration and weights in the model directory. A new model (e.g. downloaded from
+            MLflow) has another digest, so that predictions of the old model, which are cached, are not used anymore.
+        Args:
+            str: The model directory
+        Returns:
+            str: The hexadecimal digest
+    """
+
+    digest = hashlib.blake2b(digest_size=16)
+    for path in sorted(Path(modelDirectory).iterdir()):
+        if path.is_file() and path.suffix in WEIGHTS_FILE_SUFFIXES:
+            digest.update(path.name.encode("utf-8"))
+            with path.open("rb") as file:
+                for chunk in iter(lambda: file.read(1 << 20), b""):
+                    digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+class LoadedModel():
+    """
+        Description: A fine-tuned model together with its tokenizer, as it is held resident in the ModelRegistry.
+    """
+
+    def __init__(self, modelName: str, tokenizer: Any, backend: InferenceBackend, loadSeconds: float, quantization: Optional[str] = None,
+                 tokenizationCache: Optional[TokenizationCache] = None, weightsDigest: str = "") -> None:
+        self.modelName = modelName
+        self.tokenizer = tokenizer
+        self.backend = backend
+        self.loadSeconds = loadSeconds
+        self.quantization = quantization
+        self.tokenizationCache = tokenizationCache
+        self.weightsDigest = weightsDigest
+
+
+class ModelRegistry():
+    """
+        Description: Process-wide registry, that loads every fine-tuned model only once and shares it across requests and pipelines.
+        Loading is guarded per model key, so concurrent requests for a model, which is not loaded yet, trigger exactly one load.
+        Reloads and unloads are written as a new version into the model version file of the model, so that every other server process
+        (e.g. every gunicorn worker) applies them with its next call of getModel for this model.
+    """
+
+    def __init__(self, modelVersionsPath: Optional[str] = None) -> None:
+        self.loadedModels: Dict[str, LoadedModel] = {}
+        self.loadOptions: Dict[str, Tuple[str, str, Optional[DictConfig]]] = {}
+        self.registryLock = threading.Lock()
+        self.modelLocks: Dict[str, threading.Lock] = {}
+        self.modelVersionsPath = Path(modelVersionsPath or getModelVersionsPath())
+        # versions, that were written before the registry was created (e.g. by a former run of the service), are not applied;
+        # the forked workers inherit the applied versions together with the preloaded models of the server process
+        self.appliedVersions: Dict[str, str] = self.__readModelVersions__()
+
+    def getModel(self, modelName: str, inferenceBackend: str = TORCH, quantizationConf: Optional[DictConfig] = None) -> LoadedModel:
+        """
+            Description:
+                This method returns the resident model for the model name. If the model is not loaded yet, it is loaded from the
+                model directory (see FileManager.getModelPath) and kept for all following calls.
+            Args:
+                str: The model name (the "model_name" of the creation configuration)
+                str: The inference backend ("torch" or "onnx")
+                Optional[DictConfig]: The "quantization" part of the creation configuration
+            Returns:
+                LoadedModel: The loaded model with its tokenizer and inference backend
+        """
+
+        self.__applyModelVersion__(modelName)
+
+        modelKey = getModelKey(modelName, inferenceBackend, quantizationConf)
+
+        loadedModel = self.loadedModels.get(modelKey)
+        if loadedModel is not None:
+            return loadedModel
+
+        with self.__getModelLock__(modelKey):
+            loadedModel = self.loadedModels.get(modelKey)
+            if loadedModel is None:
+                loadedModel = self.__load__(modelName, inferenceBackend, quantizationConf)
+                self.loadedModels[modelKey] = loadedModel
+                self.loadOptions[modelKey] = (modelName, inferenceBackend, quantizationConf)
+
+        return loadedModel
+
+    def unloadModel(self, modelName: str) -> bool:
+        """
+            Description:
+                This method removes all variants of the model from the registry of this process and of the other server processes.
+                Requests, that still hold a reference to the model, can finish their inference, the memory is released afterwards.
+            Args:
+                str: The model name
+            Returns:
+                bool: True, if the model was loaded in this process before
+        """
+
+        unloaded = self.__unload__(modelName)
+        self.__writeModelVersion__(modelName, UNLOAD)
+
+        return unloaded
+
+    def reloadModel(self, modelName: str) -> LoadedModel:
+        """
+            Description:
+                This method loads all loaded variants of the model again from the model directory and replaces the resident models
+                afterwards, e.g. after a new model was downloaded from MLflow. Until the new model is loaded, requests are still
+                served with the old model. The other server processes reload the model with their next call of getModel for it.
+            Args:
+                str: The model name
+            Returns:
+                LoadedModel: The new loaded model (the last reloaded variant)
+        """
+
+        loadedModel = self.__reload__(modelName)
+        self.__writeModelVersion__(modelName, RELOAD)
+
+        return loadedModel
+
+    def __unload__(self, modelName: str) -> bool:
+        unloaded = False
+        for modelKey in self.__getModelKeys__(modelName):
+            with self.__getModelLock__(modelKey):
+                unloaded = self.loadedModels.pop(modelKey, None) is not None or unloaded
+
+        if unloaded:
+            logger.info(f"-------Model '{modelName}' unloaded-------")
+
+        return unloaded
+
+    def __reload__(self, modelName: str) -> LoadedModel:
+        modelKeys = self.__getModelKeys__(modelName) or [getModelKey(modelName)]
+
+        for modelKey in modelKeys:
+            _, inferenceBackend, quantizationConf = self.loadOptions.get(modelKey, (modelName, TORCH, None))
+            with self.__getModelLock__(modelKey):
+                loadedModel = self.__load__(modelName, inferenceBackend, quantizationConf)
+                self.loadedModels[modelKey] = loadedModel
+                self.loadOptions[modelKey] = (modelName, inferenceBackend, quantizationConf)
+
+        return loadedModel
+
+    def registerModel(self, modelName: str, tokenizer: Any, model: Any) -> LoadedModel:
+        """
+            Description:
+                This method makes an already loaded PyTorch model resident under the model name, e.g. a small stand-in model for
+                benchmarks.
+            Args:
+                str: The model name
+                Any: The tokenizer
+                Any: The PyTorch model
+            Returns:
+                LoadedModel: The registered model
+        """
+
+        model.eval()
+
+        digest = hashlib.blake2b(digest_size=16)
+        for parameterName, tensor in model.state_dict().items():
+            digest.update(parameterName.encode("utf-8"))
+            digest.update(tensor.detach().cpu().numpy().tobytes())
+
+        loadedModel = LoadedModel(modelName, tokenizer, TorchInferenceBackend(model), 0.0, tokenizationCache=TokenizationCache(tokenizer),
+                                  weightsDigest=digest.hexdigest())
+
+        with self.__getModelLock__(modelName):
+            self.loadedModels[modelName] = loadedModel
+            self.loadOptions[modelName] = (modelName, TORCH, None)
+
+        return loadedModel
+
+    def isLoaded(self, modelName: str) -> bool:
+        return bool(self.__getModelKeys__(modelName))
+
+    def __getModelKeys__(self, modelName: str) -> List[str]:
+        return [modelKey for modelKey, (loadedModelName, _, _) in list(self.loadOptions.items()) if loadedModelName == modelName and modelKey in self.loadedModels]
+
+    def __applyModelVersion__(self, modelName: str) -> None:
+        modelVersion = self.__readModelVersion__(modelName)
+        if modelVersion is None or self.appliedVersions.get(modelName) == modelVersion:
+            return
+
+        with self.__getModelLock__(f"{modelName}@version"):
+            if self.appliedVersions.get(modelName) == modelVersion:
+                return
+
+            action = modelVersion.split(" ", 1)[0]
+            logger.info(f"-------Apply the {action} of model '{modelName}' of another server process-------")
+            if action == UNLOAD:
+                self.__unload__(modelName)
+            elif self.isLoaded(modelName):
+                self.__reload__(modelName)
+            self.appliedVersions[modelName] = modelVersion
+
+    def __writeModelVersion__(self, modelName: str, action: str) -> None:
+        modelVersion = f"{action} {uuid.uuid4().hex}"
+        # this process has already applied its own reload or unload
+        self.appliedVersions[modelName] = modelVersion
+
+        self.modelVersionsPath.mkdir(parents=True, exist_ok=True)
+        temporaryPath = self.modelVersionsPath / f".{modelName}.{os.getpid()}.tmp"
+        temporaryPath.write_text(modelVersion)
+        os.replace(temporaryPath, self.modelVersionsPath / modelName)
+
+    def __readModelVersion__(self, modelName: str) -> Optional[str]:
+        try:
+            return (self.modelVersionsPath / modelName).read_text()
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+
+    def __readModelVersions__(self) -> Dict[str, str]:
+        if not self.modelVersionsPath.is_dir():
+            return {}
+        return {path.name: path.read_text() for path in self.modelVersionsPath.iterdir() if path.is_file() and not path.name.startswith(".")}
+
+    def __getModelLock__(self, modelKey: str) -> threading.Lock:
+        with self.registryLock:
+            if modelKey not in self.modelLocks:
+                self.modelLocks[modelKey] = threading.Lock()
+            return self.modelLocks[modelKey]
+
+    def __load__(self, modelName: str, inferenceBackend: str = TORCH, quantizationConf: Optional[DictConfig] = None) -> LoadedModel:
+        logger.info(f"-------Load model '{modelName}' ({inferenceBackend})-------")
+
+        startTime = time.perf_counter()
+
+        tokenizer = loadTokenizer(TOKENIZER_NAME, useFast=True)
+
+        quantization = None
+        backend: InferenceBackend
+        if inferenceBackend == ONNX:
+            if quantizationConf is not None and quantizationConf.enabled:
+                logger.warning("-------int8 quantization is only supported for the torch inference backend-------")
+            backend = OnnxInferenceBackend(getModelPath(modelName))
+
+        elif inferenceBackend == TORCH:
+            # torch is only imported, if a model is served with PyTorch
+            from transformers import BertForSequenceClassification
+
+            model = BertForSequenceClassification.from_pretrained(getModelPath(modelName))
+            model.eval()
+
+            if quantizationConf is not None and quantizationConf.enabled:
+                from main.tooling.Quantization import quantizeModelWithAccuracyGuard
+                model, quantization = quantizeModelWithAccuracyGuard(modelName, tokenizer, model, quantizationConf)
+
+            backend = TorchInferenceBackend(model)
+
+        else:
+            raise ValueError(f"Inference backend '{inferenceBackend}' not supported")
+
+        loadSeconds = time.perf_counter() - startTime
+        logger.info(f"-------Model '{modelName}' loaded in {loadSeconds:.2f}s-------")
+        MODEL_LOAD_SECONDS.labels(modelName, inferenceBackend).set(loadSeconds)
+
+        return LoadedModel(modelName, tokenizer, backend, loadSeconds, quantization, TokenizationCache(tokenizer), computeWeightsDigest(getModelPath(modelName)))
+
+
+modelRegistry = ModelRegistry()
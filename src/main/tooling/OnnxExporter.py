@@ -0,0 +1,73 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from main.tooling.FileManager import getModelPath
+from main.tooling.InferenceBackends import ONNX_MODEL_FILE_NAME, OnnxInferenceBackend, softmax
+from main.tooling.Logger import logging_setup
+
+logger = logging_setup(__name__)
+
+ONNX_OPSET_VERSION = 14
+MAX_ALLOWED_PROBABILITY_DIFFERENCE = 1e-3
+INPUT_NAMES = ["input_ids", "attention_mask", "token_type_ids"]
+
+
+def exportModelToONNX(modelName: str) -> Path:
+    """
+        Description:
+            Converts the fine-tuned model in the model directory to ONNX and saves it as "model.onnx" next to the model weights.
+            Afterwards, the probabilities of the ONNX model are compared with the PyTorch model on a sample batch.
+        Args:
+            str: The model name (e.g. "Iteration_1_model")
+        Returns:
+            Path: The path of the ONNX model
+    """
+
+    import torch
+    from transformers import BertForSequenceClassification
+
+    logger.info(f"-------Export model '{modelName}' to ONNX-------")
+
+    modelDirectory = Path(getModelPath(modelName))
+    onnxModelPath = modelDirectory / ONNX_MODEL_FILE_NAME
+
+    model = BertForSequenceClassification.from_pretrained(str(modelDirectory))
+    model.eval()
+    model.config.return_dict = False
+
+    sampleInputs = {
+        "input_ids": torch.randint(low=0, high=model.config.vocab_size, size=(2, 16), dtype=torch.long),
+        "attention_mask": torch.ones((2, 16), dtype=torch.long),
+        "token_type_ids": torch.zeros((2, 16), dtype=torch.long),
+    }
+
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            args=tuple(sampleInputs[name] for name in INPUT_NAMES),
+            f=str(onnxModelPath),
+            input_names=INPUT_NAMES,
+            output_names=["logits"],
+            dynamic_axes={**{name: {0: "batch", 1: "sequence"} for name in INPUT_NAMES}, "logits": {0: "batch"}},
+            opset_version=ONNX_OPSET_VERSION,
+        )
+
+        torchProbabilities = softmax(model(**sampleInputs)[0].numpy())
+
+    onnxProbabilities = np.array(OnnxInferenceBackend(str(modelDirectory)).__predict__({name: value.numpy() for name, value in sampleInputs.items()}))
+    probabilityDifference = float(np.abs(torchProbabilities - onnxProbabilities).max())
+
+    if probabilityDifference > MAX_ALLOWED_PROBABILITY_DIFFERENCE:
+        raise ValueError(f"ONNX export of model '{modelName}' differs from the PyTorch model (max probability difference {probabilityDifference})")
+
+    logger.info(f"-------Model '{modelName}' exported to {onnxModelPath} (max probability difference {probabilityDifference:.2e})-------")
+
+    return onnxModelPath
+
+
+if __name__ == "__main__":
+    # e.g. python -m main.tooling.OnnxExporter Iteration_1_model
+    for modelName in sys.argv[1:]:
+        exportModelToONNX(modelName)
@@ -0,0 +1,189 @@
+import hashlib
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from main.tooling.Logger import logging_setup
+from main.tooling.Metrics import PREDICTION_CACHE_LOOKUPS
+
+logger = logging_setup(__name__)
+
+
+class PredictionCache():
+    """
+        Description: Cache for the class probabilities of sentences. The key is a hash of the model key, the model identity (digest of
+        the model weights, see ModelRegistry) and the sentence, so a changed model never returns the probabilities of the old model.
+        Entries are kept in a bounded in-memory tier with LRU eviction and, if a database path is given, in a persistent SQLite tier,
+        that survives restarts and is shared by the processes on one host.
+    """
+
+    def __init__(self, maxEntries: int, databasePath: Optional[str] = None) -> None:
+        self.maxEntries = maxEntries
+        self.databasePath = databasePath
+        self.entries: OrderedDict[bytes, Tuple[str, List[float]]] = OrderedDict()
+        self.modelIdentities: Dict[str, str] = {}
+        self.lock = threading.Lock()
+        self.connection: Optional[sqlite3.Connection] = None
+        self.memoryHits = 0
+        self.diskHits = 0
+        self.misses = 0
+
+    def get(self, modelKey: str, modelIdentity: str, sentences: List[str]) -> List[Optional[List[float]]]:
+        """
+            Description:
+                This method looks up the probabilities of the sentences, first in the in-memory tier, then in the SQLite tier.
+                If the model identity of the model key changed since the last lookup, the entries of the old model are removed.
+            Args:
+                str: The model key (see ModelRegistry.getModelKey)
+                str: The model identity (digest of the model weights)
+                List[str]: The sentences
+            Returns:
+                List[Optional[List[float]]]: The cached probabilities for every sentence or None, if the sentence is not cached
+        """
+
+        keys = [self.__getKey__(modelKey, modelIdentity, sentence) for sentence in sentences]
+        probabilities: List[Optional[List[float]]] = [None] * len(sentences)
+
+        with self.lock:
+            self.__invalidateOldModel__(modelKey, modelIdentity)
+
+            missingIndices = []
+            for index, key in enumerate(keys):
+                cachedEntry = self.entries.get(key)
+                if cachedEntry is None:
+                    missingIndices.append(index)
+                else:
+                    self.entries.move_to_end(key)
+                    probabilities[index] = cachedEntry[1]
+            self.memoryHits += len(sentences) - len(missingIndices)
+
+            if missingIndices and self.databasePath:
+                storedProbabilities = self.__selectFromDatabase__([keys[index] for index in missingIndices])
+                for index in missingIndices:
+                    if keys[index] in storedProbabilities:
+                        probabilities[index] = storedProbabilities[keys[index]]
+                        self.__putInMemory__(keys[index], modelKey, storedProbabilities[keys[index]])
+                        self.diskHits += 1
+
+            misses = sum(1 for sentenceProbabilities in probabilities if sentenceProbabilities is None)
+            self.misses += misses
+
+        PREDICTION_CACHE_LOOKUPS.labels("memory_hit").inc(len(sentences) - len(missingIndices))
+        PREDICTION_CACHE_LOOKUPS.labels("disk_hit").inc(len(missingIndices) - misses)
+        PREDICTION_CACHE_LOOKUPS.labels("miss").inc(misses)
+
+        return probabilities
+
+    def put(self, modelKey: str, modelIdentity: str, sentences: List[str], probabilities: List[List[float]]) -> None:
+        """
+            Description:
+                This method stores the probabilities of the sentences in both tiers.
+            Args:
+                str: The model key (see ModelRegistry.getModelKey)
+                str: The model identity (digest of the model weights)
+                List[str]: The sentences
+                List[List[float]]: The probabilities for every sentence
+            Returns:
+                None
+        """
+
+        entries = [(self.__getKey__(modelKey, modelIdentity, sentence), sentenceProbabilities) for sentence, sentenceProbabilities in zip(sentences, probabilities)]
+
+        with self.lock:
+            for key, sentenceProbabilities in entries:
+                self.__putInMemory__(key, modelKey, sentenceProbabilities)
+
+            if self.databasePath:
+                self.__getConnection__().executemany(
+                    "INSERT OR REPLACE INTO predictions (key, model_key, model_identity, probabilities) VALUES (?, ?, ?, ?)",
+                    [(key, modelKey, modelIdentity, json.dumps(sentenceProbabilities)) for key, sentenceProbabilities in entries]
+                )
+                self.__getConnection__().commit()
+
+    def getStatistics(self) -> Dict[str, int]:
+        with self.lock:
+            return {"entries": len(self.entries), "memory_hits": self.memoryHits, "disk_hits": self.diskHits, "misses": self.misses}
+
+    def __putInMemory__(self, key: bytes, modelKey: str, probabilities: List[float]) -> None:
+        if self.maxEntries <= 0:
+            return
+
+        self.entries[key] = (modelKey, probabilities)
+        self.entries.move_to_end(key)
+
+        while len(self.entries) > self.maxEntries:
+            self.entries.popitem(last=False)
+
+    def __invalidateOldModel__(self, modelKey: str, modelIdentity: str) -> None:
+        oldModelIdentity = self.modelIdentities.get(modelKey)
+        self.modelIdentities[modelKey] = modelIdentity
+
+        if oldModelIdentity is None and not self.databasePath:
+            return
+        if oldModelIdentity == modelIdentity:
+            return
+
+        # the entries of the old model can not be hit anymore (their keys contain the old identity), they are only removed to free space
+        if oldModelIdentity is not None:
+            logger.info(f"-------Model '{modelKey}' changed, its cached predictions are invalidated-------")
+            for key in [key for key, (entryModelKey, _) in self.entries.items() if entryModelKey == modelKey]:
+                del self.entries[key]
+
+        if self.databasePath:
+            self.__getConnection__().execute("DELETE FROM predictions WHERE model_key = ? AND model_identity != ?", (modelKey, modelIdentity))
+            self.__getConnection__().commit()
+
+    def __selectFromDatabase__(self, keys: List[bytes]) -> Dict[bytes, List[float]]:
+        storedProbabilities: Dict[bytes, List[float]] = {}
+
+        # SQLite limits the number of parameters per statement
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            rows: List[Tuple[bytes, str]] = self.__getConnection__().execute(
+                f"SELECT key, probabilities FROM predictions WHERE key IN ({','.join('?' * len(chunk))})", chunk
+            ).fetchall()
+            storedProbabilities.update({key: json.loads(probabilities) for key, probabilities in rows})
+
+        return storedProbabilities
+
+    def __getConnection__(self) -> sqlite3.Connection:
+        # the connection is opened with the first access, so it is not shared with forked worker processes
+        if self.connection is None:
+            Path(str(self.databasePath)).parent.mkdir(parents=True, exist_ok=True)
+            self.connection = sqlite3.connect(str(self.databasePath), timeout=30, check_same_thread=False)
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS predictions (key BLOB PRIMARY KEY, model_key TEXT NOT NULL, model_identity TEXT NOT NULL, probabilities TEXT NOT NULL)"
+            )
+            self.connection.execute("CREATE INDEX IF NOT EXISTS predictions_model_key ON predictions (model_key)")
+            self.connection.commit()
+        return self.connection
+
+    def __getKey__(self, modelKey: str, modelIdentity: str, sentence: str) -> bytes:
+        return hashlib.blake2b(f"{modelKey}\x00{modelIdentity}\x00{sentence}".encode("utf-8"), digest_size=16).digest()
+
+
+predictionCaches: Dict[str, PredictionCache] = {}
+predictionCachesLock = threading.Lock()
+
+
+def getPredictionCache(maxEntries: int, databasePath: Optional[str] = None) -> PredictionCache:
+    """
+        Description:
+            Returns the process-wide PredictionCache for the database path, so that all requests share the cached predictions.
+        Args:
+            int: The maximum number of entries in the in-memory tier, used if the cache does not exist yet
+            Optional[str]: The path of the SQLite database or None, if only the in-memory tier is used
+        Returns:
+            PredictionCache: The prediction cache
+    """
+
+    with predictionCachesLock:
+        cacheName = databasePath or ""
+        if cacheName not in predictionCaches:
+            logger.info(f"-------Start prediction cache (max {maxEntries} entries in memory, database: {databasePath})-------")
+            predictionCaches[cacheName] = PredictionCache(maxEntries, databasePath)
+        return predictionCaches[cacheName]
@@ -0,0 +1,83 @@
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+
+import pandas as pd
+import torch
+from omegaconf import DictConfig
+
+from main.tooling.FileManager import getModelPath
+from main.tooling.Logger import logging_setup
+
+logger = logging_setup(__name__)
+
+TEST_DATASET_FILE_NAME = "test_dataset.csv"
+VALIDATION_BATCH_SIZE = 64
+
+
+def quantizeModelWithAccuracyGuard(modelName: str, tokenizer: Any, model: Any, quantizationConf: DictConfig) -> Tuple[Any, Optional[str]]:
+    """
+        Description:
+            Applies dynamic int8 quantization to the linear layers of the fine-tuned model and compares the predictions of the
+            quantized and the fp32 model on the test split, which is stored with the model (see TrainAndEvaluateModelsFilter).
+            The quantized model is only activated, if the share of equal predictions reaches "min_agreement".
+        Args:
+            str: The model name
+            Any: The tokenizer
+            Any: The fp32 model
+            DictConfig: The "quantization" part of the creation configuration
+        Returns:
+            Tuple[Any, Optional[str]]: The model to use and "int8", if the quantized model is activated, else the fp32 model and None
+    """
+
+    validationSentences = loadValidationSentences(modelName, quantizationConf.validation_size)
+    if not validationSentences:
+        logger.warning(f"-------No test split found for model '{modelName}', int8 quantization is not activated-------")
+        return model, None
+
+    quantizedModel = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    fp32Predictions = predictLabels(tokenizer, model, validationSentences)
+    int8Predictions = predictLabels(tokenizer, quantizedModel, validationSentences)
+
+    agreement = sum(1 for fp32Prediction, int8Prediction in zip(fp32Predictions, int8Predictions) if fp32Prediction == int8Prediction) / len(validationSentences)
+
+    if agreement < quantizationConf.min_agreement:
+        logger.warning(f"-------int8 quantization of model '{modelName}' is not activated: agreement {agreement:.4f} with the fp32 model "
+                       f"on {len(validationSentences)} test sentences is below {quantizationConf.min_agreement}-------")
+        return model, None
+
+    logger.info(f"-------int8 quantization of model '{modelName}' activated: agreement {agreement:.4f} with the fp32 model "
+                f"on {len(validationSentences)} test sentences-------")
+
+    return quantizedModel, "int8"
+
+
+def loadValidationSentences(modelName: str, validationSize: int) -> List[str]:
+    """
+        Description:
+            Loads the sentences of the test split, that is stored in the model directory.
+        Args:
+            str: The model name
+            int: The maximum number of sentences
+        Returns:
+            List[str]: The sentences or an empty list, if the model has no test split
+    """
+
+    testDatasetPath = Path(getModelPath(modelName)) / TEST_DATASET_FILE_NAME
+    if not testDatasetPath.exists():
+        return []
+
+    testDF = pd.read_csv(testDatasetPath)
+
+    return testDF['text'].astype(str).tolist()[:validationSize]
+
+
+def predictLabels(tokenizer: Any, model: Any, sentences: List[str]) -> List[int]:
+    predictions: List[int] = []
+    for i in range(0, len(sentences), VALIDATION_BATCH_SIZE):
+        batchModelInputs = tokenizer(sentences[i:i + VALIDATION_BATCH_SIZE], return_tensors="pt", padding=True, truncation=True)
+
+        with torch.no_grad():
+            predictions.extend(torch.argmax(model(**batchModelInputs).logits, dim=1).tolist())
+
+    return predictions
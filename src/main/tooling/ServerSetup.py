@@ -0,0 +1,66 @@
+import gc
+import os
+from typing import List
+
+from main.structure.Factories.ConfigurationFactory import ConfigurationFactory
+from main.tooling.InferenceBackends import TORCH
+from main.tooling.Logger import logging_setup
+from main.tooling.ModelRegistry import getModelKey, modelRegistry
+
+logger = logging_setup(__name__)
+
+SERVER_WORKERS = int(os.getenv("RC_SERVER_WORKERS", "2"))
+SERVER_THREADS = int(os.getenv("RC_SERVER_THREADS", "4"))
+TORCH_THREADS_PER_WORKER = int(os.getenv("RC_TORCH_THREADS_PER_WORKER", str(max(1, (os.cpu_count() or 1) // max(1, SERVER_WORKERS)))))
+PRELOAD_MODELS = os.getenv("RC_PRELOAD_MODELS", "true").lower() == "true"
+
+SERVING_CONFIGURATIONS = ["OnlyPrediction", "OnlyAnnotation", "OnlyDataset", "AnnotationAndDataset"]
+
+
+def preloadModels() -> List[str]:
+    """
+        Description:
+            Loads the models of all serving configurations into the ModelRegistry of the server process, before the worker processes
+            are forked. The workers inherit the loaded weights as copy-on-write pages, so the weights are held only once in memory.
+            Afterwards, all objects are moved into the permanent generation of the garbage collector, so that garbage collections in
+            the workers do not write to (and therefor copy) the shared pages.
+        Returns:
+            List[str]: The keys of the preloaded models
+    """
+
+    if not PRELOAD_MODELS:
+        return []
+
+    # with one thread, torch does not start its thread pool in the server process, which would not survive the fork
+    import torch
+    torch.set_num_threads(1)
+
+    configurationFactory = ConfigurationFactory()
+    preloadedModelKeys: List[str] = []
+    for configName in SERVING_CONFIGURATIONS:
+        conf = configurationFactory.__create__(configName)
+        modelKey = getModelKey(conf.model_name, conf.get("inference_backend", TORCH), conf.get("quantization"))
+        # ONNX Runtime sessions start their thread pools on creation, therefor they are created in every worker
+        if conf.get("inference_backend", TORCH) == TORCH and modelKey not in preloadedModelKeys:
+            modelRegistry.getModel(conf.model_name, conf.get("inference_backend", TORCH), conf.get("quantization"))
+            preloadedModelKeys.append(modelKey)
+
+    gc.collect()
+    gc.freeze()
+
+    logger.info(f"-------Models {preloadedModelKeys} preloaded before forking {SERVER_WORKERS} workers-------")
+
+    return preloadedModelKeys
+
+
+def configureWorker() -> None:
+    """
+        Description:
+            Sets the number of torch threads of a forked worker process, so that the workers together do not use more threads than
+            CPU cores.
+    """
+
+    import torch
+    torch.set_num_threads(TORCH_THREADS_PER_WORKER)
+
+    logger.info(f"-------Worker {os.getpid()} uses {TORCH_THREADS_PER_WORKER} torch threads-------")
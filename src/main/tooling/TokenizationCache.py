@@ -0,0 +1,101 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple
+
+from main.tooling.Logger import logging_setup
+
+logger = logging_setup(__name__)
+
+TOKENIZATION_CACHE_SIZE = int(os.getenv("RC_TOKENIZATION_CACHE_SIZE", "100000"))
+
+
+def loadTokenizer(name: str, useFast: bool = True) -> Any:
+    """
+        Description:
+            Loads the tokenizer. The fast tokenizer is backed by the Rust "tokenizers" library and produces the same token IDs as the
+            pure-Python BertTokenizer.
+        Args:
+            str: The tokenizer name or directory
+            bool: True, if the fast tokenizer shall be used
+        Returns:
+            Any: The tokenizer
+    """
+
+    # transformers is only imported, if a tokenizer is loaded
+    from transformers import BertTokenizer, BertTokenizerFast
+
+    if useFast:
+        return BertTokenizerFast.from_pretrained(name)
+    return BertTokenizer.from_pretrained(name)
+
+
+class TokenizationCache():
+    """
+        Description: Content-addressed cache for tokenized sentences with a bounded size and LRU eviction. The key is a hash of the
+        tokenizer identity and the sentence, so sentences, that are seen again (across requests or cross-validation folds), are
+        not tokenized again. Sentences are tokenized with truncation and without padding.
+    """
+
+    def __init__(self, tokenizer: Any, maxEntries: int = TOKENIZATION_CACHE_SIZE) -> None:
+        self.tokenizer = tokenizer
+        self.maxEntries = maxEntries
+        self.tokenizerIdentity = f"{type(tokenizer).__name__}|{tokenizer.name_or_path}|{len(tokenizer)}|{tokenizer.model_max_length}"
+        self.entries: OrderedDict[bytes, Tuple[int, ...]] = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def encode(self, sentences: List[str]) -> Dict[str, List[List[int]]]:
+        """
+            Description:
+                This method returns the tokenized sentences. Only the sentences, which are not in the cache, are tokenized (in one
+                batch call of the tokenizer).
+            Args:
+                List[str]: The sentences
+            Returns:
+                Dict[str, List[List[int]]]: "input_ids", "token_type_ids" and "attention_mask" for every sentence, like the output
+                of the tokenizer
+        """
+
+        keys = [self.__getKey__(sentence) for sentence in sentences]
+        inputIds: List[Any] = [None] * len(sentences)
+
+        missingIndices = []
+        with self.lock:
+            for index, key in enumerate(keys):
+                cachedInputIds = self.entries.get(key)
+                if cachedInputIds is None:
+                    missingIndices.append(index)
+                else:
+                    self.entries.move_to_end(key)
+                    inputIds[index] = cachedInputIds
+            self.hits += len(sentences) - len(missingIndices)
+            self.misses += len(missingIndices)
+
+        if missingIndices:
+            missingInputIds = self.tokenizer([sentences[index] for index in missingIndices], truncation=True)["input_ids"]
+
+            with self.lock:
+                for index, sentenceInputIds in zip(missingIndices, missingInputIds):
+                    inputIds[index] = tuple(sentenceInputIds)
+                    if self.maxEntries > 0:
+                        self.entries[keys[index]] = inputIds[index]
+                        self.entries.move_to_end(keys[index])
+
+                while len(self.entries) > self.maxEntries:
+                    self.entries.popitem(last=False)
+
+        return {
+            "input_ids": [list(sentenceInputIds) for sentenceInputIds in inputIds],
+            "token_type_ids": [[0] * len(sentenceInputIds) for sentenceInputIds in inputIds],
+            "attention_mask": [[1] * len(sentenceInputIds) for sentenceInputIds in inputIds],
+        }
+
+    def getStatistics(self) -> Dict[str, int]:
+        with self.lock:
+            return {"entries": len(self.entries), "hits": self.hits, "misses": self.misses}
+
+    def __getKey__(self, sentence: str) -> bytes:
+        return hashlib.blake2b(f"{self.tokenizerIdentity}\x00{sentence}".encode("utf-8"), digest_size=16).digest()
@@ -0,0 +1,138 @@
+import math
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import cache
+from typing import Dict, List, Tuple
+
+from main.tooling.Logger import logging_setup
+
+logger = logging_setup(__name__)
+
+WORD_TOKENIZATION_WORKERS = int(os.getenv("RC_WORD_TOKENIZATION_WORKERS", "1"))
+WORD_TOKENIZATION_CACHE_SIZE = int(os.getenv("RC_WORD_TOKENIZATION_CACHE_SIZE", "100000"))
+# below this number of (not cached) sentences, starting the worker processes takes longer than the tokenization
+PARALLEL_MIN_SENTENCES = int(os.getenv("RC_PARALLEL_WORD_TOKENIZATION_MIN_SENTENCES", "20000"))
+CHUNKS_PER_WORKER = 4
+
+# the tokenizer data of nltk is looked up offline (NLTK_DATA, the default paths of nltk and NLTK_DATA_PATH) and only downloaded
+# into NLTK_DATA_PATH, if it is missing and the download is allowed
+NLTK_DATA_PATH = "src/data/nltk_data/"
+NLTK_DATA_DOWNLOAD = os.getenv("RC_NLTK_DATA_DOWNLOAD", "true").lower() == "true"
+
+
+@cache
+def resolveWordTokenizerData() -> str:
+    """
+        Description:
+            Makes sure, that the tokenizer data of nltk ("punkt_tab" for nltk >= 3.8.2, "punkt" before) is available. Is called,
+            when the first sentence is word-tokenized, and not on import, so the service starts without network access.
+        Returns:
+            str: The name of the tokenizer data
+    """
+
+    import nltk
+    from nltk.tokenize import punkt
+
+    resourceName = "punkt_tab" if hasattr(punkt, "PunktTokenizer") else "punkt"
+    if NLTK_DATA_PATH not in nltk.data.path:
+        nltk.data.path.append(NLTK_DATA_PATH)
+
+    try:
+        nltk.data.find(f"tokenizers/{resourceName}")
+    except LookupError:
+        if not NLTK_DATA_DOWNLOAD:
+            raise LookupError(f"The nltk data '{resourceName}' is missing and RC_NLTK_DATA_DOWNLOAD is false, it can be installed with "
+                              f"'python -m nltk.downloader {resourceName}' or found via the NLTK_DATA environment variable")
+        logger.info(f"-------Download the nltk data '{resourceName}' into {NLTK_DATA_PATH}-------")
+        if not nltk.download(resourceName, download_dir=NLTK_DATA_PATH, quiet=True):
+            raise LookupError(f"The nltk data '{resourceName}' could not be downloaded")
+
+    return resourceName
+
+
+def wordTokenizeChunk(sentences: List[str]) -> List[Tuple[str, ...]]:
+    # also runs in the worker processes
+    resolveWordTokenizerData()
+    from nltk.tokenize import word_tokenize
+
+    return [tuple(word_tokenize(sentence)) for sentence in sentences]
+
+
+class CachedWordTokenizer():
+    """
+        Description: Word-tokenizes sentences with nltk and keeps the words of up to "maxEntries" sentences with LRU eviction, so
+        repeated sentences are tokenized only once. With more than one worker, large inputs are tokenized in chunks on a process
+        pool; the worker processes are started (not forked), so it is safe in the threads of the service. The words are returned
+        in the order of the sentences in every mode.
+    """
+
+    def __init__(self, workers: int = WORD_TOKENIZATION_WORKERS, maxEntries: int = WORD_TOKENIZATION_CACHE_SIZE,
+                 parallelMinSentences: int = PARALLEL_MIN_SENTENCES) -> None:
+        self.workers = workers
+        self.maxEntries = maxEntries
+        self.parallelMinSentences = parallelMinSentences
+        self.entries: OrderedDict[str, Tuple[str, ...]] = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def tokenize(self, sentences: List[str]) -> List[Tuple[str, ...]]:
+        """
+            Description:
+                This method returns the words of every sentence. Only the distinct sentences, which are not in the cache, are
+                tokenized.
+            Args:
+                List[str]: The sentences
+            Returns:
+                List[Tuple[str, ...]]: The words of every sentence
+        """
+
+        words: Dict[str, Tuple[str, ...]] = {}
+        with self.lock:
+            for sentence in sentences:
+                if sentence in self.entries:
+                    self.entries.move_to_end(sentence)
+                    words[sentence] = self.entries[sentence]
+                    self.hits += 1
+
+            uncachedSentences = [sentence for sentence in dict.fromkeys(sentences) if sentence not in words]
+            self.misses += len(uncachedSentences)
+
+        if uncachedSentences:
+            words.update(zip(uncachedSentences, self.__tokenizeUncached__(uncachedSentences)))
+
+            with self.lock:
+                for sentence in uncachedSentences[-self.maxEntries:] if self.maxEntries > 0 else []:
+                    self.entries[sentence] = words[sentence]
+                    self.entries.move_to_end(sentence)
+                while len(self.entries) > self.maxEntries:
+                    self.entries.popitem(last=False)
+
+        return [words[sentence] for sentence in sentences]
+
+    def getStatistics(self) -> Dict[str, int]:
+        return {"entries": len(self.entries), "hits": self.hits, "misses": self.misses}
+
+    def __tokenizeUncached__(self, sentences: List[str]) -> List[Tuple[str, ...]]:
+        if self.workers <= 1 or len(sentences) < self.parallelMinSentences:
+            return wordTokenizeChunk(sentences)
+
+        chunkSize = math.ceil(len(sentences) / (self.workers * CHUNKS_PER_WORKER))
+        chunks = [sentences[start:start + chunkSize] for start in range(0, len(sentences), chunkSize)]
+
+        logger.info(f"-------Word-tokenize {len(sentences)} sentences in {len(chunks)} chunks with {self.workers} processes-------")
+
+        # map returns the results in the order of the chunks
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            return [chunkWords for chunkResult in executor.map(wordTokenizeChunk, chunks) for chunkWords in chunkResult]
+
+
+wordTokenizer = CachedWordTokenizer()
+
+
+if __name__ == "__main__":
+    # installs the tokenizer data of nltk, e.g. when the image is built
+    print(f"nltk data '{resolveWordTokenizerData()}' is available")
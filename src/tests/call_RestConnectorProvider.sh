@@ -4,3 +4,16 @@ curl -i -X GET --http1.1 "localhost:9698/hitec/classify/relevance/status" \
 curl -i -X POST --http1.1 "localhost:9698/hitec/classify/relevance/run" \
 -H "Content-Type: application/json" \
 --data-binary "@src/tests/testContent.json"
+
+# the run endpoint returns a job_id, replace <JOB_ID> to poll the status of the job
+curl -i -X GET --http1.1 "localhost:9698/hitec/classify/relevance/jobs/<JOB_ID>" \
+-H "Content-Type: application/json"
+
+curl -i -X POST --http1.1 "localhost:9698/hitec/classify/relevance/predict" \
+-H "Content-Type: application/json" \
+--data-binary '["Great app.", "The map does not load since the last update."]'
+
+curl -i -X GET --http1.1 "localhost:9698/hitec/classify/relevance/prediction-cache" \
+-H "Content-Type: application/json"
+
+curl -i -X GET --http1.1 "localhost:9698/metrics"
@@ -0,0 +1,404 @@
+import gzip
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List
+
+import pytest
+import requests
+from omegaconf import OmegaConf
+
+from main.behavior import CreationJobManager as jobManagerModule
+from main.behavior.CreationJobManager import CreationJobManager
+from main.behavior.RelevanceClassifier import RelevanceClassifier
+from main.connector import ComponentRelevanceClassifierRestConnectorProvider as providerModule
+from main.connector import ForeignComponentRelevanceClassifierRestConnectorRequester as requesterModule
+from main.connector.ForeignComponentRelevanceClassifierRestConnectorRequester import ForeignComponentRelevanceClassifierRestConnectorRequester, createSession
+from main.connector.OutboundExecutor import OutboundExecutor
+
+NUMBER_OF_CALLS = 50
+
+
+class StubServer(ThreadingHTTPServer):
+    """
+        Description: Local stand-in for the storage service, that counts the accepted connections and answers with the queued
+        status codes (200 afterwards).
+    """
+
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), StubRequestHandler)
+        self.connections = 0
+        self.requests: List[str] = []
+        self.statusCodes: List[int] = []
+        self.latencySeconds = 0.0
+        self.acceptsGzip = True
+        self.acceptsChunked = True
+        self.bodies: List[Any] = []
+        self.transferEncodings: List[str] = []
+
+    def get_request(self) -> Any:
+        self.connections += 1
+        return super().get_request()
+
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    # keep-alive, the headers and the body are sent in separate writes, so without TCP_NODELAY, they wait for the delayed ACK
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: StubServer
+
+    def do_GET(self) -> None:
+        self.__answer__()
+
+    def do_POST(self) -> None:
+        chunked = self.headers.get("Transfer-Encoding") == "chunked"
+        body = self.__readChunkedBody__() if chunked else self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.server.transferEncodings.append("chunked" if chunked else "content-length")
+        compressed = self.headers.get("Content-Encoding") == "gzip"
+        if chunked and not self.server.acceptsChunked:
+            self.server.statusCodes.insert(0, 411)
+        elif compressed and not self.server.acceptsGzip:
+            self.server.statusCodes.insert(0, 415)
+        else:
+            self.server.bodies.append(json.loads(gzip.decompress(body) if compressed else body))
+        self.__answer__()
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def __readChunkedBody__(self) -> bytes:
+        chunks = []
+        while True:
+            chunkSize = int(self.rfile.readline().split(b";")[0], 16)
+            chunks.append(self.rfile.read(chunkSize))
+            self.rfile.readline()
+            if chunkSize == 0:
+                return b"".join(chunks)
+
+    def __answer__(self) -> None:
+        self.server.requests.append(f"{self.command} {self.path}")
+        time.sleep(self.server.latencySeconds)
+        statusCode = self.server.statusCodes.pop(0) if self.server.statusCodes else 200
+        body = json.dumps({"name": "annotation", "tokens": []}).encode("utf-8")
+        self.send_response(statusCode)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def stubServer(monkeypatch: pytest.MonkeyPatch) -> Iterator[StubServer]:
+    server = StubServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    monkeypatch.setattr(requesterModule, "ANNOTATION_GET_ENDPOINT", f"{url}/hitec/repository/concepts/annotation/name/")
+    monkeypatch.setattr(requesterModule, "ANNOTATION_POST_ENDPOINT", f"{url}/hitec/repository/concepts/store/annotation/")
+    monkeypatch.setattr(requesterModule, "ANNOTATION_TOKENIZE_ENDPOINT", f"{url}/hitec/annotation/tokenize/")
+    monkeypatch.setattr(requesterModule, "DATASET_POST_ENDPOINT", f"{url}/hitec/repository/concepts/store/dataset/")
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+def test_RequesterReusesPooledConnections(stubServer: StubServer) -> None:
+    # a new connection per call, like the former module-level requests.get (the latency per call is measured with
+    # benchmarks/connection_pool_benchmark.py)
+    for _ in range(NUMBER_OF_CALLS):
+        requests.get(f"{requesterModule.ANNOTATION_GET_ENDPOINT}annotation", timeout=5).json()
+    connectionsWithoutPool = stubServer.connections
+
+    requester = ForeignComponentRelevanceClassifierRestConnectorRequester(createSession())
+    for _ in range(NUMBER_OF_CALLS):
+        requester.getAnnotationRequest("annotation")
+    connectionsWithPool = stubServer.connections - connectionsWithoutPool
+
+    # test, if all calls of the requester use one connection
+    assert connectionsWithoutPool == NUMBER_OF_CALLS
+    assert connectionsWithPool == 1
+
+
+def test_RequesterRetriesOnlyIdempotentCalls(stubServer: StubServer) -> None:
+    requester = ForeignComponentRelevanceClassifierRestConnectorRequester(createSession(retries=3, backoffFactor=0.01))
+
+    # test, if GET and the tokenization are retried after temporary errors
+    stubServer.statusCodes = [503, 502]
+    assert requester.getAnnotationRequest("annotation")["name"] == "annotation"
+    assert len(stubServer.requests) == 3
+
+    stubServer.statusCodes = [503]
+    requester.tokenizeAnnotationRequest([{"id": "1", "text": "A sentence."}], True)
+    assert len(stubServer.requests) == 5
+
+    # test, if storing an annotation is not repeated
+    stubServer.statusCodes = [503]
+    assert requester.storeAnnotationRequest({"name": "annotation"}) == 503  # type: ignore[typeddict-item]
+    assert len(stubServer.requests) == 6
+
+
+def test_OutboundExecutorOverlapsStoreRequests(stubServer: StubServer) -> None:
+    stubServer.latencySeconds = 0.3
+    requester = ForeignComponentRelevanceClassifierRestConnectorRequester(createSession())
+
+    def storeAnnotationAndDataset(outboundExecutor: OutboundExecutor) -> float:
+        startTime = time.perf_counter()
+        storeRequests = [
+            outboundExecutor.submit(requester.storeAnnotationRequest, {"name": "annotation"}),
+            outboundExecutor.submit(requester.storeDatasetRequest, {"name": "dataset"}),
+        ]
+        assert [storeRequest.result() for storeRequest in storeRequests] == [200, 200]
+        return time.perf_counter() - startTime
+
+    secondsSequential = storeAnnotationAndDataset(OutboundExecutor(concurrent=False))
+    secondsConcurrent = storeAnnotationAndDataset(OutboundExecutor(workers=2))
+
+    # test, if the concurrent requests save about one round-trip
+    assert secondsSequential >= 2 * stubServer.latencySeconds
+    assert secondsConcurrent < 1.5 * stubServer.latencySeconds
+    assert sorted(stubServer.requests[-2:]) == ["POST /hitec/repository/concepts/store/annotation/",
+                                                "POST /hitec/repository/concepts/store/dataset/"]
+
+
+def test_OutboundExecutorReturnsExceptionsOfCalls() -> None:
+    def failingCall() -> None:
+        raise ValueError("failed")
+
+    # test, if the exception is raised by the future in both modes
+    for outboundExecutor in [OutboundExecutor(concurrent=False), OutboundExecutor(workers=1)]:
+        with pytest.raises(ValueError):
+            outboundExecutor.submit(failingCall).result()
+
+
+class FailingCreationPipeline():
+    """
+        Description: Creation pipeline, whose dataset creation fails after the annotation was extended.
+    """
+
+    report = None
+
+    def __process__(self, progressCallback: Any = None) -> Any:
+        raise ValueError("CreateDatasetFilter failed")
+
+
+def test_RelevanceClassifierStoresNothingIfTheCreationFails(stubServer: StubServer, monkeypatch: pytest.MonkeyPatch) -> None:
+    relevanceClassifier = RelevanceClassifier()
+    relevanceClassifier.foreignComponentRequester = ForeignComponentRelevanceClassifierRestConnectorRequester(createSession())
+    monkeypatch.setattr(relevanceClassifier.configurationFactory, "__create__", lambda configuration: OmegaConf.create({"name": "creation_annotation_and_dataset_config"}))
+    monkeypatch.setattr(relevanceClassifier.pipelineFactory, "__create__", lambda pipeline, **kwargs: FailingCreationPipeline())
+    monkeypatch.setattr(relevanceClassifier, "initializeAndGetAnnotation", lambda content: {"name": "annotation"})
+
+    # test, if neither the annotation nor the dataset is stored, if the pipeline fails
+    with pytest.raises(ValueError):
+        relevanceClassifier.startCreationPipeline({"params": {"relevance_classification_conf": "AnnotationAndDataset"}})  # type: ignore[dict-item]
+    assert stubServer.requests == []
+
+
+def test_RequesterCompressesLargePayloadsWithFallback(stubServer: StubServer, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(requesterModule, "uncompressedEndpoints", set())
+    monkeypatch.setattr(requesterModule, "HTTP_REQUEST_COMPRESSION", "false")
+    requester = ForeignComponentRelevanceClassifierRestConnectorRequester(createSession())
+    annotation = {"name": "annotation", "tokens": [{"index": index, "name": "word"} for index in range(10000)]}
+
+    # test, if large payloads are not compressed, if the compression is not enabled (default)
+    stubServer.acceptsGzip = False
+    assert requester.storeAnnotationRequest(annotation) == 200  # type: ignore[arg-type]
+    assert stubServer.bodies == [annotation]
+    stubServer.acceptsGzip = True
+    stubServer.bodies.clear()
+    stubServer.requests.clear()
+
+    monkeypatch.setattr(requesterModule, "HTTP_REQUEST_COMPRESSION", "auto")
+
+    # test, if large payloads are compressed, and small payloads are not
+    requester.storeAnnotationRequest(annotation)  # type: ignore[arg-type]
+    requester.storeDatasetRequest({"name": "dataset"})  # type: ignore[typeddict-item]
+    assert stubServer.bodies == [annotation, {"name": "dataset"}]
+    assert len(stubServer.requests) == 2
+
+    # test, if a bad request (400) is neither sent again nor are the following payloads sent uncompressed
+    stubServer.statusCodes.append(400)
+    assert requester.storeAnnotationRequest(annotation) == 400  # type: ignore[arg-type]
+    assert len(stubServer.requests) == 3
+    assert not requesterModule.uncompressedEndpoints
+
+    # test, if the payload is sent again uncompressed, when the endpoint rejects compressed payloads (415), and only once compressed
+    stubServer.acceptsGzip = False
+    assert requester.storeAnnotationRequest(annotation) == 200  # type: ignore[arg-type]
+    assert requester.storeAnnotationRequest(annotation) == 200  # type: ignore[arg-type]
+    assert stubServer.bodies[3:] == [annotation, annotation]
+    assert len(stubServer.requests) == 6
+
+
+def test_ProviderDecodesAndCompressesPayloads(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(providerModule, "MAX_SENTENCES_PER_PREDICTION_REQUEST", 2)
+    monkeypatch.setattr(providerModule, "GZIP_MIN_BYTES", 1)
+    client = providerModule.app.test_client()
+
+    # test, if compressed bodies are decoded (the sentences are counted before the model is used)
+    body = gzip.compress(json.dumps({"sentences": ["One.", "Two.", "Three."]}).encode("utf-8"))
+    response = client.post("/hitec/classify/relevance/predict", data=body, headers={"Content-Encoding": "gzip", "Content-Type": "application/json"})
+    assert response.status_code == 413
+
+    response = client.post("/hitec/classify/relevance/predict", data=body, headers={"Content-Encoding": "br"})
+    assert response.status_code == 415
+
+    # test, if responses are only compressed for clients, that accept gzip
+    response = client.get("/hitec/classify/relevance/status", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(response.get_data())) == {"status": "operational"}
+
+    response = client.get("/hitec/classify/relevance/status")
+    assert "Content-Encoding" not in response.headers
+    assert response.get_json() == {"status": "operational"}
+
+
+class LengthRelevanceClassifier():
+    """
+        Description: RelevanceClassifier, that predicts every sentence with more than one word as relevant.
+    """
+
+    def predictSentences(self, sentences: List[str]) -> List[Dict[str, Any]]:
+        return [{"sentence": sentence, "label": "Informative" if len(sentence.split()) > 1 else "Non-Informative"} for sentence in sentences]
+
+
+def test_ProviderPredictsSentenceBatches(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(providerModule, "RelevanceClassifier", LengthRelevanceClassifier)
+    monkeypatch.setattr(providerModule, "MAX_SENTENCES_PER_PREDICTION_REQUEST", 2)
+    client = providerModule.app.test_client()
+
+    # test, if a JSON array and an object with sentences are predicted
+    response = client.post("/hitec/classify/relevance/predict", json=["One word.", "Two"])
+    assert response.status_code == 200
+    assert [prediction["label"] for prediction in response.get_json()] == ["Informative", "Non-Informative"]
+    assert client.post("/hitec/classify/relevance/predict", json={"sentences": ["One"]}).status_code == 200
+
+    # test, if invalid bodies and too many sentences are rejected
+    assert client.post("/hitec/classify/relevance/predict", json={"sentences": "One"}).status_code == 400
+    assert client.post("/hitec/classify/relevance/predict", json=[1, 2]).status_code == 400
+    assert client.post("/hitec/classify/relevance/predict", json=["One", "Two", "Three"]).status_code == 413
+
+
+class ReloadingRelevanceClassifier():
+    """
+        Description: RelevanceClassifier, that records the reloaded and unloaded models instead of loading them.
+    """
+
+    modelNames: List[str] = []
+
+    def reloadModel(self, modelName: str) -> str:
+        self.modelNames.append(modelName)
+        return f"Model {modelName} successfully reloaded!"
+
+    def unloadModel(self, modelName: str) -> str:
+        self.modelNames.append(modelName)
+        return f"Model {modelName} successfully unloaded!"
+
+
+def test_ProviderReloadsAndUnloadsModels(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(providerModule, "RelevanceClassifier", ReloadingRelevanceClassifier)
+    monkeypatch.setattr(ReloadingRelevanceClassifier, "modelNames", [])
+    client = providerModule.app.test_client()
+
+    # test, if plain and compressed bodies are decoded
+    response = client.post("/hitec/classify/relevance/model/reload", json={"model_name": "model"})
+    assert response.status_code == 200
+    assert response.get_json() == {"message": "Model model successfully reloaded!"}
+
+    body = gzip.compress(json.dumps({"model_name": "model"}).encode("utf-8"))
+    response = client.post("/hitec/classify/relevance/model/unload", data=body, headers={"Content-Encoding": "gzip", "Content-Type": "application/json"})
+    assert response.status_code == 200
+    assert ReloadingRelevanceClassifier.modelNames == ["model", "model"]
+
+    # test, if missing model names, invalid bodies and unsupported encodings are rejected
+    for endpoint in ["/hitec/classify/relevance/model/reload", "/hitec/classify/relevance/model/unload"]:
+        assert client.post(endpoint).status_code == 400
+        assert client.post(endpoint, json={}).status_code == 400
+        assert client.post(endpoint, json={"model_name": 1}).status_code == 400
+        assert client.post(endpoint, data=b"{", headers={"Content-Type": "application/json"}).status_code == 400
+        assert client.post(endpoint, data=body, headers={"Content-Encoding": "br"}).status_code == 415
+    assert ReloadingRelevanceClassifier.modelNames == ["model", "model"]
+
+
+class BlockingRelevanceClassifier():
+    """
+        Description: RelevanceClassifier, whose creation pipeline runs until the test releases it.
+    """
+
+    release = threading.Event()
+    pipelineReport = None
+
+    def startCreationPipeline(self, content: Any, progressCallback: Any) -> str:
+        self.release.wait(5)
+        return "Relevance classification finished!"
+
+
+def test_ProviderRunsCreationJobs(tmp_path: Any, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(jobManagerModule, "RelevanceClassifier", BlockingRelevanceClassifier)
+    monkeypatch.setattr(providerModule, "creationJobManager", CreationJobManager(workers=1, queueDepth=0, jobStorePath=str(tmp_path)))
+    BlockingRelevanceClassifier.release.clear()
+    client = providerModule.app.test_client()
+
+    # test, if a job is accepted with its status URL and the status can be polled, while it runs
+    response = client.post("/hitec/classify/relevance/run", json={"dataset": {}})
+    assert response.status_code == 202
+    statusUrl = response.get_json()["status_url"]
+
+    response = client.get(statusUrl)
+    assert response.status_code == 200
+    assert response.get_json()["status"] in ("queued", "running")
+
+    # test, if a job is rejected, while the worker is busy and the job queue is full
+    response = client.post("/hitec/classify/relevance/run", json={"dataset": {}})
+    assert response.status_code == 503
+
+    BlockingRelevanceClassifier.release.set()
+    for _ in range(100):
+        jobStatus = client.get(statusUrl).get_json()
+        if jobStatus["status"] == "finished":
+            break
+        time.sleep(0.05)
+    assert jobStatus["message"] == "Relevance classification finished!"
+
+    # test, if unknown jobs are not found
+    response = client.get("/hitec/classify/relevance/jobs/00000000-0000-0000-0000-000000000000")
+    assert response.status_code == 404
+
+
+def test_RequesterStreamsLargePayloadsWithFallback(stubServer: StubServer, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(requesterModule, "uncompressedEndpoints", set())
+    monkeypatch.setattr(requesterModule, "unstreamedEndpoints", set())
+    monkeypatch.setattr(requesterModule, "STREAMING_UPLOAD_MIN_ITEMS", 1000)
+    monkeypatch.setattr(requesterModule, "HTTP_REQUEST_COMPRESSION", "auto")
+    requester = ForeignComponentRelevanceClassifierRestConnectorRequester(createSession())
+    annotation = {"name": "annotation", "tokens": [{"index": index, "name": "word"} for index in range(25000)], "codes": [],
+                  "docs": [{"name": "Review_0", "begin_index": 0, "end_index": 25000}]}
+
+    # test, if large payloads are sent at once, if streaming is not enabled (default)
+    monkeypatch.setattr(requesterModule, "HTTP_STREAMING_UPLOAD", False)
+    requester.storeAnnotationRequest(annotation)  # type: ignore[arg-type]
+    assert stubServer.transferEncodings == ["content-length"]
+    stubServer.bodies.clear()
+    stubServer.transferEncodings.clear()
+
+    monkeypatch.setattr(requesterModule, "HTTP_STREAMING_UPLOAD", True)
+    # test, if large payloads are streamed (compressed and uncompressed), and small payloads are sent at once
+    requester.storeAnnotationRequest(annotation)  # type: ignore[arg-type]
+    stubServer.acceptsGzip = False
+    requester.storeAnnotationRequest(annotation)  # type: ignore[arg-type]
+    requester.storeDatasetRequest({"name": "dataset", "documents": [{"id": "Review_0", "text": "A sentence."}]})  # type: ignore[typeddict-item]
+    assert stubServer.bodies == [annotation, annotation, {"name": "dataset", "documents": [{"id": "Review_0", "text": "A sentence."}]}]
+    assert stubServer.transferEncodings == ["chunked", "chunked", "chunked", "content-length"]
+
+    # test, if the payload is sent again at once, when the endpoint rejects streamed payloads
+    stubServer.acceptsChunked = False
+    assert requester.storeAnnotationRequest(annotation) == 200  # type: ignore[arg-type]
+    assert requester.storeAnnotationRequest(annotation) == 200  # type: ignore[arg-type]
+    assert stubServer.bodies[3:] == [annotation, annotation]
+    assert stubServer.transferEncodings[4:] == ["chunked", "content-length", "content-length"]
@@ -7,7 +7,10 @@ from main.structure.Factories.ConfigurationFactory import ConfigurationFactory
 from main.structure.Factories.FilterFactory import FilterFactory
 from main.structure.Factories.PipelineFactory import PipelineFactory
 from main.structure.Filters.CreateDatasetFilter import CreateDatasetFilter
+from main.structure.Filters.DeduplicateSentencesFilter import DeduplicateSentencesFilter
 from main.structure.Filters.Excel2JSONFilter import Excel2JSONFilter
+from main.structure.Filters.ExpandDeduplicatedLabelsFilter import ExpandDeduplicatedLabelsFilter
+from main.structure.Filters.ExportModelsToONNXFilter import ExportModelsToONNXFilter
 from main.structure.Filters.ExtendAnnotationFilter import ExtendAnnotationFilter
 from main.structure.Filters.MergeNewGeneratedJSONFilesFilter import MergeNewGeneratedJSONFilesFilter
 from main.structure.Filters.MergeOriginalJSONFilesFilter import MergeOriginalJSONFilesFilter
@@ -56,6 +59,9 @@ def test_configuration_factory() -> None:
     confAnnotationAndDataset = configFactory.__create__("AnnotationAndDataset")
     assert isinstance(confAnnotationAndDataset, DictConfig)
 
+    confOnlyPrediction = configFactory.__create__("OnlyPrediction")
+    assert isinstance(confOnlyPrediction, DictConfig)
+
 
 def test_pipeline_factory() -> None:
     pipelineFactory = PipelineFactory()
@@ -96,3 +102,12 @@ def test_filter_factory() -> None:
 
     trainAndEvaluateModelsFilter = filterFactory.__create__("TrainAndEvaluateModelsFilter", conf=trainingConf)
     assert isinstance(trainAndEvaluateModelsFilter, TrainAndEvaluateModelsFilter)
+
+    exportModelsToONNXFilter = filterFactory.__create__("ExportModelsToONNXFilter", conf=trainingConf)
+    assert isinstance(exportModelsToONNXFilter, ExportModelsToONNXFilter)
+
+    deduplicateSentencesFilter = filterFactory.__create__("DeduplicateSentencesFilter")
+    assert isinstance(deduplicateSentencesFilter, DeduplicateSentencesFilter)
+
+    expandDeduplicatedLabelsFilter = filterFactory.__create__("ExpandDeduplicatedLabelsFilter")
+    assert isinstance(expandDeduplicatedLabelsFilter, ExpandDeduplicatedLabelsFilter)
@@ -1,14 +1,24 @@
 import json
 import os
 import random
+import sys
+from typing import Any, Dict, Iterator, List
 
 import pandas as pd
-import pytest  # noqa: F401
+import pytest
+from omegaconf import OmegaConf
+from sklearn.model_selection import GroupKFold
 
 from main.structure.DataModels import Annotation
 from main.structure.Factories.ConfigurationFactory import ConfigurationFactory
 from main.structure.Factories.FilterFactory import FilterFactory
+from main.structure.Filters import ExportModelsToONNXFilter as exportFilterModule
+from main.structure.Filters.CreateDatasetFilter import CreateDatasetFilter
+from main.structure.Filters.PredictionFilter import PredictionFilter
+from main.structure.Filters.TrainAndEvaluateModelsFilter import TrainAndEvaluateModelsFilter
+from main.tooling import Quantization
 from main.tooling.FileManager import cleanup, getPathForNewGeneratedFiles, getPathForOriginalDatasets
+from main.tooling.TokenizationCache import TokenizationCache
 
 configFactory = ConfigurationFactory()
 trainingConf = configFactory.__create__("TrainingAllDatasets")
@@ -203,3 +213,156 @@ def test_CreateDatasetFilter() -> None:
     assert newGeneratedDataset['size'] == len(originalDatasetDocs)
 
     cleanup()
+
+
+class CountingList(List[Any]):
+    """
+        Description: List, that counts, how many items are read by iterating over it.
+    """
+
+    def __init__(self, items: List[Any]) -> None:
+        super().__init__(items)
+        self.reads = 0
+
+    def __iter__(self) -> Iterator[Any]:
+        for item in super().__iter__():
+            self.reads += 1
+            yield item
+
+
+def test_CreateDatasetFilterReadsEveryCodeAndTokenOnce() -> None:
+    numberOfTokens = 3000
+    tokens = CountingList([{"index": index, "name": f"Sentence {index}.", "lemma": "", "pos": "", "num_name_codes": 1, "num_tore_codes": 1}
+                           for index in range(numberOfTokens)])
+    # every third token has no code, so the tokens without a code are skipped
+    codes = CountingList([{"tokens": [index], "name": f"Sentence {index}.", "tore": "Informative" if index % 2 else "Non-Informative",
+                           "index": index, "relationship_memberships": []} for index in range(numberOfTokens) if index % 3])
+    docs = [{"name": f"Review_{index // 5}", "begin_index": index, "end_index": min(index + 5, numberOfTokens)}
+            for index in range(0, numberOfTokens, 5)]
+    annotation = Annotation(uploaded_at="", last_updated="", name="scaling", dataset="scaling", tores=[], show_recommendationtore=False,
+                            docs=docs, tokens=tokens, codes=codes, tore_relationships=[])  # type: ignore[typeddict-item]
+
+    _, dataset = CreateDatasetFilter({"params": {"new_dataset_name": "scaling"}}).__filter__(annotation)  # type: ignore[dict-item]
+
+    # test, if only the informative sentences with a code are in the dataset
+    assert len(dataset["documents"]) == len(docs)
+    assert [document["text"] for document in dataset["documents"][:2]] == ["Sentence 1.", "Sentence 5. Sentence 7."]
+
+    # test, if every code and token is read once (linear time), the former scans over all codes and tokens per token read them
+    # numberOfTokens times
+    assert codes.reads == len(codes)
+    assert tokens.reads == len(tokens)
+
+
+def test_PredictionFilterTokenBudgetBatches() -> None:
+    tokenBudgetConf = OmegaConf.create({"model_name": "model", "batching": {"mode": "token_budget", "max_batch_tokens": 40, "window_size": 100}})
+    predictionFilter = PredictionFilter(tokenBudgetConf)
+
+    inputIds = [[0] * length for length in [3, 25, 4, 5, 3, 12, 40, 6, 4]]
+    batches = predictionFilter.__planBatches__(inputIds)
+
+    # test, if every sentence is in exactly one batch
+    assert sorted(index for batch in batches for index in batch) == list(range(len(inputIds)))
+
+    # test, if the padded size of every batch stays within the token budget and the batches are sorted by length
+    for batch in batches:
+        assert max(len(inputIds[index]) for index in batch) * len(batch) <= 40
+    assert [len(inputIds[index]) for batch in batches for index in batch] == sorted(len(ids) for ids in inputIds)
+
+    # test, if the fixed batching mode keeps the arrival order in one batch
+    fixedConf = OmegaConf.create({"model_name": "model", "batching": {"mode": "fixed"}})
+    assert PredictionFilter(fixedConf).__planBatches__(inputIds) == [list(range(len(inputIds)))]
+
+
+def test_ExportModelsToONNXFilterIsSkippedWithoutOnnx(monkeypatch: pytest.MonkeyPatch) -> None:
+    exportedModels: List[str] = []
+    monkeypatch.setattr(exportFilterModule, "exportModelToONNX", exportedModels.append)
+    # a None entry in sys.modules makes the import fail like a missing package
+    monkeypatch.setitem(sys.modules, "onnxruntime", None)  # type: ignore[arg-type]
+
+    exportFilterModule.ExportModelsToONNXFilter(trainingConf).__filter__()
+
+    # test, if no model is exported, if onnxruntime is not installed
+    assert exportedModels == []
+
+
+def test_QuantizationIsOnlyActivatedWithSufficientAgreement(monkeypatch: pytest.MonkeyPatch) -> None:
+    fp32Model, int8Model = object(), object()
+    fp32Predictions = [0, 1, 1, 0, 1, 0, 1, 1, 0, 0]
+    quantizationConf = OmegaConf.create({"enabled": True, "validation_size": 10, "min_agreement": 0.9})
+
+    monkeypatch.setattr(Quantization, "loadValidationSentences", lambda modelName, validationSize: [f"Sentence {index}." for index in range(validationSize)])
+    monkeypatch.setattr(Quantization.torch.quantization, "quantize_dynamic", lambda model, layers, dtype: int8Model)
+
+    def setInt8Predictions(int8Predictions: List[int]) -> None:
+        monkeypatch.setattr(Quantization, "predictLabels", lambda tokenizer, model, sentences: fp32Predictions if model is fp32Model else int8Predictions)
+
+    # test, if the int8 model is activated, if it agrees with the fp32 model on at least "min_agreement" of the test sentences (9 of 10)
+    setInt8Predictions(fp32Predictions[:9] + [1])
+    assert Quantization.quantizeModelWithAccuracyGuard("model", None, fp32Model, quantizationConf) == (int8Model, "int8")
+
+    # test, if the fp32 model is kept, if the agreement is below "min_agreement" (8 of 10)
+    setInt8Predictions(fp32Predictions[:8] + [1, 1])
+    assert Quantization.quantizeModelWithAccuracyGuard("model", None, fp32Model, quantizationConf) == (fp32Model, None)
+
+    # test, if the fp32 model is kept, if the model has no test split
+    monkeypatch.setattr(Quantization, "loadValidationSentences", lambda modelName, validationSize: [])
+    assert Quantization.quantizeModelWithAccuracyGuard("model", None, fp32Model, quantizationConf) == (fp32Model, None)
+
+
+def test_DeduplicateSentencesFilterAndExpandDeduplicatedLabelsFilter() -> None:
+    sentences = ["Great app.", "The map does not load.", "great  app.", "Love it!", "Great app.", "Love it!"]
+
+    filterFactory = FilterFactory()
+    deduplicatedSentences = filterFactory.__create__("DeduplicateSentencesFilter").__filter__(sentences)
+
+    # test, if every normalized sentence is predicted only once (first occurrence, original spelling)
+    assert deduplicatedSentences.uniqueSentences == ["Great app.", "The map does not load.", "Love it!"]
+
+    labels = ["Non-Informative", "Informative", "Non-Informative"]
+    expandedSentences, expandedLabels = filterFactory.__create__("ExpandDeduplicatedLabelsFilter").__filter__((deduplicatedSentences, labels))
+
+    # test, if the labels are expanded back to the original sentence order, that the ExtendAnnotationFilter expects
+    assert expandedSentences == sentences
+    assert expandedLabels == ["Non-Informative", "Informative", "Non-Informative", "Non-Informative", "Non-Informative", "Non-Informative"]
+
+    # test, if sentences, that were not deduplicated, are rejected instead of passed through
+    with pytest.raises(ValueError):
+        filterFactory.__create__("ExpandDeduplicatedLabelsFilter").__filter__((sentences, labels))
+
+
+class WordLengthTokenizer():
+    """
+        Description: Tokenizer, that maps every word to its length.
+    """
+
+    name_or_path = "word-length-tokenizer"
+    model_max_length = 512
+
+    def __len__(self) -> int:
+        return 30522
+
+    def __call__(self, sentences: List[str], truncation: bool = True) -> Dict[str, List[List[int]]]:
+        return {"input_ids": [[101] + [len(word) for word in sentence.split()] + [102] for sentence in sentences]}
+
+
+def test_TrainAndEvaluateModelsFilterTokenizesOnceForAllFolds() -> None:
+    df = pd.DataFrame({
+        "text": [f"sentence {'word ' * (index % 7)}{index % 13}" for index in range(200)],
+        "labels": [index % 2 for index in range(200)],
+        "group": [index // 4 for index in range(200)],
+    })
+    tokenizationCache = TokenizationCache(WordLengthTokenizer())
+
+    tokenizedDataset = TrainAndEvaluateModelsFilter(trainingConf).__tokenizeDataFrame__(df, tokenizationCache)
+
+    # test, if every distinct sentence is tokenized only once
+    assert tokenizationCache.getStatistics()["misses"] == df["text"].nunique()
+
+    # test, if the selected rows of every fold are the rows of the GroupKFold split of the dataframe
+    for train_idx, test_idx in GroupKFold(n_splits=trainingConf.fold_number).split(df, df["labels"], df["group"]):
+        for idx in [train_idx, test_idx]:
+            foldDataset = tokenizedDataset.select(idx)
+            assert foldDataset["text"] == df.iloc[idx]["text"].tolist()
+            assert foldDataset["labels"] == df.iloc[idx]["labels"].tolist()
+            assert foldDataset["input_ids"] == tokenizationCache.encode(df.iloc[idx]["text"].tolist())["input_ids"]
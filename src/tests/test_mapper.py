@@ -3,7 +3,8 @@ import json
 import pytest  # noqa: F401
 
 from main.structure.DataModels import Annotation, Token
-from main.tooling.AnnotationMapper import AnnotationMapper
+from main.tooling.AnnotationMapper import LEGACY, VECTORIZED, AnnotationMapper
+from main.tooling.WordTokenizer import CachedWordTokenizer
 
 with open("src/tests/WordBasedAnno.json", 'r') as file:
     wordBasedAnnotation = json.load(file)
@@ -97,6 +98,50 @@ def test_ds_mini() -> None:
     assert findTokenByName(resultwordBasedAnnotation, "11n")
 
 
+@pytest.mark.parametrize("wordBasedFile, sentenceBasedFile", [("WordBasedAnno.json", "SentenceBasedAnno.json"),
+                                                              ("ds_mini_anno_word.json", "ds_mini_anno_sentence.json")])
+def test_VectorizedAnnotationMapperEqualsLegacyAnnotationMapper(wordBasedFile: str, sentenceBasedFile: str) -> None:
+    with open(f"src/tests/{wordBasedFile}", 'r') as file:
+        wordBasedAnnotation = json.load(file)
+
+    with open(f"src/tests/{sentenceBasedFile}", 'r') as file:
+        sentenceBasedAnnotation = json.load(file)
+
+    # a code, that references a removed and a kept token, and a code, that references a token outside of the annotation
+    wordBasedAnnotation["codes"].append({"tokens": [0, len(wordBasedAnnotation["tokens"]) - 1], "name": "span", "tore": "Task", "index": 0,
+                                         "relationship_memberships": []})
+    wordBasedAnnotation["codes"].append({"tokens": [len(wordBasedAnnotation["tokens"]) + 5], "name": "outside", "tore": "Task", "index": 0,
+                                         "relationship_memberships": []})
+    originalWordBasedAnnotation = json.dumps(wordBasedAnnotation)
+
+    legacyAnnotation = AnnotationMapper(wordBasedAnnotation, sentenceBasedAnnotation, engine=LEGACY).mapRelevantSentences2WordBasedAnnotation()
+    vectorizedAnnotation = AnnotationMapper(wordBasedAnnotation, sentenceBasedAnnotation, engine=VECTORIZED).mapRelevantSentences2WordBasedAnnotation()
+
+    vectorizedAnnotation["uploaded_at"] = legacyAnnotation["uploaded_at"]
+    assert json.dumps(vectorizedAnnotation) == json.dumps(legacyAnnotation)
+
+    # the original is not changed
+    assert json.dumps(wordBasedAnnotation) == originalWordBasedAnnotation
+
+
+def test_CachedWordTokenizerParallelAndCached() -> None:
+    sentences = [token["name"] for token in sentenceBasedAnnotation["tokens"]]
+    sentences = sentences + sentences[:5]
+
+    serialWords = CachedWordTokenizer(workers=1, maxEntries=0).tokenize(sentences)
+
+    # the same words in the same order from the worker processes and from the cache, repeated sentences are tokenized once
+    parallelWordTokenizer = CachedWordTokenizer(workers=2, maxEntries=len(sentences), parallelMinSentences=1)
+    assert parallelWordTokenizer.tokenize(sentences) == serialWords
+    assert parallelWordTokenizer.tokenize(sentences) == serialWords
+    assert parallelWordTokenizer.getStatistics() == {"entries": len(set(sentences)), "hits": len(sentences), "misses": len(set(sentences))}
+
+    # the cache is bounded
+    boundedWordTokenizer = CachedWordTokenizer(workers=1, maxEntries=3)
+    assert boundedWordTokenizer.tokenize(sentences) == serialWords
+    assert boundedWordTokenizer.getStatistics()["entries"] == 3
+
+
 def getCodeIdx(annotation: Annotation, token: Token) -> int:
     for codeIndex, code in enumerate(annotation["codes"]):
         if token["index"] in code["tokens"]:
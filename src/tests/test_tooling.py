@@ -0,0 +1,394 @@
+import gzip
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pytest
+from omegaconf import DictConfig, OmegaConf
+from prometheus_client import REGISTRY
+
+from main.behavior.CreationJobManager import CreationJob, CreationJobManager
+from main.structure.Filters.FilterInterface import FilterInterface
+from main.structure.Filters.PredictionFilter import PredictionFilter
+from main.structure.Pipelines.Pipeline import Pipeline
+from main.tooling import FileManager, Instrumentation
+from main.tooling.InferenceScheduler import InferenceScheduler
+from main.tooling.Instrumentation import PipelineInstrumentation
+from main.tooling.JsonCodec import compressChunks, dumpsJson, iterJsonChunks, loadsJson
+from main.tooling.Metrics import generateMetrics, measureOutboundCall
+from main.tooling.ModelRegistry import LoadedModel, ModelRegistry
+from main.tooling.PredictionCache import PredictionCache
+from main.tooling.TokenizationCache import TokenizationCache
+
+# cold start of the service: importing the provider must not load the training and model libraries and must stay within the budget
+HEAVY_MODULES = ["torch", "transformers", "datasets", "mlflow", "matplotlib", "sklearn", "nltk", "onnxruntime"]
+IMPORT_TIME_BUDGET_SECONDS = float(os.getenv("RC_IMPORT_TIME_BUDGET_SECONDS", "5"))
+
+
+class CountingModelRegistry(ModelRegistry):
+    """
+        Description: ModelRegistry, that counts the loads instead of loading a real model from the model directory.
+    """
+
+    def __init__(self, modelVersionsPath: Optional[str] = None) -> None:
+        super().__init__(modelVersionsPath)
+        self.loadCounter = 0
+
+    def __load__(self, modelName: str, inferenceBackend: str = "torch", quantizationConf: Optional[DictConfig] = None) -> LoadedModel:
+        time.sleep(0.05)
+        self.loadCounter += 1
+        return LoadedModel(modelName, tokenizer=None, backend=object(), loadSeconds=0.05)
+
+
+class CountingTokenizer():
+    """
+        Description: Tokenizer, that maps every word to its length and counts the tokenized sentences.
+    """
+
+    name_or_path = "counting-tokenizer"
+    model_max_length = 512
+
+    def __init__(self) -> None:
+        self.tokenizedSentences: List[str] = []
+
+    def __len__(self) -> int:
+        return 100
+
+    def __call__(self, sentences: List[str], truncation: bool = False) -> Dict[str, Any]:
+        self.tokenizedSentences.extend(sentences)
+        return {"input_ids": [[101] + [len(word) for word in sentence.split()] + [102] for sentence in sentences]}
+
+
+def test_ModelRegistryLoadsOnce() -> None:
+    registry = CountingModelRegistry()
+    loadedModels = []
+
+    threads = [threading.Thread(target=lambda: loadedModels.append(registry.getModel("model"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # test, if concurrent requests trigger exactly one load and share the same model
+    assert registry.loadCounter == 1
+    assert all(loadedModel is loadedModels[0] for loadedModel in loadedModels)
+
+
+def test_ModelRegistryUnloadAndReload(tmp_path: Path) -> None:
+    registry = CountingModelRegistry(str(tmp_path))
+    firstModel = registry.getModel("model")
+
+    # test, if reloading replaces the resident model
+    reloadedModel = registry.reloadModel("model")
+    assert reloadedModel is not firstModel
+    assert registry.getModel("model") is reloadedModel
+
+    # test, if unloading removes the model and the next call loads it again
+    assert registry.unloadModel("model")
+    assert not registry.isLoaded("model")
+    assert not registry.unloadModel("model")
+    registry.getModel("model")
+    assert registry.loadCounter == 3
+
+
+def test_ModelRegistryAppliesReloadsOfOtherProcesses(tmp_path: Path) -> None:
+    # two registries with the same model version directory, like two gunicorn workers
+    servingRegistry = CountingModelRegistry(str(tmp_path))
+    otherRegistry = CountingModelRegistry(str(tmp_path))
+    firstModel = otherRegistry.getModel("model")
+
+    # test, if a reload in one process replaces the model of the other process with its next call
+    servingRegistry.reloadModel("model")
+    reloadedModel = otherRegistry.getModel("model")
+    assert reloadedModel is not firstModel
+    assert otherRegistry.getModel("model") is reloadedModel
+    assert otherRegistry.loadCounter == 2
+
+    # test, if an unload in one process is applied by the other process, which loads the model again for the next call
+    servingRegistry.unloadModel("model")
+    assert otherRegistry.getModel("model") is not reloadedModel
+    assert otherRegistry.loadCounter == 3
+
+    # test, if a new registry (e.g. after a restart of the service) does not apply versions of before
+    restartedRegistry = CountingModelRegistry(str(tmp_path))
+    restartedRegistry.getModel("model")
+    restartedRegistry.getModel("model")
+    assert restartedRegistry.loadCounter == 1
+
+
+def test_InferenceSchedulerMergesConcurrentRequests() -> None:
+    batchSizes = []
+
+    def predictBatch(batchSentences: List[str]) -> List[List[float]]:
+        batchSizes.append(len(batchSentences))
+        return [[float(len(sentence))] for sentence in batchSentences]
+
+    scheduler = InferenceScheduler(predictBatch, maxBatchSize=4, maxWaitMs=200)
+    results = {}
+
+    def submit(requestIndex: int) -> None:
+        results[requestIndex] = scheduler.submit(["x" * requestIndex, "y" * (requestIndex + 10)])
+
+    threads = [threading.Thread(target=submit, args=(requestIndex,)) for requestIndex in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # test, if the sentences of concurrent requests are merged into shared batches, that respect the maximum batch size
+    assert sum(batchSizes) == 12
+    assert max(batchSizes) <= 4
+    assert len(batchSizes) < 6
+
+    # test, if every caller gets the results of its own sentences in the original order
+    for requestIndex in range(6):
+        assert results[requestIndex] == [[float(requestIndex)], [float(requestIndex + 10)]]
+
+
+class RecordingPredictionFilter(PredictionFilter):
+    """
+        Description: PredictionFilter, that records the batching mode of the configuration, with which its sentences are predicted.
+    """
+
+    def __init__(self, conf: DictConfig, predictedModes: List[str]) -> None:
+        super().__init__(conf)
+        self.predictedModes = predictedModes
+
+    def __predictSentences__(self, sentences: List[str]) -> List[List[float]]:
+        self.predictedModes.extend(self.conf.batching.mode for _ in sentences)
+        return [[0.0, 1.0] for _ in sentences]
+
+
+def test_InferenceSchedulerIsSharedOnlyWithTheSameBatchingSettings(monkeypatch: pytest.MonkeyPatch) -> None:
+    inferenceSchedulers: Dict[Any, InferenceScheduler] = {}
+    monkeypatch.setattr("main.tooling.InferenceScheduler.inferenceSchedulers", inferenceSchedulers)
+    predictedModes: List[str] = []
+
+    def createConf(batchingMode: str) -> DictConfig:
+        return OmegaConf.create({"model_name": "model", "micro_batching": {"enabled": True, "max_batch_size": 8, "max_wait_ms": 1},
+                                 "batching": {"mode": batchingMode, "window_size": 100, "max_batch_tokens": 1000}})
+
+    # two configurations for the same model key, which differ only in their batching mode
+    RecordingPredictionFilter(createConf("fixed"), predictedModes).predictProbabilities(["a", "b"])
+    RecordingPredictionFilter(createConf("token_budget"), predictedModes).predictProbabilities(["c"])
+    RecordingPredictionFilter(createConf("fixed"), predictedModes).predictProbabilities(["d"])
+
+    # test, if every configuration is predicted with its own settings and equal configurations share one scheduler
+    assert predictedModes == ["fixed", "fixed", "token_budget", "fixed"]
+    assert len(inferenceSchedulers) == 2
+
+
+def test_TokenizationCacheTokenizesOnlyMisses() -> None:
+    tokenizer = CountingTokenizer()
+    tokenizationCache = TokenizationCache(tokenizer, maxEntries=2)
+
+    firstEncodings = tokenizationCache.encode(["a bb", "ccc"])
+    assert firstEncodings["input_ids"] == [[101, 1, 2, 102], [101, 3, 102]]
+    assert firstEncodings["attention_mask"] == [[1, 1, 1, 1], [1, 1, 1]]
+
+    # test, if only the sentences, that are not in the cache, are tokenized again
+    secondEncodings = tokenizationCache.encode(["ccc", "dddd"])
+    assert secondEncodings["input_ids"] == [[101, 3, 102], [101, 4, 102]]
+    assert tokenizer.tokenizedSentences == ["a bb", "ccc", "dddd"]
+
+    # test, if the least recently used sentence is evicted, when the cache is full
+    tokenizationCache.encode(["a bb"])
+    assert tokenizer.tokenizedSentences[-1] == "a bb"
+    assert tokenizationCache.getStatistics() == {"entries": 2, "hits": 1, "misses": 4}
+
+
+def test_PredictionCacheTiersAndInvalidation(tmp_path: Any) -> None:
+    databasePath = str(tmp_path / "prediction_cache.sqlite")
+    predictionCache = PredictionCache(maxEntries=10, databasePath=databasePath)
+
+    assert predictionCache.get("model", "digest-1", ["a", "b"]) == [None, None]
+    predictionCache.put("model", "digest-1", ["a", "b"], [[0.1, 0.9], [0.8, 0.2]])
+    assert predictionCache.get("model", "digest-1", ["b", "a", "c"]) == [[0.8, 0.2], [0.1, 0.9], None]
+
+    # test, if the SQLite tier survives a restart (a new cache with an empty in-memory tier)
+    restartedPredictionCache = PredictionCache(maxEntries=10, databasePath=databasePath)
+    assert restartedPredictionCache.get("model", "digest-1", ["a"]) == [[0.1, 0.9]]
+    assert restartedPredictionCache.getStatistics() == {"entries": 1, "memory_hits": 0, "disk_hits": 1, "misses": 0}
+
+    # test, if changed model weights invalidate the cached predictions of the model in both tiers
+    assert restartedPredictionCache.get("model", "digest-2", ["a", "b"]) == [None, None]
+    assert restartedPredictionCache.get("model", "digest-1", ["a"]) == [None]
+    assert predictionCache.getStatistics()["misses"] == 3
+
+
+def test_CreationJobManagerSharesJobStatusViaJobStore(tmp_path: Any) -> None:
+    jobManager = CreationJobManager(jobStorePath=str(tmp_path))
+    otherWorkerJobManager = CreationJobManager(jobStorePath=str(tmp_path))
+
+    job = CreationJob({})
+    jobManager.__storeJob__(job)
+
+    # test, if the job status can be requested from another worker process, that shares the job store
+    assert otherWorkerJobManager.getJobStatus(job.jobId) == job.toDict()
+
+    # test, if unknown or invalid job IDs are not found
+    assert otherWorkerJobManager.getJobStatus("00000000-0000-0000-0000-000000000000") is None
+    assert otherWorkerJobManager.getJobStatus("../prediction_cache") is None
+
+
+def test_PipelineInstrumentationReportsEveryFilter(tmp_path: Any, monkeypatch: Any) -> None:
+    monkeypatch.setattr(Instrumentation, "PROFILES_PATH", str(tmp_path))
+    conf = OmegaConf.create({"name": "test_pipeline", "instrumentation": {"profile_filter": "SplitFilter", "profiler": "cProfile"}})
+    instrumentation = PipelineInstrumentation(conf)
+
+    sentences = instrumentation.measureFilter("PrepareFilter", None, lambda: ["a b", "c", "d e f"])
+    instrumentation.measureFilter("SplitFilter", sentences, lambda: ([word for sentence in sentences for word in sentence.split()], []))
+    report = instrumentation.getReport()
+
+    # test, if every filter is measured with the items in and out (tuples are counted by their first element)
+    assert report["pipeline"] == "test_pipeline"
+    assert [filterReport["filter"] for filterReport in report["filters"]] == ["PrepareFilter", "SplitFilter"]
+    assert [(filterReport["items_in"], filterReport["items_out"]) for filterReport in report["filters"]] == [(0, 3), (3, 6)]
+    assert all(filterReport["wall_seconds"] >= 0 and filterReport["cpu_seconds"] >= 0 for filterReport in report["filters"])
+
+    # test, if the current RSS is sampled around every filter, so memory, that a filter keeps, is reported (Linux only)
+    keptData = instrumentation.measureFilter("AllocateFilter", None, lambda: b"x" * (64 * 1024 * 1024))
+    allocateReport = instrumentation.getReport()["filters"][-1]
+    assert allocateReport["new_peak_rss_mb"] >= 0
+    if sys.platform == "linux":
+        assert allocateReport["rss_delta_mb"] >= 48
+    del keptData
+
+    # test, if only the configured filter is profiled
+    assert [profilePath.name.split("_")[0] for profilePath in tmp_path.glob("*.prof")] == ["SplitFilter"]
+
+
+def test_MetricsCountOutboundCalls() -> None:
+
+    def getSample(name: str, labels: Dict[str, str]) -> float:
+        return REGISTRY.get_sample_value(name, labels) or 0.0
+
+    okBefore = getSample("rc_outbound_requests_total", {"operation": "test_operation", "status": "200"})
+    httpErrorsBefore = getSample("rc_outbound_errors_total", {"operation": "test_operation", "error": "http_503"})
+    connectionErrorsBefore = getSample("rc_outbound_errors_total", {"operation": "test_operation", "error": "ConnectionError"})
+
+    with measureOutboundCall("test_operation") as outboundCall:
+        outboundCall.statusCode = 200
+    with measureOutboundCall("test_operation") as outboundCall:
+        outboundCall.statusCode = 503
+    with pytest.raises(ConnectionError):
+        with measureOutboundCall("test_operation"):
+            raise ConnectionError("service not reachable")
+
+    # test, if successful calls, HTTP errors and connection errors are counted separately
+    assert getSample("rc_outbound_requests_total", {"operation": "test_operation", "status": "200"}) == okBefore + 1
+    assert getSample("rc_outbound_errors_total", {"operation": "test_operation", "error": "http_503"}) == httpErrorsBefore + 1
+    assert getSample("rc_outbound_errors_total", {"operation": "test_operation", "error": "ConnectionError"}) == connectionErrorsBefore + 1
+
+    # test, if the metrics are exposed in the text exposition format
+    metrics, contentType = generateMetrics()
+    assert contentType.startswith("text/plain")
+    assert b"rc_outbound_request_duration_seconds_bucket" in metrics
+
+
+def test_ServiceStartsWithoutHeavyImportsWithinBudget() -> None:
+    script = ("import json, sys, time\n"
+              "startTime = time.perf_counter()\n"
+              "import main.connector.ComponentRelevanceClassifierRestConnectorProvider\n"
+              "print(json.dumps({'seconds': time.perf_counter() - startTime, 'modules': list(sys.modules)}))")
+
+    # without network access and without downloads, like on the air-gapped nodes
+    environment = dict(os.environ, RC_NLTK_DATA_DOWNLOAD="false", HF_HUB_OFFLINE="1")
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, env=environment, timeout=120, check=True)
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+
+    loadedHeavyModules = [module for module in HEAVY_MODULES if module in report["modules"]]
+    assert loadedHeavyModules == []
+    assert report["seconds"] < IMPORT_TIME_BUDGET_SECONDS
+
+
+def test_StreamedJsonEqualsJsonAndIsBounded() -> None:
+    annotation = {"name": "annotation", "tokens": [{"index": index, "name": f"word{index}"} for index in range(25000)], "codes": [],
+                  "docs": [{"name": "Review_0", "begin_index": 0, "end_index": 25000}], "tores": ["Informative"]}
+
+    chunks = list(iterJsonChunks(annotation, chunkItems=1000))
+
+    # test, if the parts are the same JSON and no part contains more than one chunk of tokens (1/25 of the tokens)
+    assert b"".join(chunks) == dumpsJson(annotation)
+    assert max(len(chunk) for chunk in chunks) < len(dumpsJson(annotation)) / 10
+    assert loadsJson(gzip.decompress(b"".join(compressChunks(iter(chunks))))) == annotation
+
+
+def test_RunScopesIsolateWorkingDirectories(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(FileManager, "RUNS_PATH", f"{tmp_path}/runs/")
+    monkeypatch.setattr(FileManager, "TEMP_FILES_PATH", f"{tmp_path}/temp/")
+    monkeypatch.setattr(FileManager, "MODEL_PATH", f"{tmp_path}/models/")
+    servingModelPath = Path(FileManager.getModelPath("model"))
+    servingModelPath.mkdir()
+
+    runPaths: Dict[str, Path] = {}
+    barrier = threading.Barrier(2, timeout=5)
+
+    def run(runName: str, cleanupAtTheEnd: bool) -> None:
+        with FileManager.runScope(FileManager.createRunId(runName)) as runPath:
+            runPaths[runName] = runPath
+            FileManager.getPathForNewGeneratedFiles("train.json").write_text("[]")
+            Path(FileManager.getModelPath("model")).mkdir()
+            # both runs (with the same model name) are active, when the second run cleans up
+            barrier.wait()
+            if cleanupAtTheEnd:
+                FileManager.cleanup()
+
+    runs = [threading.Thread(target=run, args=("first", False)), threading.Thread(target=run, args=("second", True))]
+    for runThread in runs:
+        runThread.start()
+    for runThread in runs:
+        runThread.join()
+
+    # test, if the runs used their own directories and the cleanup deleted only the directory of the second run
+    assert runPaths["first"] != runPaths["second"]
+    assert Path(runPaths["first"], "temp", "train.json").exists()
+    assert Path(runPaths["first"], "models", "model").is_dir()
+    assert not runPaths["second"].exists()
+    assert servingModelPath.is_dir()
+
+    # test, if the cleanup outside of a run keeps the models of the serving path
+    FileManager.cleanup()
+    assert servingModelPath.is_dir()
+
+
+class FailingFilter(FilterInterface):
+    """
+        Description: Filter, that writes a new generated file and fails afterwards.
+    """
+
+    def __init__(self) -> None:
+        pass
+
+    def __filter__(self) -> None:
+        FileManager.getPathForNewGeneratedFiles("train.json").write_text("[]")
+        raise RuntimeError("filter failed")
+
+
+class FailingPipeline(Pipeline):
+    """
+        Description: Training pipeline with the FailingFilter.
+    """
+
+    def __init__(self, conf: DictConfig) -> None:
+        super().__init__(conf)
+        self.__compose__()
+
+    def __compose__(self) -> None:
+        self.pipelineFilters.append(FailingFilter())
+
+
+def test_FailedRunDeletesItsWorkingDirectory(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(FileManager, "RUNS_PATH", f"{tmp_path}/runs/")
+    pipeline = FailingPipeline(OmegaConf.create({"training": True, "run_id": "failing_run", "project": {"run_name": "failing"}}))
+
+    with pytest.raises(RuntimeError):
+        pipeline.__process__()
+
+    # test, if the working directory of the run is deleted, although the filter failed after it wrote a file into it
+    assert not Path(tmp_path, "runs", "failing_run").exists()
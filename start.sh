@@ -1,2 +1,7 @@
 #!/usr/bin/env bash
-python src/main/connector/ComponentRelevanceClassifierRestConnectorProvider.py
+# RC_SERVER=development starts the single-process Flask development server instead of the production server
+if [ "${RC_SERVER:-production}" = "development" ]; then
+    python src/main/connector/ComponentRelevanceClassifierRestConnectorProvider.py
+else
+    exec gunicorn --config gunicorn.conf.py main.connector.ComponentRelevanceClassifierRestConnectorProvider:app
+fi